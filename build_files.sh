@@ -2,6 +2,9 @@
 echo "Building project deployments..."
 python3 -m pip install -r requirements.txt --break-system-packages
 
+echo "Creating the cache table..."
+python3 manage.py createcachetable
+
 echo "Building Tailwind CSS..."
 python3 manage.py tailwind install
 python3 manage.py tailwind build
@@ -0,0 +1,320 @@
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Q, Sum, When
+from django.utils import timezone
+
+from .models import Account, BalanceSnapshot, Transaction, MonthlyCategoryRollup
+
+DEFAULT_SERIES_MONTHS = 6
+MAX_SERIES_MONTHS = 120
+NET_WORTH_GRANULARITIES = ('day', 'week', 'month')
+MAX_SERIES_POINTS = 4000
+
+
+def shift_month(year, month, offset):
+    """Return the (year, month) pair `offset` months away from the given one."""
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
+
+
+def month_window(months, end=None):
+    """First day of each of the last `months` months, ending with the month of `end`."""
+    end = end or timezone.now().date()
+    firsts = []
+    for offset in range(-(months - 1), 1):
+        y, m = shift_month(end.year, end.month, offset)
+        firsts.append(date(y, m, 1))
+    return firsts
+
+
+def month_bounds(year, month):
+    """First and last day of the given month."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def is_whole_months(start, end):
+    """True when [start, end] covers complete calendar months only."""
+    return start <= end and start.day == 1 and (end + timedelta(days=1)).day == 1
+
+
+def month_range_q(start, end):
+    """Filter matching rollup rows whose (year, month) falls between the months of start and end."""
+    return (
+        (Q(year__gt=start.year) | Q(year=start.year, month__gte=start.month)) &
+        (Q(year__lt=end.year) | Q(year=end.year, month__lte=end.month))
+    )
+
+
+def parse_months(value, default=DEFAULT_SERIES_MONTHS):
+    """Parse a `?months=` query value, clamped to a sane window."""
+    try:
+        months = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(months, MAX_SERIES_MONTHS))
+
+
+def monthly_income_expense(user, months=DEFAULT_SERIES_MONTHS, end=None):
+    """
+    Income and expense totals for the last `months` months in a single grouped query
+    over the monthly rollups. Months without activity are filled with zeros so the
+    series always has `months` points.
+    """
+    firsts = month_window(months, end)
+
+    rows = MonthlyCategoryRollup.objects.filter(
+        month_range_q(firsts[0], firsts[-1]),
+        user=user,
+    ).values('year', 'month').annotate(
+        income=Sum('total', filter=Q(transaction_type='income')),
+        expense=Sum('total', filter=Q(transaction_type='expenses')),
+    ).order_by()
+
+    totals = {(row['year'], row['month']): row for row in rows}
+
+    label_format = '%b' if months <= 12 else '%b %Y'
+    labels, income, expense = [], [], []
+    for first in firsts:
+        row = totals.get((first.year, first.month), {})
+        labels.append(first.strftime(label_format))
+        income.append(float(row.get('income') or 0))
+        expense.append(float(row.get('expense') or 0))
+
+    return {'months': labels, 'income': income, 'expense': expense}
+
+
+def period_totals(user, start, end):
+    """
+    Income and expense totals for [start, end]. Whole-month periods are answered
+    from the rollups, anything else with one conditional aggregate over Transaction.
+    """
+    if is_whole_months(start, end):
+        totals = MonthlyCategoryRollup.objects.filter(
+            month_range_q(start, end),
+            user=user,
+        ).aggregate(
+            income=Sum('total', filter=Q(transaction_type='income')),
+            expense=Sum('total', filter=Q(transaction_type='expenses')),
+        )
+    else:
+        totals = Transaction.objects.filter(
+            user=user,
+            date__gte=start,
+            date__lte=end,
+        ).aggregate(
+            income=Sum('amount', filter=Q(transaction_type='income')),
+            expense=Sum('amount', filter=Q(transaction_type='expenses')),
+        )
+    return {'income': totals['income'] or 0, 'expense': totals['expense'] or 0}
+
+
+def category_breakdown(user, start, end, transaction_type):
+    """Per-category totals for [start, end], largest first, as `category__name` / `total` dicts."""
+    if is_whole_months(start, end):
+        rows = MonthlyCategoryRollup.objects.filter(
+            month_range_q(start, end),
+            user=user,
+            transaction_type=transaction_type,
+            count__gt=0,
+        ).values('category__name').annotate(total=Sum('total'))
+    else:
+        rows = Transaction.objects.filter(
+            user=user,
+            date__gte=start,
+            date__lte=end,
+            transaction_type=transaction_type,
+        ).values('category__name').annotate(total=Sum('amount'))
+    return list(rows.order_by('-total'))
+
+
+def after_month_q(day):
+    """Filter matching snapshot/rollup rows of the months strictly after the month of `day`."""
+    return Q(year__gt=day.year) | Q(year=day.year, month__gt=day.month)
+
+
+def balances_at(user, day, accounts=None):
+    """
+    Balance of each account at the end of `day`, as {account_id: Decimal}.
+    Starts from the live balances and backs out the snapshot movement of every later month
+    plus the transactions in the rest of `day`'s month, so the cost is bounded by the
+    number of months and one month of transactions, not by the history after `day`.
+    """
+    if accounts is None:
+        accounts = Account.objects.filter(user=user)
+    balances = dict(accounts.values_list('id', 'balance'))
+
+    later_months = BalanceSnapshot.objects.filter(
+        after_month_q(day),
+        account_id__in=balances,
+    ).values('account_id').annotate(total=Sum('net_change')).order_by()
+    for row in later_months:
+        balances[row['account_id']] -= row['total']
+
+    _, month_end = month_bounds(day.year, day.month)
+    rest_of_month = Transaction.objects.filter(
+        account_id__in=balances,
+        date__gt=day,
+        date__lte=month_end,
+    ).values('account_id').annotate(
+        income=Sum('amount', filter=Q(transaction_type='income')),
+        expense=Sum('amount', filter=Q(transaction_type='expenses')),
+    ).order_by()
+    for row in rest_of_month:
+        balances[row['account_id']] -= (row['income'] or 0) - (row['expense'] or 0)
+    return balances
+
+
+def monthly_net_worth(user, months=DEFAULT_SERIES_MONTHS, end=None):
+    """Month-end total of the accounts included in the net worth, for the same window as the income/expense series."""
+    firsts = month_window(months, end)
+    accounts = Account.objects.filter(user=user, include_in_total=True)
+    current = accounts.aggregate(total=Sum('balance'))['total'] or 0
+
+    rows = BalanceSnapshot.objects.filter(
+        after_month_q(firsts[0] - timedelta(days=1)),
+        account__in=accounts,
+    ).values('year', 'month').annotate(total=Sum('net_change')).order_by()
+    changes = {(row['year'], row['month']): row['total'] for row in rows}
+
+    # Walk back from the present: each month-end is the next one minus that next month's movement
+    last = (firsts[-1].year, firsts[-1].month)
+    later = sum((total for key, total in changes.items() if key > last), 0)
+    values = []
+    for first in reversed(firsts):
+        values.append(float(current - later))
+        later += changes.get((first.year, first.month), 0)
+    values.reverse()
+    return values
+
+
+def period_count(start, end, granularity):
+    """How many points period_ends returns, without enumerating them."""
+    if start > end:
+        return 0
+    if granularity == 'day':
+        return (end - start).days + 1
+    if granularity == 'week':
+        return (end - (start - timedelta(days=start.weekday()))).days // 7 + 1
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def period_ends(start, end, granularity):
+    """Last day of every day/week/month period touching [start, end], the final one clipped to `end`."""
+    points = []
+    day = start
+    while day <= end:
+        if granularity == 'day':
+            point = day
+        elif granularity == 'week':
+            # ISO weeks, ending on Sunday
+            point = day + timedelta(days=6 - day.weekday())
+        else:
+            point = month_bounds(day.year, day.month)[1]
+        point = min(point, end)
+        points.append(point)
+        day = point + timedelta(days=1)
+    return points
+
+
+def net_worth_series(user, start, end, granularity='month'):
+    """
+    Assets, liabilities and net worth at the end of every period of [start, end], using the
+    same account buckets as the accounts page.
+
+    Values are anchored on the live balances and walked back with suffix sums: the monthly
+    snapshots give the movement of every month after a point, and one per-day aggregate over
+    the range gives the movement left in the point's own month. That is three queries
+    whatever the range, plus one linear pass over the days.
+    """
+    if granularity not in NET_WORTH_GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity!r}")
+    count = period_count(start, end, granularity)
+    if count > MAX_SERIES_POINTS:
+        raise ValueError(f"Too many points: {count} > {MAX_SERIES_POINTS}")
+    points = period_ends(start, end, granularity)
+
+    accounts = Account.objects.filter(
+        user=user,
+        include_in_total=True,
+        type__in=Account.ASSET_TYPES + Account.LIABILITY_TYPES,
+    ).values_list('id', 'type', 'balance')
+    asset_ids, liability_ids = [], []
+    live = {'assets': Decimal('0'), 'liabilities': Decimal('0')}
+    for account_id, account_type, balance in accounts:
+        bucket = 'assets' if account_type in Account.ASSET_TYPES else 'liabilities'
+        (asset_ids if bucket == 'assets' else liability_ids).append(account_id)
+        live[bucket] += balance
+
+    series = {'labels': [point.isoformat() for point in points], 'assets': [], 'liabilities': [], 'net_worth': []}
+    if not points:
+        return series
+
+    def bucket_sums(field):
+        return {
+            'assets': Sum(field, filter=Q(account_id__in=asset_ids)),
+            'liabilities': Sum(field, filter=Q(account_id__in=liability_ids)),
+        }
+
+    # Movement of each month from the first point's month onwards (future months included)
+    first = points[0]
+    monthly = BalanceSnapshot.objects.filter(
+        after_month_q(date(first.year, first.month, 1) - timedelta(days=1)),
+        account_id__in=asset_ids + liability_ids,
+    ).values('year', 'month').annotate(**bucket_sums('net_change')).order_by()
+    monthly = {(row['year'], row['month']): row for row in monthly}
+
+    # Day-level movement, only where a point falls before the end of its month
+    day_from = points[0] + timedelta(days=1) if granularity != 'month' else points[-1] + timedelta(days=1)
+    day_to = month_bounds(points[-1].year, points[-1].month)[1]
+    signed_amount = Case(
+        When(transaction_type='income', then=F('amount')),
+        default=-F('amount'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    daily = {}
+    if day_from <= day_to:
+        rows = Transaction.objects.filter(
+            account_id__in=asset_ids + liability_ids,
+            date__gte=day_from,
+            date__lte=day_to,
+        ).values('date').annotate(**bucket_sums(signed_amount)).order_by()
+        daily = {row['date']: row for row in rows}
+
+    # Suffix sums: movement after each month, and movement left in the month after each day
+    last_key = (points[-1].year, points[-1].month)
+    later_assets = sum((row['assets'] or 0 for key, row in monthly.items() if key > last_key), Decimal('0'))
+    later_liabilities = sum((row['liabilities'] or 0 for key, row in monthly.items() if key > last_key), Decimal('0'))
+    months_after = {}
+    for point in reversed(points):
+        key = (point.year, point.month)
+        if key not in months_after:
+            months_after[key] = (later_assets, later_liabilities)
+            row = monthly.get(key)
+            if row:
+                later_assets += row['assets'] or 0
+                later_liabilities += row['liabilities'] or 0
+
+    rest_of_month = {}
+    day = day_to
+    while day >= day_from - timedelta(days=1):
+        if (day + timedelta(days=1)).day == 1:
+            rest_assets = rest_liabilities = Decimal('0')
+        rest_of_month[day] = (rest_assets, rest_liabilities)
+        row = daily.get(day)
+        if row:
+            rest_assets += row['assets'] or 0
+            rest_liabilities += row['liabilities'] or 0
+        day -= timedelta(days=1)
+
+    no_movement = (0, 0)
+    for point in points:
+        month_assets, month_liabilities = months_after[(point.year, point.month)]
+        day_assets, day_liabilities = rest_of_month.get(point, no_movement)
+        assets = live['assets'] - month_assets - day_assets
+        liabilities = live['liabilities'] - month_liabilities - day_liabilities
+        series['assets'].append(float(assets))
+        series['liabilities'].append(float(abs(liabilities)))
+        series['net_worth'].append(float(assets + liabilities))
+    return series
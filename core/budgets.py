@@ -0,0 +1,72 @@
+"""
+Budget vs. actual for a month.
+
+Spend comes from the monthly rollups, joined to the month's budgets in one grouped query, so
+the cost depends on the number of budgeted categories only, never on transaction volume.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Budget
+
+
+def _figures(budget, actual):
+    return {
+        'budget': budget,
+        'actual': actual,
+        'remaining': budget - actual,
+        'percentage': actual / budget * 100 if budget > 0 else Decimal('0'),
+    }
+
+
+def budget_status(user, year, month):
+    """
+    Budget, actual spend, remaining and percentage used for every budgeted expense category
+    of the month, per group and overall. Categories and groups are ordered by name.
+    """
+    rows = Budget.objects.filter(
+        user=user, year=year, month=month, category__group__transaction_type='expenses',
+    ).annotate(
+        spend=FilteredRelation('category__monthly_rollups', condition=Q(
+            category__monthly_rollups__year=year,
+            category__monthly_rollups__month=month,
+            category__monthly_rollups__transaction_type='expenses',
+        )),
+    ).values(
+        'category_id', 'category__name', 'category__group_id', 'category__group__name', 'amount',
+    ).annotate(
+        actual=Coalesce(Sum('spend__total'), Value(0, output_field=DecimalField())),
+    ).order_by('category__group__name', 'category__name')
+
+    categories, groups = [], {}
+    for row in rows:
+        categories.append({
+            'category_id': row['category_id'],
+            'category': row['category__name'],
+            'group_id': row['category__group_id'],
+            'group': row['category__group__name'],
+            **_figures(row['amount'], row['actual']),
+        })
+        group = groups.setdefault(row['category__group_id'], {
+            'group_id': row['category__group_id'],
+            'group': row['category__group__name'],
+            'budget': Decimal('0'),
+            'actual': Decimal('0'),
+        })
+        group['budget'] += row['amount']
+        group['actual'] += row['actual']
+
+    total_budget = sum((group['budget'] for group in groups.values()), Decimal('0'))
+    total_actual = sum((group['actual'] for group in groups.values()), Decimal('0'))
+    return {
+        'year': year,
+        'month': month,
+        'categories': categories,
+        'groups': [
+            {'group_id': group['group_id'], 'group': group['group'], **_figures(group['budget'], group['actual'])}
+            for group in groups.values()
+        ],
+        'totals': _figures(total_budget, total_actual),
+    }
@@ -0,0 +1,107 @@
+"""
+The category tree of the categories pages: groups, their categories, the month's budgets and
+expense spend, and the category count, all from one query.
+
+The tree is loaded on first access and cached per user and month in the user data cache, so
+requests that never render it (JSON answers, redirects) cost nothing, and repeated renders
+cost nothing until the user's categories, budgets or transactions change.
+"""
+from decimal import Decimal
+
+from django.db.models import FilteredRelation, Q
+from django.utils.functional import cached_property
+
+from .datacache import user_data
+from .models import CategoryGroup
+
+# Categories a user is expected to have at most; drives the progress bar on the page
+CATEGORY_LIMIT = 50
+
+
+class CategoryNode:
+    def __init__(self, id, name, icon, description, budget, spent):
+        self.id = id
+        self.name = name
+        self.icon = icon
+        self.description = description
+        self.current_budget = budget
+        self.current_spent = spent
+        self.budget_percentage = min(spent / budget * 100, 100) if budget > 0 else Decimal('0')
+
+
+class GroupNode:
+    def __init__(self, id, name, icon, description, transaction_type):
+        self.id = id
+        self.name = name
+        self.icon = icon
+        self.description = description
+        self.transaction_type = transaction_type
+        self.categories = []
+        self.group_budget_total = Decimal('0')
+        self.group_budget_spent = Decimal('0')
+
+    def add(self, category):
+        self.categories.append(category)
+        self.group_budget_total += category.current_budget
+        self.group_budget_spent += category.current_spent
+
+
+class CategoryTree:
+    """Lazily loaded, cached category tree of a user with the budgets of `year`-`month`."""
+    def __init__(self, user, year, month):
+        self.user = user
+        self.year = year
+        self.month = month
+
+    @cached_property
+    def groups(self):
+        return user_data.get_or_set(self.user.pk, f'categories:{self.year}-{self.month}', self._load)
+
+    @property
+    def expenses_groups(self):
+        return [group for group in self.groups if group.transaction_type == 'expenses']
+
+    @property
+    def income_groups(self):
+        return [group for group in self.groups if group.transaction_type == 'income']
+
+    @property
+    def total_categories(self):
+        return sum(len(group.categories) for group in self.groups)
+
+    @property
+    def categories_progress(self):
+        return min(self.total_categories / CATEGORY_LIMIT * 100, 100)
+
+    @property
+    def budget_map(self):
+        return {
+            category.id: category.current_budget
+            for group in self.groups for category in group.categories if category.current_budget
+        }
+
+    def _load(self):
+        rows = CategoryGroup.objects.filter(user=self.user).annotate(
+            budget=FilteredRelation('categories__budgets', condition=Q(
+                categories__budgets__year=self.year, categories__budgets__month=self.month,
+            )),
+            spend=FilteredRelation('categories__monthly_rollups', condition=Q(
+                categories__monthly_rollups__year=self.year,
+                categories__monthly_rollups__month=self.month,
+                categories__monthly_rollups__transaction_type='expenses',
+            )),
+        ).values_list(
+            'id', 'name', 'icon', 'description', 'transaction_type',
+            'categories__id', 'categories__name', 'categories__icon', 'categories__description',
+            'budget__amount', 'spend__total',
+        ).order_by('name', 'id', 'categories__name', 'categories__id')
+
+        groups = {}
+        for *group_fields, category_id, name, icon, description, budget, spent in rows:
+            group = groups.get(group_fields[0])
+            if group is None:
+                group = groups[group_fields[0]] = GroupNode(*group_fields)
+            # Groups without categories come back as a single row of NULLs
+            if category_id is not None:
+                group.add(CategoryNode(category_id, name, icon, description, budget or Decimal('0'), spent or Decimal('0')))
+        return list(groups.values())
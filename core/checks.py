@@ -0,0 +1,27 @@
+"""
+System checks for the deployment assumptions of core.
+
+The per-user caches (core/locks.py, core/datacache.py, core/rules.py) invalidate the copies of
+every process by bumping a version in the default cache. With a cache private to each process
+the other workers would keep serving stale lock periods, page data and rules.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [Warning(
+        f"The default cache ({backend}) is not shared between processes.",
+        hint="Cutoff locks, cached page data and categorization rules are only invalidated in the process "
+             "that made the change. Use the database cache or Redis (see README), except for single-process tests.",
+        id='core.W001',
+    )]
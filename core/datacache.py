@@ -0,0 +1,198 @@
+"""
+Per-user caches invalidated through version counters.
+
+Every user has a version per cache in the Django cache; a write that changes what the cache
+holds bumps it once committed, so an invalidation is a single counter bump and values stored
+under older versions simply stop being read and expire. The versions are what every process
+agrees on, which only holds for a cache shared by all processes (see settings.CACHES and
+core/checks.py). With the database cache every version read and bump is a query.
+
+* UserVersions is the counter machinery, including the bump on commit;
+* VersionedUserCache keeps one rarely-written value per user, with a process-local copy
+  trusted for `local_ttl` seconds before the shared version is checked again (cutoff locks,
+  categorization rules);
+* UserDataCache (`user_data`) stores computed page fragments under the user's data version,
+  bumped by any write that can change what their pages show (transactions, accounts, budgets,
+  categories).
+"""
+import abc
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+class _PendingInvalidation:
+    """on_commit callback re-bumping a user's version once their change is committed."""
+    def __init__(self, versions, user_id):
+        self.versions = versions
+        self.user_id = user_id
+
+    def __call__(self):
+        self.versions._bump(self.user_id)
+
+
+class UserVersions:
+    """Per-user version counters under `prefix`; subclasses key their values by the version."""
+    prefix = None
+    timeout = 60 * 60
+    stat_names = ()
+    # Counters making up the hit rate: hits out of lookups
+    hit_names = lookup_names = ()
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._stats = dict.fromkeys(self.stat_names, 0)
+
+    def _version_key(self, user_id):
+        return f'{self.prefix}:{user_id}:version'
+
+    def _count(self, name):
+        with self._mutex:
+            self._stats[name] += 1
+
+    def _has_pending_invalidation(self, user_id):
+        # Django drops on_commit callbacks on rollback, so this is exactly "changed in the open transaction"
+        return any(
+            isinstance(entry[1], _PendingInvalidation) and entry[1].versions is self and entry[1].user_id == user_id
+            for entry in connection.run_on_commit
+        )
+
+    def _bypass(self, user_id):
+        """True while our own uncommitted changes would be cached past a rollback."""
+        return connection.in_atomic_block and self._has_pending_invalidation(user_id)
+
+    def version(self, user_id):
+        """Current version of the user, created on first use."""
+        version = cache.get(self._version_key(user_id))
+        if version is None:
+            # Never restart from a fixed number: values of an evicted version may still be cached
+            cache.add(self._version_key(user_id), time.time_ns(), self.timeout)
+            version = cache.get(self._version_key(user_id))
+        return version
+
+    def invalidate(self, user_id):
+        """Retire the user's cached values in every process once the change is committed."""
+        if not connection.in_atomic_block:
+            self._bump(user_id)
+        elif not self._has_pending_invalidation(user_id):
+            # Until the commit other processes read the old rows, which their cached values
+            # match; our own transaction bypasses the cache meanwhile
+            transaction.on_commit(_PendingInvalidation(self, user_id))
+
+    def _bump(self, user_id):
+        # A fresh value rather than incr(), which the database cache runs as a read and a write
+        cache.set(self._version_key(user_id), time.time_ns(), self.timeout)
+
+    def stats(self):
+        with self._mutex:
+            stats = dict(self._stats)
+        lookups = sum(stats[name] for name in self.lookup_names)
+        stats['hit_rate'] = sum(stats[name] for name in self.hit_names) / lookups if lookups else 0.0
+        return stats
+
+    def reset(self):
+        """Forget the counters (the shared layer is left alone)."""
+        with self._mutex:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+class VersionedUserCache(UserVersions, abc.ABC):
+    """
+    One rarely-written, often-read value per user. Subclasses set `prefix` and implement
+    `_load` (user id -> picklable raw value, stored in the Django cache) and `_build` (raw
+    value -> the object handed to callers, kept process-locally).
+    """
+    timeout = 60 * 60 * 24
+    # Seconds a process-local copy is served without checking the shared version, so bursts of
+    # lookups don't each cost a cache round trip. Changes made by this process drop it at once,
+    # those of other processes are seen at most this late.
+    local_ttl = 2
+    stat_names = lookup_names = ('local_hits', 'shared_hits', 'misses')
+    hit_names = ('local_hits', 'shared_hits')
+
+    def __init__(self):
+        super().__init__()
+        self._local = {}
+
+    def _value_key(self, user_id, version):
+        return f'{self.prefix}:{user_id}:{version}'
+
+    @abc.abstractmethod
+    def _load(self, user_id):
+        """The user's raw value, read from the database."""
+
+    @abc.abstractmethod
+    def _build(self, raw):
+        """The object handed to callers for a raw value."""
+
+    def get(self, user_id):
+        """The cached value of the given user, loading it from the database on a miss."""
+        if self._bypass(user_id):
+            self._count('misses')
+            return self._build(self._load(user_id))
+
+        checked_at = time.monotonic()
+        local = self._local.get(user_id)
+        if local is not None and checked_at - local[2] < self.local_ttl:
+            self._count('local_hits')
+            return local[1]
+
+        version = self.version(user_id)
+        if local is not None and local[0] == version:
+            self._local[user_id] = (version, local[1], checked_at)
+            self._count('local_hits')
+            return local[1]
+
+        raw = cache.get(self._value_key(user_id, version))
+        if raw is not None:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            raw = self._load(user_id)
+            cache.set(self._value_key(user_id, version), raw, self.timeout)
+
+        value = self._build(raw)
+        self._local[user_id] = (version, value, checked_at)
+        return value
+
+    def _bump(self, user_id):
+        self._local.pop(user_id, None)
+        super()._bump(user_id)
+
+    def reset(self):
+        """Forget the process-local layer and the counters (the shared layer is left alone)."""
+        with self._mutex:
+            self._local.clear()
+        super().reset()
+
+
+class UserDataCache(UserVersions):
+    prefix = 'user_data'
+    stat_names = ('hits', 'misses', 'bypassed')
+    # Bypassed reads never consult the cache and don't count against it
+    hit_names, lookup_names = ('hits',), ('hits', 'misses')
+
+    def _fragment_key(self, user_id, version, name):
+        return f'{self.prefix}:{user_id}:{version}:{name}'
+
+    def get_or_set(self, user_id, name, build):
+        """Return the cached fragment `name` of the user, computing it with `build()` on a miss."""
+        if self._bypass(user_id):
+            self._count('bypassed')
+            return build()
+
+        key = self._fragment_key(user_id, self.version(user_id), name)
+        value = cache.get(key)
+        if value is not None:
+            self._count('hits')
+            return value
+
+        self._count('misses')
+        value = build()
+        cache.set(key, value, self.timeout)
+        return value
+
+
+user_data = UserDataCache()
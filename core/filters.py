@@ -0,0 +1,52 @@
+from django.db.models import Count, Q, Sum
+
+from .models import Transaction
+
+
+class TransactionFilter:
+    """
+    Transactions page filters (search, category, account, date range), parsed once from
+    the query string and shared by the listing, the infinite scroll endpoint and the summary.
+    """
+    params = ('search', 'category', 'account', 'start_date', 'end_date')
+
+    def __init__(self, user, data):
+        self.user = user
+        self.search = data.get('search') or ''
+        self.category_id = data.get('category') or ''
+        self.account_id = data.get('account') or ''
+        self.start_date = data.get('start_date') or ''
+        self.end_date = data.get('end_date') or ''
+
+    @property
+    def is_active(self):
+        return any([self.search, self.category_id, self.account_id, self.start_date, self.end_date])
+
+    def as_q(self):
+        q = Q(user=self.user)
+        if self.search:
+            q &= Q(description__icontains=self.search)
+        if self.category_id:
+            q &= Q(category_id=self.category_id)
+        if self.account_id:
+            q &= Q(account_id=self.account_id)
+        if self.start_date:
+            q &= Q(date__gte=self.start_date)
+        if self.end_date:
+            q &= Q(date__lte=self.end_date)
+        return q
+
+    def queryset(self):
+        return Transaction.objects.filter(self.as_q())
+
+    def summary(self):
+        """Income, expenses, net flow and row count of the filtered set in one aggregate."""
+        totals = self.queryset().aggregate(
+            total_income=Sum('amount', filter=Q(transaction_type='income')),
+            total_expenses=Sum('amount', filter=Q(transaction_type='expenses')),
+            transaction_count=Count('id'),
+        )
+        totals['total_income'] = totals['total_income'] or 0
+        totals['total_expenses'] = totals['total_expenses'] or 0
+        totals['net_flow'] = totals['total_income'] - totals['total_expenses']
+        return totals
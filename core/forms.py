@@ -3,7 +3,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from .models import Transaction, Category, Account, CutoffReport, Budget
+from .models import Transaction, Category, Account, CutoffReport, Budget, CategorizationRule
+from .rules import categorization_rules
 
 class CustomUserCreationForm(UserCreationForm):
     first_name = forms.CharField(label=_("First name"), max_length=30, required=True, help_text=_('Required.'))
@@ -70,10 +71,69 @@ class TransactionForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
+        # Already-loaded lists can be passed in so rendering the choices doesn't query again
+        categories = kwargs.pop('categories', None)
+        accounts = kwargs.pop('accounts', None)
         super().__init__(*args, **kwargs)
+        self.user = user
         if user:
             self.fields['category'].queryset = Category.objects.filter(group__user=user)
             self.fields['account'].queryset = Account.objects.filter(user=user)
+            # Left empty, the user's categorization rules pick it (see clean)
+            self.fields['category'].required = False
+        if categories is not None:
+            self._set_loaded_choices('category', categories)
+        if accounts is not None:
+            self._set_loaded_choices('account', accounts)
+
+    def _set_loaded_choices(self, name, objects):
+        field = self.fields[name]
+        empty = [('', field.empty_label)] if field.empty_label is not None else []
+        field.choices = empty + [(obj.pk, str(obj)) for obj in objects]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.user is None or cleaned_data.get('category') or self.has_error('category'):
+            return cleaned_data
+        rule = categorization_rules.classify(self.user.pk, cleaned_data.get('description'), cleaned_data.get('amount'))
+        category = self.fields['category'].queryset.filter(pk=rule.category_id).first() if rule else None
+        if category is None:
+            self.add_error('category', self.fields['category'].error_messages['required'])
+            return cleaned_data
+        cleaned_data['category'] = category
+        if rule.account_id and not cleaned_data.get('account'):
+            cleaned_data['account'] = self.fields['account'].queryset.filter(pk=rule.account_id).first()
+        return cleaned_data
+
+class TransactionBulkEditForm(forms.Form):
+    """New category, account and/or date for a selection of transactions; empty fields are kept."""
+    category = forms.ModelChoiceField(queryset=Category.objects.none(), required=False)
+    account = forms.ModelChoiceField(queryset=Account.objects.none(), required=False)
+    date = forms.DateField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user')
+        super().__init__(*args, **kwargs)
+        self.fields['category'].queryset = Category.objects.filter(group__user=user).select_related('group')
+        self.fields['account'].queryset = Account.objects.filter(user=user)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not any(cleaned_data.get(name) for name in ('category', 'account', 'date')):
+            raise forms.ValidationError(_("choose_a_category_account_or_date"))
+        return cleaned_data
+
+class CategorizationRuleForm(forms.ModelForm):
+    class Meta:
+        model = CategorizationRule
+        fields = ['match_type', 'pattern', 'min_amount', 'max_amount', 'category', 'account', 'priority']
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user')
+        kwargs.setdefault('instance', CategorizationRule(user=user))
+        super().__init__(*args, **kwargs)
+        self.fields['category'].queryset = Category.objects.filter(group__user=user)
+        self.fields['account'].queryset = Account.objects.filter(user=user)
 
 class BudgetForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,250 @@
+"""
+Streaming import of bank exports (CSV / OFX).
+
+Records are parsed lazily from the file and imported in fixed-size batches: every batch
+checks the cached locked periods, then does one bulk INSERT and one balance UPDATE per account,
+so large exports never go through the per-row Transaction.save() path. Each batch commits on
+its own, so a file that turns unreadable midway keeps the rows imported before that point and
+the result says where it stopped.
+"""
+import csv
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from . import ledger
+from .locks import cutoff_locks
+from .models import Account, Category, Transaction
+from .rules import categorization_rules
+
+DEFAULT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d')
+# Bulk inserts skip full_clean, so amounts are held to the column's digits here
+AMOUNT_FIELD = Transaction._meta.get_field('amount')
+
+# Header aliases seen in common bank CSV exports
+CSV_COLUMNS = {
+    'date': ('date', 'posted', 'posting date', 'transaction date'),
+    'description': ('description', 'memo', 'name', 'payee', 'details'),
+    'amount': ('amount', 'value'),
+    'category': ('category',),
+    'account': ('account',),
+}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    # {'after_line', 'message'} when the file could not be read to the end
+    aborted: dict = None
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'message': str(message)})
+
+    def as_dict(self):
+        return {'created': self.created, 'skipped': self.skipped, 'errors': self.errors, 'aborted': self.aborted}
+
+
+def parse_amount(value):
+    """Parse '1,234.50', '$-12.00' or '(12.00)' into a signed Decimal."""
+    text = (value or '').strip().replace(',', '').replace('$', '').replace(' ', '')
+    negative = text.startswith('(') and text.endswith(')')
+    text = text.strip('()')
+    try:
+        amount = Decimal(text).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ImportRowError(f"Invalid amount: {value!r}")
+    return -amount if negative else amount
+
+
+def parse_date(value, formats=DATE_FORMATS):
+    text = (value or '').strip()[:10]
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ImportRowError(f"Invalid date: {value!r}")
+
+
+def iter_csv_records(stream):
+    """Yield (line number, record dict) from a CSV export with a header row."""
+    reader = csv.reader(stream)
+    try:
+        header = [name.strip().casefold() for name in next(reader)]
+    except StopIteration:
+        return
+
+    columns = {}
+    for key, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                columns[key] = header.index(alias)
+                break
+    missing = {'date', 'amount'} - columns.keys()
+    if missing:
+        raise ImportRowError(f"Missing required columns: {', '.join(sorted(missing))}")
+
+    for line, row in enumerate(reader, start=2):
+        if not any(row):
+            continue
+        yield line, {key: row[index] if index < len(row) else '' for key, index in columns.items()}
+
+
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)')
+
+
+def iter_ofx_records(stream):
+    """Yield (line number, record dict) for each <STMTTRN> of an OFX (SGML or XML) statement."""
+    record, start_line = None, 0
+    for line_number, line in enumerate(stream, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            if tag == 'STMTTRN':
+                if closing:
+                    if record is not None:
+                        yield start_line, record
+                    record = None
+                else:
+                    record, start_line = {}, line_number
+            elif record is not None and not closing:
+                value = value.strip()
+                if tag == 'DTPOSTED':
+                    record['date'] = value[:8]
+                elif tag == 'TRNAMT':
+                    record['amount'] = value
+                elif tag == 'NAME' or (tag == 'MEMO' and not record.get('description')):
+                    record['description'] = value
+
+
+class TransactionImporter:
+    """
+    Import parsed records for one user. Rows name their category/account by name; rows
+    without a known category get the one of the first matching categorization rule, failing
+    that `expense_category` (money out, negative amounts) or `income_category` (money in).
+    Rows without an account go to `account`, or when there is none to the rule's account.
+    """
+    def __init__(self, user, account=None, expense_category=None, income_category=None,
+                 batch_size=DEFAULT_BATCH_SIZE, date_formats=DATE_FORMATS):
+        self.user = user
+        self.account = account
+        self.expense_category = expense_category
+        self.income_category = income_category
+        self.batch_size = batch_size
+        self.date_formats = date_formats
+
+        # Everything needed to map a row is loaded up-front, rows never query
+        categories = Category.objects.filter(group__user=user).select_related('group')
+        self.categories = {category.name.casefold(): category for category in categories}
+        self.accounts = {account.name.casefold(): account for account in Account.objects.filter(user=user)}
+        for category in (expense_category, income_category):
+            if category is not None:
+                self.categories.setdefault(category.name.casefold(), category)
+        self.categories_by_id = {category.pk: category for category in self.categories.values()}
+        self.accounts_by_id = {account.pk: account for account in self.accounts.values()}
+        self.rules = categorization_rules.get(user.pk)
+
+    def run(self, records):
+        """
+        Import `records` batch by batch. This is not all-or-nothing: batches commit as they go,
+        so when the file turns unreadable midway `result.aborted` says after which line, and the
+        rows before it stay imported.
+        """
+        result = ImportResult()
+        records = self._readable(records, result)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                return result
+            self._import_batch(batch, result)
+
+    def _readable(self, records, result):
+        """The records up to the first one the reader fails on, noting the failure in `result`."""
+        line = None
+        try:
+            for line, record in records:
+                yield line, record
+        except (ImportRowError, UnicodeDecodeError, csv.Error) as exc:
+            result.aborted = {'after_line': line, 'message': str(exc)}
+
+    def build(self, record):
+        amount = parse_amount(record.get('amount'))
+        try:
+            AMOUNT_FIELD.run_validators(abs(amount))
+        except ValidationError:
+            raise ImportRowError(f"Invalid amount: {record.get('amount')!r}")
+        day = parse_date(record.get('date'), self.date_formats)
+
+        description = (record.get('description') or '').strip()
+        rule = self.rules.classify(description, amount) if self.rules else None
+
+        category_name = (record.get('category') or '').strip()
+        category = self.categories.get(category_name.casefold()) if category_name else None
+        if category is None and rule is not None:
+            category = self.categories_by_id.get(rule.category_id)
+        if category is None:
+            category = self.income_category if amount > 0 else self.expense_category
+        if category is None:
+            raise ImportRowError(f"Unknown category: {category_name!r}" if category_name else "No category for row")
+
+        account_name = (record.get('account') or '').strip()
+        account = self.account
+        if account_name:
+            account = self.accounts.get(account_name.casefold())
+            if account is None:
+                raise ImportRowError(f"Unknown account: {account_name!r}")
+        elif account is None and rule is not None and rule.account_id:
+            account = self.accounts_by_id.get(rule.account_id)
+
+        description = description or category.name
+        return Transaction(
+            user=self.user,
+            account=account,
+            category=category,
+            transaction_type=category.group.transaction_type,
+            amount=abs(amount),
+            description=description[:255],
+            date=day,
+        )
+
+    def _import_batch(self, batch, result):
+        transactions = []
+        for line, record in batch:
+            try:
+                tx = self.build(record)
+            except ImportRowError as exc:
+                result.add_error(line, exc)
+                continue
+            transactions.append((line, tx))
+        if not transactions:
+            return
+
+        locked = cutoff_locks.get(self.user.pk)
+        if locked:
+            unlocked = []
+            for line, tx in transactions:
+                if locked.contains(tx.date):
+                    result.add_error(line, _("this_period_is_locked_by_a_cutoff_report"))
+                else:
+                    unlocked.append((line, tx))
+            transactions = unlocked
+
+        rows = [tx for _, tx in transactions]
+        with transaction.atomic():
+            Transaction.objects.bulk_create(rows, batch_size=self.batch_size)
+            ledger.apply_transactions(rows)
+        result.created += len(rows)
@@ -0,0 +1,169 @@
+"""
+Set-based bookkeeping of account balances, balance snapshots and rollups, for single
+Transaction saves and deletes as well as for writes that bypass them (bulk_create, queryset
+updates and deletes). Effects are aggregated in Python first so every account and every
+rollup bucket is touched once per batch, not once per row.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .datacache import user_data
+from .models import Account, BalanceSnapshot, MonthlyCategoryRollup
+
+
+def balance_deltas(transactions, sign=1, deltas=None):
+    """
+    Net balance change per account id for the given transactions (sign=-1 to revert them).
+    Pass the result of a previous call as `deltas` to accumulate into it.
+    """
+    deltas = defaultdict(Decimal) if deltas is None else deltas
+    for tx in transactions:
+        if tx.account_id:
+            deltas[tx.account_id] += tx.amount * tx.balance_factor * sign
+    return deltas
+
+
+def snapshot_deltas(transactions, sign=1, deltas=None):
+    """Net balance change per (user, account, year, month) snapshot row."""
+    deltas = defaultdict(Decimal) if deltas is None else deltas
+    for tx in transactions:
+        if tx.account_id:
+            deltas[(tx.user_id, tx.account_id, tx.date.year, tx.date.month)] += tx.amount * tx.balance_factor * sign
+    return deltas
+
+
+def rollup_deltas(transactions, sign=1, deltas=None):
+    """Total and count change per (user, year, month, category, type) rollup bucket."""
+    deltas = defaultdict(lambda: [Decimal('0'), 0]) if deltas is None else deltas
+    for tx in transactions:
+        bucket = deltas[(tx.user_id, tx.date.year, tx.date.month, tx.category_id, tx.transaction_type)]
+        bucket[0] += tx.amount * sign
+        bucket[1] += sign
+    return deltas
+
+
+def apply_balance_deltas(deltas):
+    for account_id, delta in deltas.items():
+        if delta:
+            Account.objects.filter(pk=account_id).update(balance=F('balance') + delta)
+
+
+def adjust_balance(account_id, delta):
+    """
+    Add `delta` to an account's balance. Returns the new balance where the backend can hand it
+    back from the UPDATE itself (Postgres, RETURNING), None elsewhere.
+    """
+    if connection.vendor != 'postgresql':
+        Account.objects.filter(pk=account_id).update(balance=F('balance') + delta)
+        return None
+
+    quote = connection.ops.quote_name
+    column = quote(Account._meta.get_field('balance').column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote(Account._meta.db_table)} SET {column} = {column} + %s "
+            f"WHERE {quote(Account._meta.pk.column)} = %s RETURNING {column}",
+            [delta, account_id],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def apply_snapshot_deltas(deltas):
+    for (user_id, account_id, year, month), delta in deltas.items():
+        if delta:
+            BalanceSnapshot.apply(user_id, account_id, date(year, month, 1), delta)
+
+
+def apply_rollup_deltas(deltas):
+    for (user_id, year, month, category_id, transaction_type), (total, count) in deltas.items():
+        if total or count:
+            MonthlyCategoryRollup.apply(user_id, date(year, month, 1), category_id, transaction_type, total, count)
+
+
+def apply_change(before, after):
+    """
+    Apply the net effect of replacing transaction `before` with `after` (None for a create or
+    a delete). Every account, snapshot row and rollup bucket is touched once, and only if its
+    numbers actually move: an edit keeping amount, account, category and date costs nothing.
+    Returns {account id: new balance or None} for the accounts whose balance was updated.
+    """
+    removed = [before] if before is not None else []
+    added = [after] if after is not None else []
+
+    balances = {
+        account_id: adjust_balance(account_id, delta)
+        for account_id, delta in balance_deltas(added, 1, balance_deltas(removed, -1)).items()
+        if delta
+    }
+    apply_snapshot_deltas(snapshot_deltas(added, 1, snapshot_deltas(removed, -1)))
+    apply_rollup_deltas(rollup_deltas(added, 1, rollup_deltas(removed, -1)))
+    return balances
+
+
+def aggregate_buckets(transactions):
+    """
+    A Transaction queryset grouped by everything the bookkeeping keys on (user, account, month,
+    category, type), with the total and count of every group, in one query.
+    """
+    return list(transactions.annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values(
+        'user_id', 'account_id', 'year', 'month', 'category_id', 'transaction_type'
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by())
+
+
+def bucket_deltas(buckets, sign=1, deltas=None):
+    """
+    (balance, snapshot, rollup) deltas of aggregated buckets, keyed like balance_deltas(),
+    snapshot_deltas() and rollup_deltas(). Pass a previous result as `deltas` to accumulate.
+    """
+    if deltas is None:
+        deltas = (defaultdict(Decimal), defaultdict(Decimal), defaultdict(lambda: [Decimal('0'), 0]))
+    balances, snapshots, rollups = deltas
+    for bucket in buckets:
+        if bucket['account_id']:
+            movement = (bucket['total'] if bucket['transaction_type'] == 'income' else -bucket['total']) * sign
+            balances[bucket['account_id']] += movement
+            snapshots[(bucket['user_id'], bucket['account_id'], bucket['year'], bucket['month'])] += movement
+        rollup = rollups[(bucket['user_id'], bucket['year'], bucket['month'], bucket['category_id'], bucket['transaction_type'])]
+        rollup[0] += bucket['total'] * sign
+        rollup[1] += bucket['count'] * sign
+    return deltas
+
+
+def apply_deltas(deltas):
+    balances, snapshots, rollups = deltas
+    apply_balance_deltas(balances)
+    apply_snapshot_deltas(snapshots)
+    apply_rollup_deltas(rollups)
+
+
+def revert_queryset(transactions):
+    """
+    Revert the balance, snapshot and rollup effects of a Transaction queryset about to be
+    deleted in bulk, from one grouped aggregate over it. Returns the ids of the affected users.
+    """
+    buckets = aggregate_buckets(transactions)
+    apply_deltas(bucket_deltas(buckets, -1))
+    return {bucket['user_id'] for bucket in buckets}
+
+
+def apply_transactions(transactions, sign=1):
+    """
+    Apply (sign=1) or revert (sign=-1) the balance, snapshot and rollup effects of in-memory
+    transactions, and retire the cached pages of their users.
+    """
+    transactions = list(transactions)
+    apply_balance_deltas(balance_deltas(transactions, sign))
+    apply_snapshot_deltas(snapshot_deltas(transactions, sign))
+    apply_rollup_deltas(rollup_deltas(transactions, sign))
+    for user_id in {tx.user_id for tx in transactions}:
+        user_data.invalidate(user_id)
+
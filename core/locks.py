@@ -0,0 +1,57 @@
+"""
+Cache of each user's locked cutoff periods.
+
+Locked periods change rarely (a report is created, deleted or its lock toggled) but are
+checked on every transaction write, so they are kept as merged, sorted intervals and
+answered with a bisect instead of a query. They are a VersionedUserCache (see
+core/datacache.py): the Django cache, shared by all processes, holds a per-user version
+counter plus the interval list, and a process-local dict keeps the parsed intervals for as
+long as the shared version has not moved.
+"""
+import bisect
+from datetime import timedelta
+
+from .datacache import VersionedUserCache
+
+CACHE_PREFIX = 'cutoff_locks'
+
+
+class LockedIntervals:
+    """Sorted, non-overlapping (start, end) date intervals with O(log n) containment checks."""
+    def __init__(self, intervals=()):
+        merged = []
+        for start, end in sorted(intervals):
+            # Overlapping or back-to-back periods collapse into one interval
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def contains(self, day):
+        index = bisect.bisect_right(self.starts, day) - 1
+        return index >= 0 and self.ends[index] >= day
+
+
+class CutoffLockCache(VersionedUserCache):
+    prefix = CACHE_PREFIX
+
+    def _load(self, user_id):
+        from .models import CutoffReport
+        return CutoffReport.locked_intervals(user_id)
+
+    def _build(self, raw):
+        return LockedIntervals(raw)
+
+    def is_locked(self, user_id, day):
+        return self.get(user_id).contains(day)
+
+
+cutoff_locks = CutoffLockCache()
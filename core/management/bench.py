@@ -0,0 +1,39 @@
+"""
+Scaffolding shared by the bench_* commands: a run seeds its own data and measures inside one
+transaction, which is rolled back at the end unless --keep is given. Randomness comes from one
+random.Random seeded with --seed, so runs are repeatable.
+"""
+import abc
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.synthetic import generate_user
+
+
+class BenchCommand(BaseCommand, abc.ABC):
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help="Keep the generated data.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self.bench(rng, **options)
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    @abc.abstractmethod
+    def bench(self, rng, **options):
+        """Seed, measure and write the results."""
+
+    def bench_username(self, rng):
+        return f"bench_{rng.randrange(10**9)}"
+
+    def bench_user(self, rng, transactions, days, batch_size):
+        """A synthetic user (see core.synthetic) with `transactions` over the last `days` days, no budgets or reports."""
+        return generate_user(
+            self.bench_username(rng), transactions=transactions, days=days, budget_months=0, reports=0,
+            rng=rng, batch_size=batch_size,
+        )
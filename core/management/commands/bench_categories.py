@@ -0,0 +1,102 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.categorytree import CATEGORY_LIMIT, CategoryTree
+from core.management.bench import BenchCommand
+from core.models import Budget, Category, CategoryGroup, MonthlyCategoryRollup
+from core.views import CategoriesView, CategoryCreateView
+
+CATEGORIES_PER_GROUP = 10
+
+
+class Command(BenchCommand):
+    help = (
+        "Time the categories page for users with increasing numbers of categories: building "
+        "the category tree, rendering the page from the cached tree, and an XHR form error. "
+        "Everything is rolled back afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, nargs='+', default=[CATEGORY_LIMIT, 1_000],
+                            help="Categories of the user, one run per value.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per measurement.")
+        super().add_arguments(parser)
+
+    def bench(self, rng, **options):
+        self.factory = RequestFactory()
+        results = []
+        for count in options['categories']:
+            user = self._seed(rng, count)
+            results.append((count, *self._measure(user, options['repeat'])))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nResults ({connection.vendor}, median ms / queries)"))
+        self.stdout.write(f"{'categories':>10} {'tree build':>16} {'cached page':>16} {'xhr error':>16}")
+        for count, *measurements in results:
+            cells = ' '.join(f"{f'{ms:.1f} / {queries}':>16}" for ms, queries in measurements)
+            self.stdout.write(f"{count:>10,} {cells}")
+
+    def _seed(self, rng, count):
+        # Not generate_user(): its category tree has a fixed size, and its ledger updates leave
+        # cache invalidations pending, which would make the cached runs bypass the cache
+        user = get_user_model().objects.create_user(username=self.bench_username(rng))
+        groups = CategoryGroup.objects.bulk_create([
+            CategoryGroup(user=user, name=f"Group {index}", transaction_type='expenses' if index % 5 else 'income')
+            for index in range((count + CATEGORIES_PER_GROUP - 1) // CATEGORIES_PER_GROUP)
+        ])
+        categories = Category.objects.bulk_create([
+            Category(group=groups[index // CATEGORIES_PER_GROUP], name=f"Category {index}")
+            for index in range(count)
+        ])
+
+        now = timezone.now()
+        expense_categories = [c for c in categories if c.group.transaction_type == 'expenses']
+        budgeted = rng.sample(expense_categories, k=len(expense_categories) // 2)
+        Budget.objects.bulk_create([
+            Budget(user=user, category=category, year=now.year, month=now.month,
+                   amount=Decimal(rng.randint(50, 1000)))
+            for category in budgeted
+        ])
+        MonthlyCategoryRollup.objects.bulk_create([
+            MonthlyCategoryRollup(user=user, category=category, year=now.year, month=now.month,
+                                  transaction_type=category.group.transaction_type,
+                                  total=Decimal(rng.randint(100, 100_000)) / 100, count=1)
+            for category in categories
+        ])
+        return user
+
+    def _measure(self, user, repeat):
+        now = timezone.now()
+        build = self._time(repeat, lambda: CategoryTree(user, now.year, now.month)._load())
+
+        def page():
+            request = self.factory.get('/categories/')
+            request.user = user
+            CategoriesView.as_view()(request).render()
+
+        page()  # fills the cache
+        cached = self._time(repeat, page)
+
+        def xhr_error():
+            request = self.factory.post('/categories/create/', {'name': ''}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            request.user = user
+            request._dont_enforce_csrf_checks = True
+            CategoryCreateView.as_view()(request)
+
+        return build, cached, self._time(repeat, xhr_error)
+
+    def _time(self, repeat, call):
+        timings, queries = [], 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                call()
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, len(ctx.captured_queries))
+        return statistics.median(timings), queries
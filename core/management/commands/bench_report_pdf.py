@@ -0,0 +1,66 @@
+import io
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.db import connection
+
+from core.management.bench import BenchCommand
+from core.models import CutoffReport
+from core.reports import build_report_pdf
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Command(BenchCommand):
+    help = (
+        "Render cutoff report PDFs for periods of increasing size and report render time, "
+        "peak Python allocations and the process' peak RSS. "
+        "Everything is rolled back afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                            help="Transactions in the report period, one run per value.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        super().add_arguments(parser)
+
+    def bench(self, rng, **options):
+        results = []
+        # Ascending sizes, so each run's RSS high-water mark is its own
+        for rows in sorted(options['rows']):
+            user = self.bench_user(rng, rows, days=365, batch_size=options['batch_size'])
+            end = date.today()
+            report = CutoffReport.objects.create(
+                user=user, name=f"Bench {rows}", start_date=end - timedelta(days=364), end_date=end,
+            )
+            results.append((rows, *self._render(report)))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nResults ({connection.vendor})"))
+        self.stdout.write(f"{'rows':>10} {'seconds':>10} {'pdf MB':>10} {'py peak MB':>12} {'peak RSS MB':>12}")
+        for rows, seconds, size, traced, rss in results:
+            rss = f"{rss:>12.1f}" if rss is not None else f"{'n/a':>12}"
+            self.stdout.write(f"{rows:>10,} {seconds:>10.2f} {size / 2**20:>10.2f} {traced / 2**20:>12.1f} {rss}")
+
+    def _render(self, report):
+        tracemalloc.start()
+        started = time.perf_counter()
+        buffer = io.BytesIO()
+        build_report_pdf(report, buffer)
+        seconds = time.perf_counter() - started
+        size = buffer.tell()
+        _, traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return seconds, size, traced, peak_rss_mb()
@@ -0,0 +1,80 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.db import connection
+from django.db.models import Sum, Q
+
+from core.management.bench import BenchCommand
+from core.models import Transaction
+
+
+class Command(BenchCommand):
+    help = (
+        "Compare query plans and timings of the join-based (category__group__transaction_type) "
+        "and denormalized (transaction_type) aggregates on a synthetic dataset. "
+        "Everything is rolled back afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Transactions to generate.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        super().add_arguments(parser)
+
+    def bench(self, rng, **options):
+        user = self.bench_user(rng, options['rows'], days=3650, batch_size=options['batch_size'])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for table in ('core_transaction', 'core_category', 'core_categorygroup'):
+                    cursor.execute(f'ANALYZE {table}')
+
+        results = []
+        for label, join_qs, flat_qs in self._queries(user):
+            for variant, qs in (('join', join_qs), ('denormalized', flat_qs)):
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label} [{variant}]"))
+                self.stdout.write(qs.explain())
+                timings = self._time(qs, options['repeat'])
+                results.append((label, variant, min(timings), statistics.median(timings)))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nResults ({options['rows']:,} rows, {connection.vendor})"))
+        self.stdout.write(f"{'query':<28} {'variant':<14} {'best ms':>10} {'median ms':>10}")
+        for label, variant, best, median in results:
+            self.stdout.write(f"{label:<28} {variant:<14} {best:>10.1f} {median:>10.1f}")
+
+    def _queries(self, user):
+        base = Transaction.objects.filter(user=user).order_by()
+        year_ago = date.today() - timedelta(days=365)
+        return [
+            (
+                'totals by type (1y)',
+                base.filter(date__gte=year_ago).values('category__group__transaction_type').annotate(total=Sum('amount')),
+                base.filter(date__gte=year_ago).values('transaction_type').annotate(total=Sum('amount')),
+            ),
+            (
+                'conditional income/expense',
+                base.values('user').annotate(
+                    income=Sum('amount', filter=Q(category__group__transaction_type='income')),
+                    expense=Sum('amount', filter=Q(category__group__transaction_type='expenses')),
+                ),
+                base.values('user').annotate(
+                    income=Sum('amount', filter=Q(transaction_type='income')),
+                    expense=Sum('amount', filter=Q(transaction_type='expenses')),
+                ),
+            ),
+            (
+                'expense breakdown (1y)',
+                base.filter(date__gte=year_ago, category__group__transaction_type='expenses')
+                    .values('category_id').annotate(total=Sum('amount')),
+                base.filter(date__gte=year_ago, transaction_type='expenses')
+                    .values('category_id').annotate(total=Sum('amount')),
+            ),
+        ]
+
+    def _time(self, qs, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(qs.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
@@ -0,0 +1,53 @@
+import random
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import generate_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic users with categories, accounts of every type, transactions, budgets "
+        "and cutoff reports, for benchmarks and `manage.py load_test`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--transactions', type=int, default=10_000, help="Transactions per user.")
+        parser.add_argument('--days', type=int, default=730, help="Days of history, ending today.")
+        parser.add_argument('--accounts-per-type', type=int, default=1)
+        parser.add_argument('--budget-months', type=int, default=3)
+        parser.add_argument('--reports', type=int, default=6, help="Monthly cutoff reports per user.")
+        parser.add_argument('--prefix', default='demo', help="Usernames are <prefix>1..<prefix>N.")
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        usernames = [f"{options['prefix']}{i}" for i in range(1, options['users'] + 1)]
+        taken = set(get_user_model().objects.filter(username__in=usernames).values_list('username', flat=True))
+        if taken:
+            raise CommandError(f"Users already exist: {', '.join(sorted(taken))}. Pick another --prefix.")
+
+        rng = random.Random(options['seed'])
+        for username in usernames:
+            started = time.perf_counter()
+            generate_user(
+                username,
+                transactions=options['transactions'],
+                days=options['days'],
+                end=date.today(),
+                accounts_per_type=options['accounts_per_type'],
+                budget_months=options['budget_months'],
+                reports=options['reports'],
+                password=options['password'],
+                rng=rng,
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(
+                f"{username}: {options['transactions']:,} transactions in {time.perf_counter() - started:.1f} s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Created {len(usernames)} users (password {options['password']!r})."))
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import (
+    DEFAULT_BATCH_SIZE, TransactionImporter, iter_csv_records, iter_ofx_records,
+)
+from core.models import Account, Category
+
+
+class Command(BaseCommand):
+    help = "Bulk import transactions for a user from a CSV or OFX bank export."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Username that owns the imported transactions.")
+        parser.add_argument('--account', help="Account name used for rows without an account column.")
+        parser.add_argument('--expense-category', help="Category name for outgoing rows without a known category.")
+        parser.add_argument('--income-category', help="Category name for incoming rows without a known category.")
+        parser.add_argument('--format', choices=['csv', 'ofx'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Unknown user {options['user']!r}")
+
+        account = self._lookup(Account.objects.filter(user=user), options['account'])
+        categories = Category.objects.filter(group__user=user).select_related('group')
+        expense_category = self._lookup(categories, options['expense_category'])
+        income_category = self._lookup(categories, options['income_category'])
+
+        path = options['path']
+        fmt = options['format'] or ('ofx' if path.lower().endswith(('.ofx', '.qfx')) else 'csv')
+        reader = iter_ofx_records if fmt == 'ofx' else iter_csv_records
+
+        importer = TransactionImporter(
+            user,
+            account=account,
+            expense_category=expense_category,
+            income_category=income_category,
+            batch_size=options['batch_size'],
+        )
+        with open(path, encoding='utf-8-sig', newline='') as stream:
+            result = importer.run(reader(stream))
+        if result.aborted and not result.created:
+            raise CommandError(result.aborted['message'])
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['message']}")
+        if result.aborted:
+            self.stderr.write(f"stopped after line {result.aborted['after_line']}: {result.aborted['message']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} transactions ({result.skipped} skipped)."
+        ))
+
+    def _lookup(self, queryset, name):
+        if not name:
+            return None
+        obj = queryset.filter(name__iexact=name).first()
+        if obj is None:
+            raise CommandError(f"Unknown {queryset.model._meta.verbose_name} {name!r}")
+        return obj
@@ -0,0 +1,145 @@
+import http.cookiejar
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analytics import month_bounds, shift_month
+
+FLOWS = ('dashboard', 'transactions', 'charts', 'cutoff', 'pdf')
+
+
+class Session:
+    """One logged-in virtual user: a cookie jar plus the CSRF token Django handed out."""
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def request(self, path, data=None):
+        """Return (status, final url, body); the body is read fully so timings include transfer."""
+        url = self.base_url + path
+        headers = {'Referer': url}
+        if data is not None:
+            data = urllib.parse.urlencode({**data, 'csrfmiddlewaretoken': self.csrf_token()}).encode()
+        try:
+            with self.opener.open(urllib.request.Request(url, data=data, headers=headers), timeout=self.timeout) as response:
+                return response.status, response.geturl(), response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, url, exc.read()
+
+    def login(self, prefix, username, password):
+        self.request(f'{prefix}/login/')
+        status, final_url, _ = self.request(f'{prefix}/login/', {'username': username, 'password': password})
+        if status >= 400 or final_url.rstrip('/').endswith('/login'):
+            raise CommandError(f"Could not log in as {username!r} at {self.base_url}{prefix}/login/")
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the dashboard, transactions, charts, cutoff and PDF flows of a running server "
+        "(runserver, gunicorn, ...) with concurrent logged-in users and report throughput and "
+        "latency percentiles per request. Create the users with `manage.py generate_finance_data`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--language-prefix', default='/en', help="i18n URL prefix of the site.")
+        parser.add_argument('--user-prefix', default='demo', help="Log in as <prefix>1..<prefix>N.")
+        parser.add_argument('--users', type=int, default=1, help="Distinct accounts to log in as.")
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--concurrency', type=int, default=4, help="Virtual users running flows in parallel.")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run.")
+        parser.add_argument('--flows', nargs='+', choices=FLOWS, default=list(FLOWS))
+        parser.add_argument('--timeout', type=float, default=60)
+
+    def handle(self, *args, **options):
+        self.prefix = options['language_prefix'].rstrip('/')
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.mutex = threading.Lock()
+
+        sessions = []
+        for worker in range(options['concurrency']):
+            session = Session(options['base_url'], options['timeout'])
+            username = f"{options['user_prefix']}{worker % options['users'] + 1}"
+            session.login(self.prefix, username, options['password'])
+            sessions.append(session)
+
+        deadline = time.monotonic() + options['duration']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+            for future in [pool.submit(self.run_user, session, options['flows'], deadline) for session in sessions]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        self.report(elapsed, options['concurrency'])
+
+    def run_user(self, session, flows, deadline):
+        report_id = None
+        while time.monotonic() < deadline:
+            for flow in flows:
+                if flow == 'dashboard':
+                    self.hit(session, 'dashboard', '/dashboard/')
+                elif flow == 'transactions':
+                    self.hit(session, 'transactions', '/transactions/')
+                    self.hit(session, 'transaction page', '/api/transactions/')
+                elif flow == 'charts':
+                    self.hit(session, 'charts', '/api/dashboard/charts/')
+                    self.hit(session, 'net worth', '/api/dashboard/networth/')
+                elif flow == 'cutoff':
+                    # Last whole month; every run creates another report
+                    year, month = shift_month(date.today().year, date.today().month, -1)
+                    start, end = month_bounds(year, month)
+                    final_url = self.hit(session, 'cutoff', '/reports/create/', {
+                        'name': 'Load test', 'start_date': start.isoformat(), 'end_date': end.isoformat(),
+                    })
+                    match = re.search(r'/reports/(\d+)/?$', final_url or '')
+                    if match:
+                        report_id = match.group(1)
+                elif flow == 'pdf' and report_id:
+                    self.hit(session, 'pdf', f'/reports/{report_id}/pdf/')
+
+    def hit(self, session, name, path, data=None):
+        started = time.perf_counter()
+        try:
+            status, final_url, _ = session.request(self.prefix + path, data)
+        except OSError:
+            status, final_url = None, None
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.mutex:
+            self.timings[name].append(elapsed)
+            if status is None or status >= 400:
+                self.errors[name] += 1
+        return final_url
+
+    def report(self, elapsed, concurrency):
+        total = sum(len(samples) for samples in self.timings.values())
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{total:,} requests in {elapsed:.1f} s with {concurrency} users: {total / elapsed:.1f} req/s"
+        ))
+        self.stdout.write(
+            f"{'request':<18} {'count':>7} {'errors':>7} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for name, samples in self.timings.items():
+            if len(samples) > 1:
+                cuts = statistics.quantiles(samples, n=100, method='inclusive')
+                p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+            else:
+                p50 = p95 = p99 = samples[0]
+            self.stdout.write(
+                f"{name:<18} {len(samples):>7} {self.errors[name]:>7} {len(samples) / elapsed:>7.1f} "
+                f"{p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {max(samples):>8.1f}"
+            )
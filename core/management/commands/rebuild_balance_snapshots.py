@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.models import BalanceSnapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly account balance snapshots from the Transaction table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help="Only rebuild the given username (repeatable).")
+
+    def handle(self, *args, **options):
+        users = None
+        if options['usernames']:
+            users = get_user_model().objects.filter(username__in=options['usernames'])
+
+        written = BalanceSnapshot.rebuild(users=users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} balance snapshots."))
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.models import MonthlyCategoryRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly category rollups from the Transaction table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help="Only rebuild the given username (repeatable).")
+
+    def handle(self, *args, **options):
+        users = None
+        if options['usernames']:
+            users = get_user_model().objects.filter(username__in=options['usernames'])
+
+        written = MonthlyCategoryRollup.rebuild(users=users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} monthly rollup buckets."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.reports import render_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Render report PDFs still queued, for hosts where the background workers don't run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Render at most this many jobs.")
+
+    def handle(self, *args, **options):
+        rendered = render_pending_jobs(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} report PDFs."))
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_rollups(apps, schema_editor):
+    Transaction = apps.get_model('core', 'Transaction')
+    MonthlyCategoryRollup = apps.get_model('core', 'MonthlyCategoryRollup')
+
+    buckets = Transaction.objects.annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values(
+        'user_id', 'year', 'month', 'category_id', 'category__group__transaction_type'
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+
+    MonthlyCategoryRollup.objects.bulk_create([
+        MonthlyCategoryRollup(
+            user_id=bucket['user_id'],
+            year=bucket['year'],
+            month=bucket['month'],
+            category_id=bucket['category_id'],
+            transaction_type=bucket['category__group__transaction_type'],
+            total=bucket['total'],
+            count=bucket['count'],
+        )
+        for bucket in buckets.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_budget'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('transaction_type', models.CharField(choices=[('expenses', 'Expenses'), ('income', 'Income')], max_length=10)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='core.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly Category Rollup',
+                'verbose_name_plural': 'Monthly Category Rollups',
+                'ordering': ['-year', '-month'],
+                'unique_together': {('user', 'year', 'month', 'category', 'transaction_type')},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
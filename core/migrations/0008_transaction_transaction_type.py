@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:55
+
+from django.db import migrations, models
+
+
+def backfill_transaction_type(apps, schema_editor):
+    Transaction = apps.get_model('core', 'Transaction')
+    # The column defaults to 'expenses', only income rows need touching
+    Transaction.objects.filter(
+        category__group__transaction_type='income'
+    ).update(transaction_type='income')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_monthlycategoryrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('expenses', 'Expenses'), ('income', 'Income')], db_index=True, default='expenses', editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_transaction_type, migrations.RunPython.noop),
+    ]
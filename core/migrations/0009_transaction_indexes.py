@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:57
+
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# description__icontains compiles to UPPER("description"::text) LIKE UPPER(%s) on Postgres
+TRIGRAM_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS tx_description_trgm_idx ON core_transaction '
+    'USING gin (UPPER("description"::text) gin_trgm_ops)'
+)
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(TRIGRAM_INDEX_SQL)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS tx_description_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_transaction_transaction_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['user', 'year', 'month'], name='budget_user_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cutoffreport',
+            index=models.Index(fields=['user', 'start_date', 'end_date'], condition=models.Q(is_locked=True), name='cutoff_user_locked_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-date', '-created_at'], name='tx_user_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'date'], name='tx_account_date_idx'),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
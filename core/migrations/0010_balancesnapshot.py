@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_snapshots(apps, schema_editor):
+    Transaction = apps.get_model('core', 'Transaction')
+    BalanceSnapshot = apps.get_model('core', 'BalanceSnapshot')
+
+    rows = Transaction.objects.filter(account__isnull=False).annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values('user_id', 'account_id', 'year', 'month').annotate(
+        income=Sum('amount', filter=Q(transaction_type='income')),
+        expense=Sum('amount', filter=Q(transaction_type='expenses')),
+    ).order_by()
+
+    BalanceSnapshot.objects.bulk_create([
+        BalanceSnapshot(
+            user_id=row['user_id'],
+            account_id=row['account_id'],
+            year=row['year'],
+            month=row['month'],
+            net_change=(row['income'] or 0) - (row['expense'] or 0),
+        )
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_transaction_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('net_change', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='core.account')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Balance Snapshot',
+                'verbose_name_plural': 'Balance Snapshots',
+                'ordering': ['-year', '-month'],
+                'indexes': [models.Index(fields=['user', 'year', 'month'], name='snapshot_user_period_idx')],
+                'unique_together': {('account', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(build_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_balancesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('language', models.CharField(max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('content', models.BinaryField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pdfs', to='core.cutoffreport')),
+            ],
+            options={
+                'verbose_name': 'Report PDF',
+                'verbose_name_plural': 'Report PDFs',
+                'unique_together': {('report', 'fingerprint')},
+            },
+        ),
+    ]
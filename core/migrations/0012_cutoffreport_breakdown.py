@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:24
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def freeze_breakdowns(apps, schema_editor):
+    CutoffReport = apps.get_model('core', 'CutoffReport')
+    Transaction = apps.get_model('core', 'Transaction')
+
+    for report in CutoffReport.objects.iterator():
+        breakdown = {}
+        for transaction_type in ('expenses', 'income'):
+            rows = Transaction.objects.filter(
+                user_id=report.user_id,
+                date__gte=report.start_date,
+                date__lte=report.end_date,
+                transaction_type=transaction_type,
+            ).values('category__name').annotate(total=Sum('amount')).order_by('-total')
+            breakdown[transaction_type] = [
+                [row['category__name'], str(row['total'].quantize(Decimal('0.01')))] for row in rows
+            ]
+        report.breakdown = breakdown
+        report.save(update_fields=['breakdown'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_reportpdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cutoffreport',
+            name='breakdown',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(freeze_breakdowns, migrations.RunPython.noop),
+    ]
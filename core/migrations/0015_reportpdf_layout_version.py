@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_categorizationrule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportpdf',
+            name='layout_version',
+            field=models.PositiveSmallIntegerField(default=0),
+            preserve_default=False,
+        ),
+    ]
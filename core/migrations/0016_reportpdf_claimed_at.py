@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_reportpdf_layout_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportpdf',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
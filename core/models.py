@@ -1,9 +1,19 @@
-from django.db import models, transaction
-from django.db.models import F
+from decimal import Decimal
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, Exists, F, OuterRef, Sum
+from django.db.models.functions import ExtractYear, ExtractMonth
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
+from .datacache import user_data
+from .locks import cutoff_locks
+from .rules import categorization_rules
+
+# Ids per bulk_edit when re-applying the categorization rules
+APPLY_RULES_CHUNK_SIZE = 2000
+
 class CategoryGroup(models.Model):
     TRANSACTION_TYPES = [
         ('expenses', _('Expenses')),
@@ -26,6 +36,68 @@ class CategoryGroup(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_transaction_type_display()})"
 
+    def clean(self):
+        super().clean()
+        if self._flipped_type() and self._transactions().in_locked_periods().exists():
+            from django.core.exceptions import ValidationError
+            raise ValidationError({'transaction_type': _("this_group_has_transactions_in_a_locked_period")})
+
+    def _flipped_type(self):
+        """True when saving would change the type of an existing group."""
+        if self.pk is None:
+            return False
+        old_type = CategoryGroup.objects.filter(pk=self.pk).values_list('transaction_type', flat=True).first()
+        return old_type is not None and old_type != self.transaction_type
+
+    def _transactions(self):
+        return Transaction.objects.filter(category__group_id=self.pk)
+
+    def save(self, *args, **kwargs):
+        flipped = self._flipped_type()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if flipped:
+                self._sync_transaction_type()
+        user_data.invalidate(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        user_data.invalidate(self.user_id)
+        # The cascade takes the rules of the group's categories along
+        categorization_rules.invalidate(self.user_id)
+        return result
+
+    def _sync_transaction_type(self):
+        """
+        Propagate a type flip to the denormalized copies and to the affected account balances.
+        Refused when it would rewrite transactions of a locked cutoff period.
+        """
+        transactions = self._transactions()
+        if transactions.in_locked_periods().exists():
+            from django.core.exceptions import ValidationError
+            raise ValidationError(_("this_group_has_transactions_in_a_locked_period"))
+
+        # Every amount in the group switches sign on its account
+        factor = 2 if self.transaction_type == 'income' else -2
+        per_account = transactions.filter(account__isnull=False).values('account_id').annotate(
+            total=Sum('amount')
+        ).order_by()
+        for row in per_account:
+            Account.objects.filter(pk=row['account_id']).update(balance=F('balance') + row['total'] * factor)
+
+        per_month = transactions.filter(account__isnull=False).annotate(
+            year=ExtractYear('date'),
+            month=ExtractMonth('date'),
+        ).values('account_id', 'year', 'month').annotate(total=Sum('amount')).order_by()
+        for row in per_month:
+            BalanceSnapshot.objects.filter(
+                account_id=row['account_id'], year=row['year'], month=row['month'],
+            ).update(net_change=F('net_change') + row['total'] * factor)
+
+        # updated_at moves too: report fingerprints and page validators read it
+        transactions.update(transaction_type=self.transaction_type, updated_at=timezone.now())
+        MonthlyCategoryRollup.objects.filter(category__group_id=self.pk).update(transaction_type=self.transaction_type)
+
 class Category(models.Model):
     group = models.ForeignKey(CategoryGroup, on_delete=models.CASCADE, related_name='categories')
     name = models.CharField(max_length=100)
@@ -42,6 +114,17 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        user_data.invalidate(self.group.user_id)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.group.user_id
+        result = super().delete(*args, **kwargs)
+        user_data.invalidate(user_id)
+        categorization_rules.invalidate(user_id)
+        return result
+
 class Account(models.Model):
     ACCOUNT_TYPES = [
         ('checking', _('Checking')),
@@ -56,6 +139,9 @@ class Account(models.Model):
         ('mortgage', _('Mortgage')),
         ('line_of_credit', _('Line of Credit')),
     ]
+    # Net worth buckets; liabilities carry negative balances
+    ASSET_TYPES = ['checking', 'savings', 'bank', 'brokerage', 'cash', 'real_estate', 'crypto']
+    LIABILITY_TYPES = ['credit', 'loan', 'mortgage', 'line_of_credit']
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='accounts')
     name = models.CharField(max_length=100)
@@ -74,6 +160,19 @@ class Account(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        user_data.invalidate(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            # The FK cascade bypasses the bookkeeping and the cutoff locks, delete the transactions first
+            self.transactions.all().delete()
+            result = super().delete(*args, **kwargs)
+            user_data.invalidate(self.user_id)
+            categorization_rules.invalidate(self.user_id)
+            return result
+
 class CutoffReport(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cutoff_reports')
     name = models.CharField(max_length=100, blank=True)
@@ -84,76 +183,509 @@ class CutoffReport(models.Model):
     starting_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     ending_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     is_locked = models.BooleanField(default=False)
+    # Per-category totals frozen with the report: {transaction_type: [[category name, "total"], ...]}
+    breakdown = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = _('Cutoff Report')
         verbose_name_plural = _('Cutoff Reports')
         ordering = ['-end_date']
+        indexes = [
+            # Transaction._check_lock, only locked periods matter
+            models.Index(fields=['user', 'start_date', 'end_date'], condition=models.Q(is_locked=True), name='cutoff_user_locked_range_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name or _('cutoff')} ({self.start_date} - {self.end_date})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cutoff_locks.invalidate(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        cutoff_locks.invalidate(self.user_id)
+        return result
+
+    @classmethod
+    def locked_intervals(cls, user, start=None, end=None):
+        """(start_date, end_date) pairs of the user's locked periods, optionally only those overlapping [start, end]."""
+        reports = cls.objects.filter(user=user, is_locked=True)
+        if start is not None:
+            reports = reports.filter(end_date__gte=start)
+        if end is not None:
+            reports = reports.filter(start_date__lte=end)
+        return list(reports.order_by('start_date').values_list('start_date', 'end_date'))
+
+    def compute_totals(self):
+        """Fill the breakdown, totals and balances of a new report from the user's data (not saved)."""
+        from .analytics import balances_at
+
+        # Category totals are frozen on the report, the period totals are their sums
+        self.freeze_breakdown()
+        self.income_total = sum((row['total'] for row in self.get_breakdown('income')), Decimal('0'))
+        self.expense_total = sum((row['total'] for row in self.get_breakdown('expenses')), Decimal('0'))
+
+        # Balance at end_date from the snapshots: live balances minus the later months' movement
+        included_accounts = Account.objects.filter(user_id=self.user_id, include_in_total=True)
+        self.ending_balance = sum(balances_at(self.user_id, self.end_date, included_accounts).values(), Decimal('0'))
+
+        # Starting balance = Ending Balance - (Period Income - Period Expenses)
+        self.starting_balance = self.ending_balance - (self.income_total - self.expense_total)
+
+    def freeze_breakdown(self):
+        """Store the period's per-category totals on the report (not saved)."""
+        from .analytics import category_breakdown
+        self.breakdown = {
+            transaction_type: [
+                [row['category__name'], str(row['total'].quantize(Decimal('0.01')))]
+                for row in category_breakdown(self.user_id, self.start_date, self.end_date, transaction_type)
+            ]
+            for transaction_type, _label in CategoryGroup.TRANSACTION_TYPES
+        }
+
+    def get_breakdown(self, transaction_type):
+        """Frozen per-category totals, largest first, in the `category__name` / `total` shape of category_breakdown."""
+        return [
+            {'category__name': name, 'total': Decimal(total)}
+            for name, total in self.breakdown.get(transaction_type, [])
+        ]
+
+class ReportPDF(models.Model):
+    """A rendered cutoff report PDF, doubling as its render job. See core/reports.py."""
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('done', _('Done')),
+        ('failed', _('Failed')),
+    ]
+
+    report = models.ForeignKey(CutoffReport, on_delete=models.CASCADE, related_name='pdfs')
+    fingerprint = models.CharField(max_length=64)
+    language = models.CharField(max_length=10)
+    layout_version = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    content = models.BinaryField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When a worker took the job; running jobs claimed too long ago are put back in the queue
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Report PDF')
+        verbose_name_plural = _('Report PDFs')
+        unique_together = ['report', 'fingerprint']
+
+    def __str__(self):
+        return f"{self.report_id} [{self.status}] {self.fingerprint[:12]}"
+
+class TransactionQuerySet(models.QuerySet):
+    def _locked(self):
+        return Exists(CutoffReport.objects.filter(
+            user=OuterRef('user'), is_locked=True, start_date__lte=OuterRef('date'), end_date__gte=OuterRef('date'),
+        ))
+
+    def in_locked_periods(self):
+        """The transactions dated inside one of their user's locked cutoff periods."""
+        return self.filter(self._locked())
+
+    def outside_locked_periods(self):
+        return self.filter(~self._locked())
+
+    def delete(self):
+        """
+        Delete in bulk, keeping balances, snapshots and rollups in step: one query checks the
+        cutoff locks of the whole set, one grouped aggregate yields every account, snapshot and
+        rollup delta, each of which is applied once, then a single DELETE. All or nothing.
+        """
+        from . import ledger
+
+        if self.query.is_sliced:
+            raise TypeError("Cannot use 'limit' or 'offset' with delete().")
+        with transaction.atomic():
+            if self.in_locked_periods().exists():
+                from django.core.exceptions import ValidationError
+                raise ValidationError(_("this_period_is_locked_by_a_cutoff_report"))
+            users = ledger.revert_queryset(self)
+            result = super().delete()
+            for user_id in users:
+                user_data.invalidate(user_id)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_edit(self, category=None, account=None, date=None):
+        """
+        Move every transaction of the set to `category`, `account` and/or `date` (None keeps
+        the current value) with set-based UPDATEs. Balances, snapshots and rollups get the net
+        effect per account, month and bucket, type flips of the new category included, all from
+        one grouped aggregate. Nothing changes if a transaction is in, or would move into, a
+        locked cutoff period. Returns a summary of what changed.
+        """
+        from django.core.exceptions import ValidationError
+        from . import ledger
+
+        if self.query.is_sliced:
+            raise TypeError("Cannot update a query once a slice has been taken.")
+        if date is not None:
+            date = Transaction._meta.get_field('date').to_python(date)
+
+        with transaction.atomic():
+            if self.in_locked_periods().exists():
+                raise ValidationError(_("this_period_is_locked_by_a_cutoff_report"))
+            buckets = ledger.aggregate_buckets(self)
+            users = {bucket['user_id'] for bucket in buckets}
+            for owner in (category.group.user_id if category else None, account.user_id if account else None):
+                if owner is not None and users - {owner}:
+                    raise ValueError("Transactions can only be moved to a category or account of their own user.")
+            if date is not None and any(cutoff_locks.is_locked(user_id, date) for user_id in users):
+                raise ValidationError(_("this_period_is_locked_by_a_cutoff_report"))
+
+            new_type = category.group.transaction_type if category else None
+            moved = [
+                dict(
+                    bucket,
+                    account_id=account.pk if account else bucket['account_id'],
+                    category_id=category.pk if category else bucket['category_id'],
+                    transaction_type=new_type or bucket['transaction_type'],
+                    year=date.year if date else bucket['year'],
+                    month=date.month if date else bucket['month'],
+                )
+                for bucket in buckets
+            ]
+            deltas = ledger.bucket_deltas(moved, 1, ledger.bucket_deltas(buckets, -1))
+            ledger.apply_deltas(deltas)
+
+            changes = {'updated_at': timezone.now()}
+            if category:
+                changes.update(category=category, transaction_type=new_type)
+            if account:
+                changes['account'] = account
+            if date:
+                changes['date'] = date
+            updated = self.update(**changes) if buckets else 0
+            for user_id in users:
+                user_data.invalidate(user_id)
+
+        return {
+            'updated': updated,
+            'retyped': sum(bucket['count'] for bucket in buckets if new_type and bucket['transaction_type'] != new_type),
+            'balance_changes': {account_id: delta for account_id, delta in deltas[0].items() if delta},
+        }
+
+    bulk_edit.alters_data = True
+    bulk_edit.queryset_only = True
+
+    def apply_rules(self, chunk_size=APPLY_RULES_CHUNK_SIZE):
+        """
+        Re-categorize the set with its users' categorization rules. One pass over the rows
+        classifies them all, then the rows whose category or account changes are moved with one
+        bulk_edit per target (and chunk of ids). Rows in locked periods are left alone. Returns
+        the bulk_edit summary plus the number of rows a rule matched.
+        """
+        if self.query.is_sliced:
+            raise TypeError("Cannot update a query once a slice has been taken.")
+        matchers, targets, matched = {}, {}, 0
+        rows = self.outside_locked_periods().order_by().values_list(
+            'pk', 'user_id', 'description', 'amount', 'category_id', 'account_id',
+        )
+        for pk, user_id, description, amount, category_id, account_id in rows.iterator(chunk_size=chunk_size):
+            matcher = matchers.get(user_id)
+            if matcher is None:
+                matcher = matchers[user_id] = categorization_rules.get(user_id)
+            rule = matcher.classify(description, amount)
+            if rule is None:
+                continue
+            matched += 1
+            if rule.category_id != category_id or rule.account_id not in (None, account_id):
+                targets.setdefault((rule.category_id, rule.account_id), []).append(pk)
+
+        summary = {'matched': matched, 'updated': 0, 'retyped': 0, 'balance_changes': {}}
+        if not targets:
+            return summary
+        categories = Category.objects.select_related('group').in_bulk({category_id for category_id, _account_id in targets})
+        accounts = Account.objects.in_bulk({account_id for _category_id, account_id in targets if account_id})
+        with transaction.atomic():
+            for (category_id, account_id), ids in targets.items():
+                if category_id not in categories:
+                    continue
+                for start in range(0, len(ids), chunk_size):
+                    edited = Transaction.objects.filter(pk__in=ids[start:start + chunk_size]).bulk_edit(
+                        category=categories[category_id], account=accounts.get(account_id),
+                    )
+                    summary['updated'] += edited['updated']
+                    summary['retyped'] += edited['retyped']
+                    for pk, delta in edited['balance_changes'].items():
+                        summary['balance_changes'][pk] = summary['balance_changes'].get(pk, 0) + delta
+        summary['balance_changes'] = {pk: delta for pk, delta in summary['balance_changes'].items() if delta}
+        return summary
+
+    apply_rules.alters_data = True
+    apply_rules.queryset_only = True
+
+
 class Transaction(models.Model):
+    # Fields the balance, snapshot and rollup bookkeeping depends on
+    BOOKKEEPING_FIELDS = ('user_id', 'account_id', 'category_id', 'amount', 'date', 'transaction_type')
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transactions')
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transactions', null=True, blank=True)
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='transactions')
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     description = models.CharField(max_length=255)
     date = models.DateField(default=timezone.now)
+    # Denormalized from category.group so aggregates don't need the two-table join
+    transaction_type = models.CharField(
+        max_length=10, choices=CategoryGroup.TRANSACTION_TYPES, default='expenses', db_index=True, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TransactionQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Transaction')
         verbose_name_plural = _('Transactions')
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Per-user listings and date-range aggregates, in the default ordering
+            models.Index(fields=['user', '-date', '-created_at'], name='tx_user_date_created_idx'),
+            # Account filter on the transactions page
+            models.Index(fields=['account', 'date'], name='tx_account_date_idx'),
+            # Latest change per user, for the ETags of the JSON and report views
+            models.Index(fields=['user', 'updated_at'], name='tx_user_updated_idx'),
+        ]
+        # Postgres also gets a trigram index for description__icontains, see migration 0009
 
     def __str__(self):
         return f"{self.description} ({self.amount})"
 
+    @property
+    def balance_factor(self):
+        """Sign applied to `amount` when it hits the account balance."""
+        return 1 if self.transaction_type == 'income' else -1
+
     def _check_lock(self):
         """Helper to check if transaction date is within a locked cutoff period."""
-        locked_report = CutoffReport.objects.filter(
-            user=self.user,
-            is_locked=True,
-            start_date__lte=self.date,
-            end_date__gte=self.date
-        ).exists()
-        if locked_report:
+        if cutoff_locks.is_locked(self.user_id, self.date):
             from django.core.exceptions import ValidationError
             raise ValidationError(_("this_period_is_locked_by_a_cutoff_report"))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_original()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._remember_original(fields)
+
+    def _remember_original(self, fields=None):
+        """Record the stored values of the fields the bookkeeping depends on, as loaded."""
+        attnames = self.BOOKKEEPING_FIELDS
+        if fields is not None:
+            attnames = [self._meta.get_field(name).attname for name in fields]
+        original = getattr(self, '_original', {})
+        original.update(
+            (name, self.__dict__[name]) for name in attnames
+            if name in self.BOOKKEEPING_FIELDS and name in self.__dict__
+        )
+        self._original = original
+
+    def _stored(self):
+        """The row as last loaded or saved, as an unsaved Transaction; deferred fields are fetched."""
+        original = dict(getattr(self, '_original', {}))
+        missing = [name for name in self.BOOKKEEPING_FIELDS if name not in original]
+        if missing:
+            original.update(Transaction.objects.filter(pk=self.pk).values(*missing).get())
+        return Transaction(**original)
+
     def save(self, *args, **kwargs):
+        from . import ledger
+
+        # Accept date strings / datetimes the same way the form field would
+        self.date = self._meta.get_field('date').to_python(self.date)
         self._check_lock()
         with transaction.atomic():
-            is_new = self.pk is None
-            
-            if not is_new:
-                # Revert the old transaction's effect on its account
-                old_tx = Transaction.objects.select_related('category__group', 'account').get(pk=self.pk)
-                if old_tx.account:
-                    factor = 1 if old_tx.category.group.transaction_type == 'income' else -1
-                    Account.objects.filter(pk=old_tx.account.pk).update(balance=F('balance') - (old_tx.amount * factor))
+            stored = self._stored() if self.pk is not None else None
+
+            # Keep the denormalized type in step with the category's group
+            if stored is not None and stored.category_id == self.category_id:
+                self.transaction_type = stored.transaction_type
+            else:
+                self.transaction_type = CategoryGroup.objects.filter(
+                    categories__id=self.category_id
+                ).values_list('transaction_type', flat=True).get()
 
             super().save(*args, **kwargs)
-            
-            # Apply the new transaction's effect
-            if self.account:
-                # Ensure we have the latest type
-                factor = 1 if self.category.group.transaction_type == 'income' else -1
-                Account.objects.filter(pk=self.account.pk).update(balance=F('balance') + (self.amount * factor))
-                # Refresh current account instance balance if needed (for immediate use in view)
-                self.account.refresh_from_db(fields=['balance'])
+
+            # One net update per account, snapshot and rollup bucket that actually moves
+            balances = ledger.apply_change(stored, self)
+            if self.account_id in balances and self._meta.get_field('account').is_cached(self):
+                # Keep the loaded account current for the caller
+                if balances[self.account_id] is None:
+                    self.account.refresh_from_db(fields=['balance'])
+                else:
+                    self.account.balance = balances[self.account_id]
+            self._remember_original()
+            user_data.invalidate(self.user_id)
 
     def delete(self, *args, **kwargs):
+        from . import ledger
+
         self._check_lock()
         with transaction.atomic():
-            if self.account:
-                factor = 1 if self.category.group.transaction_type == 'income' else -1
-                Account.objects.filter(pk=self.account.pk).update(balance=F('balance') - (self.amount * factor))
-                
+            ledger.apply_change(self._stored(), None)
             super().delete(*args, **kwargs)
+            user_data.invalidate(self.user_id)
+
+class MonthlyCategoryRollup(models.Model):
+    """
+    Per-user monthly totals by category, maintained incrementally on every Transaction write
+    so whole-month aggregates never have to scan the Transaction table.
+    Rebuild from scratch with `python manage.py rebuild_rollups`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_rollups')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='monthly_rollups')
+    transaction_type = models.CharField(max_length=10, choices=CategoryGroup.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('Monthly Category Rollup')
+        verbose_name_plural = _('Monthly Category Rollups')
+        unique_together = ['user', 'year', 'month', 'category', 'transaction_type']
+        ordering = ['-year', '-month']
+
+    def __str__(self):
+        return f"{self.category_id} {self.month}/{self.year}: {self.total} ({self.count})"
+
+    @classmethod
+    def apply(cls, user_id, tx_date, category_id, transaction_type, amount, count):
+        """Add `amount` and `count` to the bucket of the given transaction, creating it if needed."""
+        key = {
+            'user_id': user_id,
+            'year': tx_date.year,
+            'month': tx_date.month,
+            'category_id': category_id,
+            'transaction_type': transaction_type,
+        }
+        updated = cls.objects.filter(**key).update(total=F('total') + amount, count=F('count') + count)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(total=amount, count=count, **key)
+            except IntegrityError:
+                # Another writer created the bucket first
+                cls.objects.filter(**key).update(total=F('total') + amount, count=F('count') + count)
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """Recompute the rollups from the Transaction table. Returns the number of buckets written."""
+        transactions = Transaction.objects.all()
+        existing = cls.objects.all()
+        if users is not None:
+            transactions = transactions.filter(user__in=users)
+            existing = existing.filter(user__in=users)
+
+        buckets = transactions.annotate(
+            year=ExtractYear('date'),
+            month=ExtractMonth('date'),
+        ).values(
+            'user_id', 'year', 'month', 'category_id', 'transaction_type'
+        ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+
+        with transaction.atomic():
+            existing.delete()
+            rollups = cls.objects.bulk_create([
+                cls(
+                    user_id=bucket['user_id'],
+                    year=bucket['year'],
+                    month=bucket['month'],
+                    category_id=bucket['category_id'],
+                    transaction_type=bucket['transaction_type'],
+                    total=bucket['total'],
+                    count=bucket['count'],
+                )
+                for bucket in buckets.iterator()
+            ], batch_size=1000)
+        return len(rollups)
+
+class BalanceSnapshot(models.Model):
+    """
+    Net balance movement of one account in one month, maintained incrementally on every
+    Transaction write. Snapshots are anchored on the live Account.balance: the balance at
+    the end of a month is the current balance minus the movement of every later month, so
+    a backdated transaction only ever touches its own month's row.
+    Rebuild from scratch with `python manage.py rebuild_balance_snapshots`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='balance_snapshots')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='balance_snapshots')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    net_change = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = _('Balance Snapshot')
+        verbose_name_plural = _('Balance Snapshots')
+        unique_together = ['account', 'year', 'month']
+        ordering = ['-year', '-month']
+        indexes = [
+            models.Index(fields=['user', 'year', 'month'], name='snapshot_user_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} {self.month}/{self.year}: {self.net_change}"
+
+    @classmethod
+    def apply(cls, user_id, account_id, tx_date, amount):
+        """Add a signed balance movement to the account's month, creating the row if needed."""
+        key = {'account_id': account_id, 'year': tx_date.year, 'month': tx_date.month}
+        updated = cls.objects.filter(**key).update(net_change=F('net_change') + amount)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id, net_change=amount, **key)
+            except IntegrityError:
+                # Another writer created the row first
+                cls.objects.filter(**key).update(net_change=F('net_change') + amount)
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """Recompute the snapshots from the Transaction table. Returns the number of rows written."""
+        transactions = Transaction.objects.filter(account__isnull=False)
+        existing = cls.objects.all()
+        if users is not None:
+            transactions = transactions.filter(user__in=users)
+            existing = existing.filter(user__in=users)
+
+        rows = transactions.annotate(
+            year=ExtractYear('date'),
+            month=ExtractMonth('date'),
+        ).values('user_id', 'account_id', 'year', 'month').annotate(
+            income=Sum('amount', filter=models.Q(transaction_type='income')),
+            expense=Sum('amount', filter=models.Q(transaction_type='expenses')),
+        ).order_by()
+
+        with transaction.atomic():
+            existing.delete()
+            snapshots = cls.objects.bulk_create([
+                cls(
+                    user_id=row['user_id'],
+                    account_id=row['account_id'],
+                    year=row['year'],
+                    month=row['month'],
+                    net_change=(row['income'] or 0) - (row['expense'] or 0),
+                )
+                for row in rows.iterator()
+            ], batch_size=1000)
+        return len(snapshots)
 
 class Budget(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='budgets')
@@ -169,6 +701,9 @@ class Budget(models.Model):
         verbose_name_plural = _('Budgets')
         unique_together = ['user', 'category', 'month', 'year']
         ordering = ['-year', '-month', 'category__name']
+        indexes = [
+            models.Index(fields=['user', 'year', 'month'], name='budget_user_period_idx'),
+        ]
 
     def __str__(self):
         return f"{self.category.name} - ${self.amount} ({self.month}/{self.year})"
@@ -179,4 +714,78 @@ class Budget(models.Model):
         if not self.year:
             self.year = timezone.now().year
         super().save(*args, **kwargs)
+        user_data.invalidate(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        user_data.invalidate(self.user_id)
+        return result
+
+
+class CategorizationRule(models.Model):
+    """
+    Assigns a category (and optionally an account) to transactions by their description or
+    amount. Rules are tried in `priority` order, lowest first; see core/rules.py for matching.
+    """
+    MATCH_TYPES = [
+        ('contains', _('Description contains')),
+        ('regex', _('Description matches')),
+        ('amount', _('Amount in range')),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='categorization_rules')
+    match_type = models.CharField(max_length=10, choices=MATCH_TYPES, default='contains')
+    # Substring or regular expression, matched case-insensitively; unused by amount rules
+    pattern = models.CharField(max_length=255, blank=True)
+    # Inclusive bounds on the (unsigned) amount; text rules can be narrowed by them too
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    max_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='rules')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='rules', null=True, blank=True)
+    priority = models.PositiveIntegerField(default=100)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Categorization Rule')
+        verbose_name_plural = _('Categorization Rules')
+        ordering = ['priority', 'id']
+        indexes = [
+            models.Index(fields=['user', 'priority'], name='rule_user_priority_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_match_type_display()} {self.pattern!r} -> {self.category_id}"
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .rules import check_pattern
+
+        errors = {}
+        if self.match_type == 'amount':
+            if self.min_amount is None and self.max_amount is None:
+                errors['min_amount'] = _("an_amount_rule_needs_a_minimum_or_a_maximum")
+        elif not self.pattern.strip():
+            errors['pattern'] = _("this_rule_needs_a_pattern")
+        elif self.match_type == 'regex':
+            message = check_pattern(self.pattern)
+            if message:
+                errors['pattern'] = message
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            errors['max_amount'] = _("the_maximum_is_below_the_minimum")
+        if self.category_id and self.user_id and self.category.group.user_id != self.user_id:
+            errors['category'] = _("invalid_selection")
+        if self.account_id and self.user_id and self.account.user_id != self.user_id:
+            errors['account'] = _("invalid_selection")
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        categorization_rules.invalidate(self.user_id)
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        categorization_rules.invalidate(self.user_id)
+        return result
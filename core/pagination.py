@@ -0,0 +1,50 @@
+import base64
+from datetime import date, datetime
+
+from django.db.models import Q
+
+# Matches Transaction.Meta.ordering plus the primary key as a tie-breaker
+KEYSET_ORDERING = ('-date', '-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj):
+    """Opaque cursor pointing just after `obj` in (date, created_at, id) descending order."""
+    raw = f"{obj.date.isoformat()}|{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        day, created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return date.fromisoformat(day), datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(value) from exc
+
+
+def keyset_paginate(queryset, cursor=None, page_size=50):
+    """
+    Return (items, next_cursor) for the page following `cursor`.
+    Seeks on (date, created_at, id) instead of using OFFSET, so every page costs the
+    same index range scan no matter how deep it is. `next_cursor` is None on the last page.
+    """
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    if cursor:
+        day, created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date__lt=day) |
+            Q(date=day, created_at__lt=created_at) |
+            Q(date=day, created_at=created_at, id__lt=pk)
+        )
+
+    # One extra row tells us whether another page exists without a COUNT query
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1])
+    return items, next_cursor
@@ -0,0 +1,150 @@
+"""
+Request profiling: wall time, query count, DB time, duplicate queries and the slowest SQL
+per view, kept as a rolling window per route in process memory.
+
+Only a PERF_SAMPLE_RATE share of requests is profiled (default 0, off); unsampled requests
+go straight through. Sampled responses carry a Server-Timing header, and staff can inspect
+the aggregated numbers at /internal/perf/.
+"""
+import bisect
+import heapq
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+DEFAULT_WINDOW = 500
+DEFAULT_TOP_QUERIES = 5
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class QueryRecorder:
+    """execute_wrapper collecting (sql, params, milliseconds) of every query it sees."""
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, (time.perf_counter() - started) * 1000))
+
+    def summary(self):
+        shapes = Counter(sql for sql, _params, _ms in self.queries)
+        exact = Counter((sql, repr(params)) for sql, params, _ms in self.queries)
+        return {
+            'count': len(self.queries),
+            'db_ms': sum(ms for _sql, _params, ms in self.queries),
+            # Same statement with the same parameters: the result could have been reused
+            'duplicates': sum(n - 1 for n in exact.values() if n > 1),
+            # Same statement with different parameters: the usual N+1 signature
+            'similar': sum(n - 1 for n in shapes.values() if n > 1),
+        }
+
+
+class RouteStats:
+    def __init__(self, window, top_queries):
+        self.samples = deque(maxlen=window)
+        self.top_queries = top_queries
+        self.slowest = []  # min-heap of (ms, sql)
+        self.requests = 0
+
+    def add(self, wall_ms, summary, queries):
+        self.requests += 1
+        self.samples.append((wall_ms, summary['count'], summary['db_ms'], summary['duplicates'], summary['similar']))
+        for sql, _params, ms in queries:
+            if len(self.slowest) < self.top_queries:
+                heapq.heappush(self.slowest, (ms, sql))
+            elif ms > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (ms, sql))
+
+    def as_dict(self):
+        walls = sorted(sample[0] for sample in self.samples)
+        histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for wall in walls:
+            histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, wall)] += 1
+        n = len(self.samples) or 1
+        return {
+            'requests': self.requests,
+            'window': len(self.samples),
+            'wall_ms': {
+                'p50': percentile(walls, 0.5), 'p95': percentile(walls, 0.95),
+                'p99': percentile(walls, 0.99), 'max': walls[-1] if walls else 0.0,
+            },
+            'histogram': dict(zip([f'<={bound}' for bound in HISTOGRAM_BOUNDS] + ['>2500'], histogram)),
+            'avg_queries': sum(sample[1] for sample in self.samples) / n,
+            'max_queries': max((sample[1] for sample in self.samples), default=0),
+            'avg_db_ms': sum(sample[2] for sample in self.samples) / n,
+            'duplicate_queries': sum(sample[3] for sample in self.samples),
+            'similar_queries': sum(sample[4] for sample in self.samples),
+            'slowest_sql': [{'ms': ms, 'sql': sql} for ms, sql in sorted(self.slowest, reverse=True)],
+        }
+
+
+class PerfRegistry:
+    def __init__(self):
+        self._routes = {}
+        self._mutex = threading.Lock()
+
+    def record(self, route, wall_ms, summary, queries):
+        with self._mutex:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats(
+                    getattr(settings, 'PERF_WINDOW', DEFAULT_WINDOW),
+                    getattr(settings, 'PERF_TOP_QUERIES', DEFAULT_TOP_QUERIES),
+                )
+            stats.add(wall_ms, summary, queries)
+
+    def snapshot(self):
+        with self._mutex:
+            return {route: stats.as_dict() for route, stats in sorted(self._routes.items())}
+
+    def reset(self):
+        with self._mutex:
+            self._routes.clear()
+
+
+perf_registry = PerfRegistry()
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = getattr(settings, 'PERF_SAMPLE_RATE', 0)
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        summary = recorder.summary()
+        match = request.resolver_match
+        route = match.view_name if match else 'unresolved'
+        perf_registry.record(route, wall_ms, summary, recorder.queries)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={summary["db_ms"]:.1f};desc="{summary["count"]} queries"',
+            f'app;dur={max(wall_ms - summary["db_ms"], 0):.1f}',
+            f'total;dur={wall_ms:.1f}',
+        ])
+        return response
@@ -0,0 +1,420 @@
+"""
+Cutoff report PDFs.
+
+Rendering is done off the request: a ReportPDF row is both the job and the stored result,
+keyed by report and a fingerprint of everything the document shows. Repeat downloads of an
+unchanged report (always the case once it is locked) are served straight from the row.
+Jobs run on a small in-process thread pool; `python manage.py render_report_pdfs` drains
+whatever is left pending on hosts where background threads don't survive the request.
+"""
+import hashlib
+import io
+import itertools
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone, translation
+from django.utils.translation import gettext as _
+
+from reportlab.lib import colors
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.legends import Legend
+
+from .models import ReportPDF, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes so stored PDFs are re-rendered
+LAYOUT_VERSION = 2
+# Seconds after which a running job's worker is presumed dead and the job is queued again
+RENDER_TIMEOUT = 5 * 60
+# Rows per transaction Table; small tables keep ReportLab's layout work per flowable cheap
+TABLE_CHUNK_ROWS = 200
+
+_executor = None
+
+
+def report_fingerprint(report, language):
+    """Hash of the report fields and period transactions that end up in the document."""
+    # Count + sum catch inserts and deletes, the income part of the sum type changes, the max
+    # timestamps edits and category renames
+    period = Transaction.objects.filter(
+        user_id=report.user_id,
+        date__gte=report.start_date,
+        date__lte=report.end_date,
+    ).aggregate(
+        count=Count('id'),
+        total=Sum('amount'),
+        income=Sum('amount', filter=Q(transaction_type='income')),
+        last_change=Max('updated_at'),
+        last_category_change=Max('category__updated_at'),
+    )
+    payload = {
+        'layout': LAYOUT_VERSION,
+        'language': language,
+        'report': [
+            report.name, report.start_date, report.end_date, report.income_total,
+            report.expense_total, report.ending_balance, report.breakdown,
+        ],
+        'period': period,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def build_report_pdf(report, stream):
+    """Write the report document to a binary file-like object."""
+    # Color Palette
+    PRIMARY_TEAL = HexColor('#0d9488')
+    SECONDARY_TEAL = HexColor('#14b8a6')
+    BG_MUTED = HexColor('#f8fafc')
+    BORDER_COLOR = HexColor('#e2e8f0')
+    TEXT_DARK = HexColor('#0f172a')
+    TEXT_LIGHT = HexColor('#64748b')
+    SUCCESS_GREEN = HexColor('#10b981')
+    DANGER_RED = HexColor('#ef4444')
+
+    doc = _StreamingDocTemplate(stream, pagesize=letter, 
+                           rightMargin=40, leftMargin=40, 
+                           topMargin=40, bottomMargin=40)
+    elements = []
+
+    styles = getSampleStyleSheet()
+
+    # Custom Styles
+    title_style = ParagraphStyle(
+        'ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=26,
+        textColor=TEXT_DARK,
+        spaceAfter=6,
+        fontName='Helvetica-Bold'
+    )
+
+    subtitle_style = ParagraphStyle(
+        'ReportSubtitle',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=TEXT_LIGHT,
+        spaceAfter=24,
+        textTransform='uppercase',
+        letterSpacing=1
+    )
+
+    card_label_style = ParagraphStyle(
+        'CardLabel',
+        fontSize=8,
+        textColor=TEXT_LIGHT,
+        fontName='Helvetica-Bold',
+        textTransform='uppercase',
+        alignment=1 # Center
+    )
+
+    card_value_style = ParagraphStyle(
+        'CardValue',
+        fontSize=16,
+        textColor=TEXT_DARK,
+        fontName='Helvetica-Bold',
+        alignment=1
+    )
+
+    section_header_style = ParagraphStyle(
+        'SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=TEXT_DARK,
+        spaceBefore=20,
+        spaceAfter=12,
+        fontName='Helvetica-Bold'
+    )
+
+    # 1. Header Section
+    elements.append(Paragraph(report.name or _("Cutoff Report"), title_style))
+    elements.append(Paragraph(f"{report.start_date} — {report.end_date}", subtitle_style))
+
+    # 2. Executive Summary Cards (Simulated with Table)
+    savings = report.income_total - report.expense_total
+    summary_data = [
+        [
+            Paragraph(_("total_income"), card_label_style),
+            Paragraph(_("total_expenses"), card_label_style),
+            Paragraph(_("net_savings"), card_label_style),
+            Paragraph(_("ending_balance"), card_label_style)
+        ],
+        [
+            Paragraph(f"+${report.income_total:,.2f}", ParagraphStyle('V1', parent=card_value_style, textColor=SUCCESS_GREEN)),
+            Paragraph(f"-${report.expense_total:,.2f}", ParagraphStyle('V2', parent=card_value_style, textColor=DANGER_RED)),
+            Paragraph(f"${savings:,.2f}", card_value_style),
+            Paragraph(f"${report.ending_balance:,.2f}", card_value_style)
+        ]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[135, 135, 135, 135])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), BG_MUTED),
+        ('BOX', (0, 0), (-1, -1), 1, BORDER_COLOR),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, 0), 15),
+        ('BOTTOMPADDING', (0, 1), (-1, 1), 15),
+        ('LINEAFTER', (0, 0), (2, -1), 1, BORDER_COLOR), # Vertical dividers
+    ]))
+    elements.append(summary_table)
+    elements.append(Spacer(1, 30))
+
+    # 3. Expense Breakdown & Pie Chart
+    elements.append(Paragraph(_("expense_breakdown"), section_header_style))
+
+    txs_breakdown = report.get_breakdown('expenses')
+
+    if txs_breakdown:
+        # Create Data for Chart
+        data = [float(item['total']) for item in txs_breakdown[:7]]
+        labels = [item['category__name'] for item in txs_breakdown[:7]]
+
+        # Handle "Other" if more than 7 categories
+        if len(txs_breakdown) > 7:
+            others_sum = sum(float(item['total']) for item in txs_breakdown[7:])
+            data.append(others_sum)
+            labels.append(_("Others"))
+
+        # Drawing for Pie Chart
+        d = Drawing(width=500, height=200)
+        pc = Pie()
+        pc.x = 20
+        pc.y = 25
+        pc.width = 150
+        pc.height = 150
+        pc.data = data
+        pc.labels = labels
+        pc.sideLabels = True
+        pc.slices.strokeWidth = 0.5
+        pc.slices.strokeColor = colors.white
+
+        # Color cycle for slices
+        chart_colors = [PRIMARY_TEAL, SECONDARY_TEAL, HexColor('#2dd4bf'), HexColor('#5eead4'), HexColor('#99f6e4'), HexColor('#ccfbf1')]
+        for i, val in enumerate(data):
+            pc.slices[i].fillColor = chart_colors[i % len(chart_colors)]
+
+        # Add Legend
+        legend = Legend()
+        legend.x = 220
+        legend.y = 160
+        legend.dx = 10
+        legend.dy = 10
+        legend.fontName = 'Helvetica'
+        legend.fontSize = 9
+        legend.columnMaximum = 10
+        legend.alignment = 'right'
+
+        legend_data = []
+        for i, label in enumerate(labels):
+            legend_data.append((pc.slices[i].fillColor, label))
+        legend.colorNamePairs = legend_data
+
+        d.add(pc)
+        d.add(legend)
+
+        elements.append(d)
+    else:
+        elements.append(Paragraph(_("no_expenses_in_period"), styles["Italic"]))
+
+    elements.append(Spacer(1, 20))
+
+    # 4. Detailed Transaction Table (generated chunk by chunk while the document is built)
+    elements.append(Paragraph(_("period_transactions"), section_header_style))
+
+    table_style = [
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_DARK),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, BG_MUTED]),
+        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+    ]
+    header_style = [
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 0), (-1, 0), BG_MUTED),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('LINEBELOW', (0, 0), (-1, 0), 1, BORDER_COLOR),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, BG_MUTED]),
+    ]
+    header = [_("date"), _("description"), _("category"), _("amount")]
+
+    def transaction_tables():
+        rows = Transaction.objects.filter(
+            user=report.user,
+            date__gte=report.start_date,
+            date__lte=report.end_date
+        ).order_by('date', 'id').values_list(
+            'date', 'description', 'category__name', 'transaction_type', 'amount'
+        ).iterator(chunk_size=TABLE_CHUNK_ROWS * 4)
+
+        chunk, income_rows, first, empty = [header], [], True, True
+        for day, description, category_name, transaction_type, amount in rows:
+            empty = False
+            if transaction_type == 'income':
+                income_rows.append(len(chunk))
+                amount_text = f"+${amount:,.2f}"
+            else:
+                amount_text = f"-${amount:,.2f}"
+            chunk.append([day.strftime('%Y-%m-%d'), description, category_name, amount_text])
+            # Even, header-less chunk sizes keep the row banding continuous across tables
+            if len(chunk) - first >= TABLE_CHUNK_ROWS:
+                yield _table_chunk(chunk, income_rows, first, table_style + (header_style if first else []), SUCCESS_GREEN)
+                chunk, income_rows, first = [], [], False
+        if empty:
+            yield Paragraph(_("No transactions found for this period."), styles["Italic"])
+        elif chunk:
+            yield _table_chunk(chunk, income_rows, first, table_style + (header_style if first else []), SUCCESS_GREEN)
+
+    doc.build_from(itertools.chain(elements, transaction_tables()))
+
+
+def _table_chunk(rows, income_rows, with_header, style, income_color):
+    """One Table of up to TABLE_CHUNK_ROWS rows, sharing the style commands of every other chunk."""
+    commands = style + [('TEXTCOLOR', (3, index), (3, index), income_color) for index in income_rows]
+    return Table(rows, colWidths=[80, 220, 140, 90], repeatRows=1 if with_header else 0, style=TableStyle(commands))
+
+
+class _StreamingDocTemplate(SimpleDocTemplate):
+    """
+    Document built from an iterator of flowables, so the transaction table of a large period
+    is never held in memory as a whole. The story list is refilled from handle_flowable, the
+    per-flowable hook BaseDocTemplate documents for overriding.
+    """
+    # Flowables kept queued: the head plus the one keepWithNext and page breaks look at
+    LOOKAHEAD = 2
+
+    def build_from(self, flowables, **kwargs):
+        self._pending = iter(flowables)
+        self._story = []
+        self._fill()
+        self.build(self._story, **kwargs)
+
+    def handle_flowable(self, flowables):
+        # Also called on the template's own postponed actions, which are left alone
+        streaming = flowables is getattr(self, '_story', None)
+        if streaming:
+            self._fill()
+        super().handle_flowable(flowables)
+        if streaming:
+            self._fill()
+
+    def _fill(self):
+        while len(self._story) < self.LOOKAHEAD:
+            try:
+                self._story.append(next(self._pending))
+            except StopIteration:
+                break
+
+
+def current_pdf(report, language=None):
+    """The ReportPDF for the current state of `report`, or None when it was never requested."""
+    language = language or translation.get_language()
+    return ReportPDF.objects.defer('content').filter(
+        report=report, fingerprint=report_fingerprint(report, language),
+    ).first()
+
+
+def stalled_jobs():
+    """Running jobs whose worker has had longer than REPORT_PDF_TIMEOUT seconds, likely gone."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_PDF_TIMEOUT', RENDER_TIMEOUT))
+    return ReportPDF.objects.filter(Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True), status='running')
+
+
+def request_pdf(report, language=None):
+    """
+    Return the ReportPDF for the current state of `report`, scheduling a render unless it is
+    done or running. Failed jobs and jobs whose worker stalled are queued again.
+    """
+    language = language or translation.get_language()
+    fingerprint = report_fingerprint(report, language)
+    job, created = ReportPDF.objects.defer('content').get_or_create(
+        report=report, fingerprint=fingerprint, defaults={'language': language, 'layout_version': LAYOUT_VERSION},
+    )
+    if job.status == 'failed':
+        ReportPDF.objects.filter(pk=job.pk, status='failed').update(status='pending', error='')
+        job.status = 'pending'
+    elif job.status == 'running' and stalled_jobs().filter(pk=job.pk).update(status='pending', claimed_at=None):
+        job.status = 'pending'
+
+    if job.status == 'pending':
+        # A job already queued is simply not claimed twice
+        if getattr(settings, 'REPORT_PDF_ASYNC', True):
+            transaction.on_commit(lambda: _get_executor().submit(_render_in_thread, job.pk))
+        else:
+            render_job(job.pk)
+            # Fetched again rather than refreshed: a job just created holds content=None, not a deferred field
+            job = ReportPDF.objects.defer('content').get(pk=job.pk)
+    return job
+
+
+def render_job(job_id):
+    """
+    Render one pending job. It is claimed first, so two workers never render the same one;
+    returns False when someone else got it, or took it over after this worker stalled.
+    """
+    claimed_at = timezone.now()
+    if not ReportPDF.objects.filter(pk=job_id, status='pending').update(status='running', claimed_at=claimed_at):
+        return False
+    claim = ReportPDF.objects.filter(pk=job_id, status='running', claimed_at=claimed_at)
+
+    job = ReportPDF.objects.defer('content').select_related('report__user').get(pk=job_id)
+    try:
+        # The document is stored whole on the row, so it is built in memory
+        buffer = io.BytesIO()
+        with translation.override(job.language):
+            build_report_pdf(job.report, buffer)
+    except Exception as exc:
+        logger.exception("Rendering PDF for report %s failed", job.report_id)
+        claim.update(status='failed', error=str(exc), finished_at=timezone.now())
+        return False
+
+    with transaction.atomic():
+        if not claim.update(status='done', content=buffer.getvalue(), error='', finished_at=timezone.now()):
+            return False
+        # Earlier jobs of this language and layout can never be served again; other languages
+        # keep theirs, and running jobs are left to their worker
+        ReportPDF.objects.filter(
+            report_id=job.report_id, language=job.language, layout_version=job.layout_version,
+            created_at__lt=job.created_at, status__in=['pending', 'done', 'failed'],
+        ).delete()
+    return True
+
+
+def render_pending_jobs(limit=None):
+    """Render queued jobs, and those of stalled workers, in the calling thread. Returns how many were rendered."""
+    stalled_jobs().update(status='pending', claimed_at=None)
+    job_ids = ReportPDF.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+    return sum(1 for job_id in list(job_ids) if render_job(job_id))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'REPORT_PDF_WORKERS', 2),
+            thread_name_prefix='report-pdf',
+        )
+    return _executor
+
+
+def _render_in_thread(job_id):
+    try:
+        render_job(job_id)
+    finally:
+        # Pool threads get their own connections, don't leave them open between jobs
+        connections.close_all()
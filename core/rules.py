@@ -0,0 +1,160 @@
+"""
+Rule-based categorization of transactions.
+
+A user's active CategorizationRules are compiled into one RuleMatcher, which finds the
+highest-priority rule matching a (description, amount) pair:
+
+* every substring rule goes into a single Aho-Corasick automaton, so a description is
+  scanned once, character by character, however many substrings there are;
+* regex rules are searched one by one, but only those ranking above the best rule found so
+  far (a combined alternation regex is slower than that: `re` retries every branch at every
+  position);
+* amount-only rules are a short list of range checks.
+
+Classifying a batch is therefore one linear pass over its rows. Compiled matchers are cached
+per user in a VersionedUserCache (see core/datacache.py) and invalidated by every rule change.
+"""
+import re
+from collections import deque, namedtuple
+
+from django.utils.translation import gettext as _
+
+from .datacache import VersionedUserCache
+
+CACHE_PREFIX = 'categorization_rules'
+
+Rule = namedtuple('Rule', 'pk match_type pattern min_amount max_amount category_id account_id')
+
+
+def check_pattern(pattern):
+    """Why `pattern` can't be used by a regex rule, or None if it can."""
+    try:
+        re.compile(pattern, re.IGNORECASE)
+    except re.error as exc:
+        return f"{_('invalid_regular_expression')}: {exc}"
+    return None
+
+
+def in_range(rule, amount):
+    if rule.min_amount is None and rule.max_amount is None:
+        return True
+    if amount is None:
+        return False
+    return (rule.min_amount is None or amount >= rule.min_amount) and (rule.max_amount is None or amount <= rule.max_amount)
+
+
+class SubstringAutomaton:
+    """Aho-Corasick automaton over casefolded keywords, each tagged with the index of its rule."""
+    def __init__(self, keywords):
+        self.goto = [{}]
+        # Rule indexes of every keyword ending in the state, own or through the failure links, ascending
+        self.outputs = [()]
+        for index, keyword in keywords:
+            state = 0
+            for char in keyword.casefold():
+                following = self.goto[state].get(char)
+                if following is None:
+                    self.goto.append({})
+                    self.outputs.append(())
+                    following = self.goto[state][char] = len(self.goto) - 1
+                state = following
+            self.outputs[state] += (index,)
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(char, 0)
+                self.outputs[following] = tuple(sorted(self.outputs[following] + self.outputs[self.fail[following]]))
+                queue.append(following)
+
+    def first(self, text, accept, limit):
+        """Lowest rule index below `limit` whose keyword occurs in `text` and which `accept`s, or `limit`."""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        best, state = limit, 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in outputs[state]:
+                if index >= best:
+                    break
+                if accept(index):
+                    best = index
+                    break
+        return best
+
+
+class RuleMatcher:
+    """The compiled rules of one user, `rules` in priority order."""
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self.amount_rules = []
+        self.regex_rules = []
+        keywords = []
+        for index, rule in enumerate(self.rules):
+            if rule.match_type == 'amount':
+                self.amount_rules.append(index)
+            elif not rule.pattern.strip():
+                continue
+            elif rule.match_type == 'contains':
+                keywords.append((index, rule.pattern.strip()))
+            else:
+                try:
+                    self.regex_rules.append((index, re.compile(rule.pattern, re.IGNORECASE)))
+                except re.error:
+                    # Only reachable for rules saved without clean(), which then never match
+                    continue
+        self.substrings = SubstringAutomaton(keywords) if keywords else None
+
+    def __len__(self):
+        return len(self.rules)
+
+    def classify(self, description, amount=None):
+        """The first rule matching the description and the (unsigned) amount, or None."""
+        rules = self.rules
+        if not rules:
+            return None
+        if amount is not None:
+            amount = abs(amount)
+        description = description or ''
+
+        best = next((index for index in self.amount_rules if in_range(rules[index], amount)), len(rules))
+        if self.substrings is not None:
+            best = self.substrings.first(description, lambda index: in_range(rules[index], amount), best)
+        for index, pattern in self.regex_rules:
+            if index >= best:
+                break
+            if in_range(rules[index], amount) and pattern.search(description):
+                best = index
+                break
+        return rules[best] if best < len(rules) else None
+
+    def classify_many(self, rows):
+        """Rule (or None) for each (description, amount) pair, in order."""
+        return [self.classify(description, amount) for description, amount in rows]
+
+
+class RuleMatcherCache(VersionedUserCache):
+    prefix = CACHE_PREFIX
+
+    def _load(self, user_id):
+        from .models import CategorizationRule
+        return list(
+            CategorizationRule.objects.filter(user_id=user_id, is_active=True)
+            .order_by('priority', 'id')
+            .values_list('pk', 'match_type', 'pattern', 'min_amount', 'max_amount', 'category_id', 'account_id')
+        )
+
+    def _build(self, raw):
+        return RuleMatcher(Rule(*row) for row in raw)
+
+    def classify(self, user_id, description, amount=None):
+        return self.get(user_id).classify(description, amount)
+
+
+categorization_rules = RuleMatcherCache()
@@ -0,0 +1,139 @@
+"""
+Synthetic finance data for benchmarks, load tests and the performance test suite.
+
+Everything is written with bulk_create and the derived state (balances, snapshots, rollups,
+report totals) goes through the same code paths as real imports, so generated users look
+exactly like real ones to every view.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import ledger
+from .analytics import month_bounds, shift_month
+from .models import Account, Budget, Category, CategoryGroup, CutoffReport, Transaction
+
+# (group name, icon, category names) per transaction type
+CATEGORY_TREE = {
+    'expenses': [
+        ('Housing', 'home', ['Rent', 'Utilities', 'Internet', 'Repairs', 'Insurance']),
+        ('Food', 'utensils', ['Groceries', 'Restaurants', 'Coffee', 'Delivery']),
+        ('Transport', 'car', ['Fuel', 'Public Transport', 'Parking', 'Taxi', 'Car Service']),
+        ('Lifestyle', 'sparkles', ['Clothing', 'Gym', 'Streaming', 'Hobbies', 'Gifts']),
+        ('Health', 'heart-pulse', ['Pharmacy', 'Doctor', 'Dentist']),
+        ('Travel', 'plane', ['Flights', 'Hotels', 'Activities']),
+        ('Education', 'graduation-cap', ['Courses', 'Books']),
+    ],
+    'income': [
+        ('Work', 'briefcase', ['Salary', 'Bonus', 'Freelance']),
+        ('Investments', 'trending-up', ['Dividends', 'Interest']),
+    ],
+}
+MERCHANTS = ['Market', 'Store', 'Online', 'Downtown', 'Express', 'Center', 'Co.', 'Services']
+# Accounts transactions are booked on; the others only carry an opening balance
+TRANSACTIONAL_TYPES = ('checking', 'savings', 'bank', 'cash', 'credit')
+
+
+def generate_user(username, transactions=2000, days=730, end=None, accounts_per_type=1, budget_months=3,
+                  reports=3, password=None, rng=None, batch_size=5000):
+    """
+    Create a user with a full category tree, `accounts_per_type` accounts of every type,
+    `transactions` transactions spread over the `days` days up to `end`, budgets for the
+    last `budget_months` months and cutoff reports for the last `reports` whole months
+    (all but the latest locked). Returns the user.
+    """
+    rng = rng or random.Random()
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+
+    with transaction.atomic():
+        user = get_user_model().objects.create_user(username=username, password=password)
+        categories = _create_categories(user)
+        accounts = _create_accounts(user, accounts_per_type, rng)
+
+        expense_categories = [c for c in categories if c.group.transaction_type == 'expenses']
+        income_categories = [c for c in categories if c.group.transaction_type == 'income']
+        booked = [a for a in accounts if a.type in TRANSACTIONAL_TYPES]
+        paid_into = [a for a in booked if a.type != 'credit']
+
+        for offset in range(0, transactions, batch_size):
+            batch = []
+            for _ in range(min(batch_size, transactions - offset)):
+                # Roughly one income per ten expenses, with larger amounts
+                if rng.random() < 0.1:
+                    category, account = rng.choice(income_categories), rng.choice(paid_into)
+                    amount = Decimal(rng.randint(50_000, 600_000)) / 100
+                else:
+                    category, account = rng.choice(expense_categories), rng.choice(booked)
+                    amount = Decimal(rng.randint(200, 25_000)) / 100
+                batch.append(Transaction(
+                    user=user,
+                    account=account,
+                    category=category,
+                    transaction_type=category.group.transaction_type,
+                    amount=amount,
+                    description=f"{category.name} {rng.choice(MERCHANTS)}",
+                    date=start + timedelta(days=rng.randrange(days)),
+                ))
+            Transaction.objects.bulk_create(batch, batch_size=batch_size)
+            ledger.apply_transactions(batch)
+
+        _create_budgets(user, expense_categories, end, budget_months, rng)
+        _create_reports(user, end, reports)
+    return user
+
+
+def _create_categories(user):
+    groups, names = [], []
+    for transaction_type, tree in CATEGORY_TREE.items():
+        for group_name, icon, category_names in tree:
+            groups.append(CategoryGroup(user=user, name=group_name, icon=icon, transaction_type=transaction_type))
+            names.append(category_names)
+    CategoryGroup.objects.bulk_create(groups)
+
+    categories = [
+        Category(group=group, name=name)
+        for group, category_names in zip(groups, names)
+        for name in category_names
+    ]
+    return Category.objects.bulk_create(categories)
+
+
+def _create_accounts(user, per_type, rng):
+    accounts = []
+    for account_type, label in Account.ACCOUNT_TYPES:
+        for index in range(per_type):
+            opening = Decimal(rng.randint(10_000, 5_000_000)) / 100
+            accounts.append(Account(
+                user=user,
+                name=f"{label} {index + 1}" if per_type > 1 else str(label),
+                type=account_type,
+                # Liabilities carry negative balances
+                balance=-opening if account_type in Account.LIABILITY_TYPES else opening,
+            ))
+    return Account.objects.bulk_create(accounts)
+
+
+def _create_budgets(user, categories, end, months, rng):
+    budgets = []
+    for back in range(months):
+        year, month = shift_month(end.year, end.month, -back)
+        for category in rng.sample(categories, k=min(len(categories), 8)):
+            budgets.append(Budget(
+                user=user, category=category, month=month, year=year,
+                amount=Decimal(rng.randint(100, 1500)),
+            ))
+    Budget.objects.bulk_create(budgets)
+
+
+def _create_reports(user, end, count):
+    for back in range(count, 0, -1):
+        year, month = shift_month(end.year, end.month, -back)
+        start_date, end_date = month_bounds(year, month)
+        report = CutoffReport(user=user, name=start_date.strftime('%B %Y'), start_date=start_date, end_date=end_date,
+                              is_locked=back > 1)
+        report.compute_totals()
+        report.save()
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Account
+
+
+class AccountsContextTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+
+    def _add_accounts(self, count):
+        types = ['checking', 'brokerage', 'credit', 'savings', 'loan']
+        Account.objects.bulk_create([
+            Account(user=self.user, name=f'Account {i}', type=types[i % len(types)],
+                    balance=Decimal('-100.00') if types[i % len(types)] in Account.LIABILITY_TYPES else Decimal('300.00'))
+            for i in range(count)
+        ])
+
+    def _query_count(self, url):
+        # A cold dashboard summary every time
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Sections, totals and the account selects all come from one fetch
+        account_queries = [q for q in ctx.captured_queries if 'FROM "core_account"' in q['sql']]
+        self.assertEqual(len(account_queries), 1)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_accounts(self):
+        for name in ('accounts', 'dashboard'):
+            self._add_accounts(2)
+            few = self._query_count(reverse(name))
+            self._add_accounts(20)
+            self.assertEqual(self._query_count(reverse(name)), few, name)
+
+    def test_sections_and_totals(self):
+        self._add_accounts(5)
+        Account.objects.create(user=self.user, name='Hidden', type='savings', balance=Decimal('999.00'), include_in_total=False)
+
+        context = self.client.get(reverse('accounts')).context
+        self.assertEqual(len(context['banking_accounts']), 3)
+        self.assertEqual(len(context['investment_accounts']), 1)
+        self.assertEqual(len(context['liability_accounts']), 2)
+        self.assertEqual(context['total_assets'], Decimal('900.00'))
+        self.assertEqual(context['total_liabilities'], Decimal('200.00'))
+        self.assertEqual(context['total_balance'], Decimal('700.00'))
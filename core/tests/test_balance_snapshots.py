@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Q, Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from core.analytics import balances_at, monthly_net_worth
+from core.models import Account, BalanceSnapshot, Category, CategoryGroup, CutoffReport, Transaction
+
+
+class BalanceSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        self.expense_group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.rent = Category.objects.create(group=self.expense_group, name='Rent')
+        self.salary = Category.objects.create(group=income_group, name='Salary')
+        self.checking = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+        self.card = Account.objects.create(user=self.user, name='Card', type='credit', balance=Decimal('0.00'))
+
+    def _create(self, category, amount, day, account=None):
+        return Transaction.objects.create(
+            user=self.user, category=category, account=account or self.checking,
+            amount=Decimal(amount), description='tx', date=day,
+        )
+
+    def _net_change(self, account, year, month):
+        return BalanceSnapshot.objects.get(account=account, year=year, month=month).net_change
+
+    def _brute_force_balance(self, account, day):
+        """Balance at the end of `day` by backing out every later transaction."""
+        account.refresh_from_db()
+        later = Transaction.objects.filter(account=account, date__gt=day).aggregate(
+            income=Sum('amount', filter=Q(transaction_type='income')),
+            expense=Sum('amount', filter=Q(transaction_type='expenses')),
+        )
+        return account.balance - ((later['income'] or 0) - (later['expense'] or 0))
+
+    def test_snapshots_follow_transaction_writes(self):
+        tx = self._create(self.rent, '100.00', date(2026, 1, 10))
+        self._create(self.salary, '500.00', date(2026, 1, 20))
+        self.assertEqual(self._net_change(self.checking, 2026, 1), Decimal('400.00'))
+
+        # Moving the transaction to another month and account moves its movement
+        tx.date = date(2026, 2, 1)
+        tx.account = self.card
+        tx.save()
+        self.assertEqual(self._net_change(self.checking, 2026, 1), Decimal('500.00'))
+        self.assertEqual(self._net_change(self.card, 2026, 2), Decimal('-100.00'))
+
+        tx.delete()
+        self.assertEqual(self._net_change(self.card, 2026, 2), Decimal('0.00'))
+
+        # A group type flip turns the expense movement around
+        self._create(self.rent, '50.00', date(2026, 1, 5))
+        self.expense_group.transaction_type = 'income'
+        self.expense_group.save()
+        self.assertEqual(self._net_change(self.checking, 2026, 1), Decimal('550.00'))
+
+    def test_balances_at_matches_backing_out_history(self):
+        start = date(2025, 11, 1)
+        for offset in range(0, 120, 7):
+            self._create(self.rent, '35.00', start + timedelta(days=offset))
+            self._create(self.salary, '80.00', start + timedelta(days=offset + 3), account=self.card)
+
+        for day in (date(2025, 10, 31), date(2025, 12, 17), date(2026, 1, 31), date(2026, 2, 3), date(2026, 6, 1)):
+            balances = balances_at(self.user, day)
+            self.assertEqual(balances[self.checking.pk], self._brute_force_balance(self.checking, day))
+            self.assertEqual(balances[self.card.pk], self._brute_force_balance(self.card, day))
+
+        with self.assertNumQueries(3):
+            balances_at(self.user, date(2025, 12, 17))
+
+    def test_cutoff_uses_snapshot_balance(self):
+        self._create(self.salary, '500.00', date(2026, 1, 20))
+        self._create(self.rent, '200.00', date(2026, 2, 5))
+        self._create(self.rent, '300.00', date(2026, 3, 5))
+
+        self.client.post(reverse('report_create'), {
+            'name': 'January', 'start_date': '2026-01-01', 'end_date': '2026-01-31',
+        })
+        report = CutoffReport.objects.get(name='January')
+        self.assertEqual(report.ending_balance, Decimal('1500.00'))
+        self.assertEqual(report.starting_balance, Decimal('1000.00'))
+
+    def test_monthly_net_worth(self):
+        self._create(self.salary, '500.00', date(2026, 1, 20))
+        self._create(self.rent, '200.00', date(2026, 3, 5))
+        self._create(self.rent, '50.00', date(2026, 5, 5))
+
+        self.assertEqual(
+            monthly_net_worth(self.user, months=4, end=date(2026, 4, 30)),
+            [1500.0, 1500.0, 1300.0, 1300.0],
+        )
+        response = self.client.get(reverse('dashboard_charts'), {'months': 3})
+        self.assertEqual(len(response.json()['net_worth']), 3)
+
+    def test_rebuild_command(self):
+        self._create(self.rent, '100.00', date(2026, 1, 10))
+        self._create(self.salary, '40.00', date(2026, 1, 11), account=self.card)
+        expected = set(BalanceSnapshot.objects.values_list('account_id', 'year', 'month', 'net_change'))
+        BalanceSnapshot.objects.all().update(net_change=0)
+
+        call_command('rebuild_balance_snapshots', stdout=StringIO())
+        self.assertEqual(set(BalanceSnapshot.objects.values_list('account_id', 'year', 'month', 'net_change')), expected)
@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.budgets import budget_status
+from core.models import Account, Budget, Category, CategoryGroup, Transaction
+
+
+class BudgetStatusTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        self.account = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000'))
+        self.food = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        self.groceries = Category.objects.create(group=self.food, name='Groceries')
+        self.coffee = Category.objects.create(group=self.food, name='Coffee')
+        self.work = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.salary = Category.objects.create(group=self.work, name='Salary')
+
+        Budget.objects.create(user=self.user, category=self.groceries, year=2026, month=5, amount=Decimal('200'))
+        Budget.objects.create(user=self.user, category=self.coffee, year=2026, month=5, amount=Decimal('50'))
+        # Income budgets are not part of budget vs. actual
+        Budget.objects.create(user=self.user, category=self.salary, year=2026, month=5, amount=Decimal('3000'))
+
+        self._spend(self.groceries, '80.00', date(2026, 5, 3))
+        self._spend(self.groceries, '70.00', date(2026, 5, 20))
+        self._spend(self.coffee, '60.00', date(2026, 5, 9))
+        # Other months do not count
+        self._spend(self.groceries, '500.00', date(2026, 4, 30))
+        Transaction.objects.create(user=self.user, account=self.account, category=self.salary,
+                                   transaction_type='income', amount=Decimal('2500'), date=date(2026, 5, 1))
+
+    def _spend(self, category, amount, on):
+        Transaction.objects.create(user=self.user, account=self.account, category=category,
+                                   transaction_type='expenses', amount=Decimal(amount), date=on)
+
+    def test_per_category_group_and_total_figures(self):
+        status = budget_status(self.user, 2026, 5)
+
+        rows = {row['category']: row for row in status['categories']}
+        self.assertEqual(set(rows), {'Groceries', 'Coffee'})
+        self.assertEqual(rows['Groceries']['actual'], Decimal('150'))
+        self.assertEqual(rows['Groceries']['remaining'], Decimal('50'))
+        self.assertEqual(rows['Groceries']['percentage'], Decimal('75'))
+        self.assertEqual(rows['Coffee']['remaining'], Decimal('-10'))
+
+        [group] = status['groups']
+        self.assertEqual((group['group'], group['budget'], group['actual']), ('Food', Decimal('250'), Decimal('210')))
+        self.assertEqual(status['totals']['percentage'], Decimal('84'))
+
+    def test_budget_without_spend_reports_zero(self):
+        Budget.objects.create(user=self.user, category=self.coffee, year=2026, month=6, amount=Decimal('40'))
+        [row] = budget_status(self.user, 2026, 6)['categories']
+        self.assertEqual((row['actual'], row['remaining'], row['percentage']), (Decimal('0'), Decimal('40'), Decimal('0')))
+
+    def test_single_query_regardless_of_budgeted_categories(self):
+        categories = Category.objects.bulk_create(
+            [Category(group=self.food, name=f'Extra {i}') for i in range(300)]
+        )
+        Budget.objects.bulk_create([
+            Budget(user=self.user, category=category, year=2026, month=5, amount=Decimal('10'))
+            for category in categories
+        ])
+        with self.assertNumQueries(1):
+            status = budget_status(self.user, 2026, 5)
+        self.assertEqual(len(status['categories']), 302)
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('budget_status'), {'year': 2026, 'month': 5})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['totals'], {'budget': 250.0, 'actual': 210.0, 'remaining': 40.0, 'percentage': 84.0})
+        self.assertEqual([row['category'] for row in data['categories']], ['Coffee', 'Groceries'])
+
+    def test_endpoint_rejects_bad_month(self):
+        for params in ({'month': 13}, {'year': 'soon'}):
+            response = self.client.get(reverse('budget_status'), params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_endpoint_only_sees_own_budgets(self):
+        User.objects.create_user(username='other', password='password123')
+        self.client.login(username='other', password='password123')
+        data = self.client.get(reverse('budget_status'), {'year': 2026, 'month': 5}).json()
+        self.assertEqual(data['categories'], [])
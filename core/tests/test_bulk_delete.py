@@ -0,0 +1,89 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Account, BalanceSnapshot, Category, CategoryGroup, CutoffReport, MonthlyCategoryRollup, Transaction
+
+
+class BulkDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        food = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        work = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.groceries = Category.objects.create(group=food, name='Groceries')
+        self.salary = Category.objects.create(group=work, name='Salary')
+        self.checking = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+        self.cash = Account.objects.create(user=self.user, name='Cash', type='cash', balance=Decimal('100.00'))
+
+        for account in (self.checking, self.cash):
+            for day in range(1, 11):
+                self._add(self.groceries, account, '10.00', date(2026, 4, day))
+                self._add(self.groceries, account, '5.00', date(2026, 5, day))
+        self._add(self.salary, self.checking, '500.00', date(2026, 5, 1))
+
+    def _add(self, category, account, amount, day):
+        return Transaction.objects.create(user=self.user, category=category, account=account,
+                                          amount=Decimal(amount), description='Row', date=day)
+
+    def _balances(self):
+        return dict(Account.objects.filter(user=self.user).values_list('name', 'balance'))
+
+    def test_queryset_delete_matches_per_row_deletes(self):
+        expected = self._balances()
+        for tx in Transaction.objects.filter(date__month=5):
+            expected[tx.account.name] -= tx.amount * tx.balance_factor
+
+        # Lock check, aggregate, 2 balances, 2 snapshots, 2 rollups, delete, plus the savepoint pair
+        with self.assertNumQueries(11):
+            deleted, _ = Transaction.objects.filter(user=self.user, date__month=5).delete()
+
+        self.assertEqual(deleted, 21)
+        self.assertEqual(self._balances(), expected)
+        self.assertEqual(
+            set(MonthlyCategoryRollup.objects.filter(month=5).values_list('total', 'count')), {(Decimal('0'), 0)}
+        )
+        self.assertEqual(set(BalanceSnapshot.objects.filter(month=5).values_list('net_change', flat=True)), {Decimal('0')})
+        # April is untouched
+        self.assertEqual(MonthlyCategoryRollup.objects.get(month=4).total, Decimal('200.00'))
+
+    def test_locked_period_aborts_the_whole_delete(self):
+        CutoffReport.objects.create(user=self.user, name='April', start_date=date(2026, 4, 1),
+                                    end_date=date(2026, 4, 30), is_locked=True)
+        before = self._balances()
+        with self.assertRaises(ValidationError):
+            Transaction.objects.filter(user=self.user).delete()
+        self.assertEqual(Transaction.objects.count(), 41)
+        self.assertEqual(self._balances(), before)
+
+    def test_account_delete_keeps_rollups_in_step(self):
+        self.cash.delete()
+        self.assertEqual(MonthlyCategoryRollup.objects.get(month=4).total, Decimal('100.00'))
+        self.assertEqual(self._balances(), {'Checking': Decimal('1000.00') - 100 - 50 + 500})
+
+    def test_endpoint_deletes_only_own_selected_transactions(self):
+        other = User.objects.create_user(username='other', password='password123')
+        other_group = CategoryGroup.objects.create(user=other, name='Food', transaction_type='expenses')
+        other_tx = Transaction.objects.create(user=other, category=Category.objects.create(group=other_group, name='X'),
+                                              amount=Decimal('1.00'), description='Theirs', date=date(2026, 5, 1))
+        ids = list(Transaction.objects.filter(user=self.user, account=self.cash).values_list('pk', flat=True))
+
+        response = self.client.post(reverse('transaction_bulk_delete'), {'ids': ids + [other_tx.pk]})
+        self.assertEqual(response.json(), {'status': 'success', 'deleted': 20})
+        self.assertTrue(Transaction.objects.filter(pk=other_tx.pk).exists())
+        self.assertEqual(self._balances()['Cash'], Decimal('100.00'))
+
+    def test_endpoint_reports_locked_periods_and_bad_input(self):
+        CutoffReport.objects.create(user=self.user, name='April', start_date=date(2026, 4, 1),
+                                    end_date=date(2026, 4, 30), is_locked=True)
+        ids = list(Transaction.objects.filter(user=self.user).values_list('pk', flat=True))
+        response = self.client.post(reverse('transaction_bulk_delete'), {'ids': ids})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 41)
+
+        for data in ({}, {'ids': ['x']}):
+            self.assertEqual(self.client.post(reverse('transaction_bulk_delete'), data).status_code, 400)
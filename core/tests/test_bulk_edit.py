@@ -0,0 +1,116 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Account, BalanceSnapshot, Category, CategoryGroup, CutoffReport, MonthlyCategoryRollup, Transaction
+
+
+class BulkEditTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        food = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        work = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.groceries = Category.objects.create(group=food, name='Groceries')
+        self.coffee = Category.objects.create(group=food, name='Coffee')
+        self.refunds = Category.objects.create(group=work, name='Refunds')
+        self.checking = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+        self.cash = Account.objects.create(user=self.user, name='Cash', type='cash', balance=Decimal('100.00'))
+
+        for month in (3, 4):
+            for day in range(1, 11):
+                for account in (self.checking, self.cash):
+                    Transaction.objects.create(user=self.user, category=self.groceries, account=account,
+                                               amount=Decimal('10.00'), description='Market', date=date(2026, month, day))
+
+    def _balances(self):
+        return dict(Account.objects.filter(user=self.user).values_list('name', 'balance'))
+
+    def _rebuilt_matches(self):
+        """Incremental bookkeeping equals a rebuild from the transaction table."""
+        rollups = set(MonthlyCategoryRollup.objects.exclude(count=0).values_list('year', 'month', 'category_id', 'transaction_type', 'total', 'count'))
+        snapshots = set(BalanceSnapshot.objects.exclude(net_change=0).values_list('account_id', 'year', 'month', 'net_change'))
+        MonthlyCategoryRollup.rebuild()
+        BalanceSnapshot.rebuild()
+        self.assertEqual(rollups, set(MonthlyCategoryRollup.objects.values_list('year', 'month', 'category_id', 'transaction_type', 'total', 'count')))
+        self.assertEqual(snapshots, set(BalanceSnapshot.objects.exclude(net_change=0).values_list('account_id', 'year', 'month', 'net_change')))
+
+    def test_recategorize_within_type_touches_rollups_only(self):
+        before = self._balances()
+        summary = Transaction.objects.filter(user=self.user).bulk_edit(category=self.coffee)
+        self.assertEqual(summary, {'updated': 40, 'retyped': 0, 'balance_changes': {}})
+        self.assertEqual(self._balances(), before)
+        self.assertFalse(Transaction.objects.filter(category=self.groceries).exists())
+        self._rebuilt_matches()
+
+    def test_type_flip_moves_balances_both_ways(self):
+        summary = Transaction.objects.filter(user=self.user, date__month=4).bulk_edit(category=self.refunds)
+        self.assertEqual(summary['retyped'], 20)
+        # Ten 10.00 expenses per account become ten 10.00 incomes
+        self.assertEqual(summary['balance_changes'], {self.checking.pk: Decimal('200.00'), self.cash.pk: Decimal('200.00')})
+        self.assertEqual(self._balances(), {'Checking': Decimal('1000.00'), 'Cash': Decimal('100.00')})
+        self.assertEqual(set(Transaction.objects.filter(date__month=4).values_list('transaction_type', flat=True)), {'income'})
+        self._rebuilt_matches()
+
+    def test_account_and_date_move(self):
+        Transaction.objects.filter(user=self.user, account=self.cash).bulk_edit(account=self.checking, date=date(2026, 5, 1))
+        self.assertEqual(self._balances(), {'Checking': Decimal('600.00'), 'Cash': Decimal('100.00')})
+        self.assertEqual(Transaction.objects.filter(date=date(2026, 5, 1), account=self.checking).count(), 20)
+        self._rebuilt_matches()
+
+    def test_query_count_does_not_depend_on_row_count(self):
+        def edit_queries(category):
+            with CaptureQueriesContext(connection) as ctx:
+                Transaction.objects.filter(user=self.user).bulk_edit(category=category)
+            return len(ctx.captured_queries)
+
+        # Both categories' rollup buckets exist from here on
+        edit_queries(self.coffee)
+        few = edit_queries(self.groceries)
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, category=self.groceries, account=self.checking, amount=Decimal('1.00'),
+                        description='Bulk', date=date(2026, 3, 15), transaction_type='expenses')
+            for _ in range(500)
+        ])
+        # Lock check, aggregate, four rollup buckets, the UPDATE and the savepoint pair
+        self.assertEqual(edit_queries(self.coffee), few)
+        self.assertEqual(few, 9)
+
+    def test_locked_periods_are_respected(self):
+        CutoffReport.objects.create(user=self.user, name='March', start_date=date(2026, 3, 1),
+                                    end_date=date(2026, 3, 31), is_locked=True)
+        with self.assertRaises(ValidationError):
+            Transaction.objects.filter(user=self.user).bulk_edit(category=self.coffee)
+        # Moving April rows into March is refused as well
+        with self.assertRaises(ValidationError):
+            Transaction.objects.filter(user=self.user, date__month=4).bulk_edit(date=date(2026, 3, 20))
+        self.assertFalse(Transaction.objects.filter(category=self.coffee).exists())
+
+    def test_endpoint_by_ids_and_by_filter(self):
+        ids = list(Transaction.objects.filter(account=self.cash).values_list('pk', flat=True)[:5])
+        response = self.client.post(reverse('transaction_bulk_edit'), {'ids': ids, 'category': self.refunds.pk})
+        self.assertEqual(response.json(), {
+            'status': 'success', 'updated': 5, 'retyped': 5, 'balance_changes': {str(self.cash.pk): '100.00'},
+        })
+
+        # The transactions page filters come in the query string
+        response = self.client.post(
+            reverse('transaction_bulk_edit') + f'?start_date=2026-04-01&end_date=2026-04-30&account={self.checking.pk}',
+            {'category': self.coffee.pk},
+        )
+        self.assertEqual(response.json()['updated'], 10)
+
+    def test_endpoint_rejects_empty_edits_and_selections(self):
+        url = reverse('transaction_bulk_edit')
+        self.assertEqual(self.client.post(url, {'ids': [1]}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'category': self.coffee.pk}).status_code, 400)
+
+        other = User.objects.create_user(username='other', password='password123')
+        theirs = Category.objects.create(group=CategoryGroup.objects.create(user=other, name='X'), name='Theirs')
+        self.assertEqual(self.client.post(url, {'ids': [1], 'category': theirs.pk}).status_code, 400)
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.categorytree import CategoryTree
+from core.datacache import user_data
+from core.models import Account, Budget, Category, CategoryGroup, Transaction
+
+
+class CategoryTreeTests(TransactionTestCase):
+    # Real commits: writes inside an open transaction deliberately bypass the cache
+    def setUp(self):
+        cache.clear()
+        user_data.reset()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        self.food = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        self.groceries = Category.objects.create(group=self.food, name='Groceries')
+        Category.objects.create(group=self.food, name='Coffee')
+        CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        now = timezone.now()
+        self.now = now
+        Budget.objects.create(user=self.user, category=self.groceries, year=now.year, month=now.month, amount=Decimal('200'))
+        account = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000'))
+        Transaction.objects.create(user=self.user, account=account, category=self.groceries,
+                                   transaction_type='expenses', amount=Decimal('50'), date=now.date())
+
+    def _core_queries(self, method, url, data=None, **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, **extra)
+        return response, [q['sql'] for q in ctx.captured_queries if 'core_' in q['sql']]
+
+    def test_tree_is_one_query(self):
+        Category.objects.bulk_create([Category(group=self.food, name=f'Extra {i}') for i in range(100)])
+        tree = CategoryTree(self.user, self.now.year, self.now.month)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(tree.total_categories, 102)
+            self.assertEqual([group.name for group in tree.expenses_groups], ['Food'])
+            # Groups without categories are kept
+            self.assertEqual([group.categories for group in tree.income_groups], [[]])
+        # The rest is the cache miss
+        self.assertEqual(len([q for q in ctx.captured_queries if 'core_' in q['sql']]), 1)
+
+        [food] = tree.expenses_groups
+        groceries = next(category for category in food.categories if category.name == 'Groceries')
+        self.assertEqual((groceries.current_budget, groceries.current_spent), (Decimal('200'), Decimal('50')))
+        self.assertEqual(groceries.budget_percentage, Decimal('25'))
+        self.assertEqual(food.group_budget_total, Decimal('200'))
+        self.assertEqual(tree.budget_map, {self.groceries.pk: Decimal('200')})
+
+    def test_page_is_served_from_the_cache_until_data_changes(self):
+        response, first = self._core_queries('get', reverse('categories'))
+        self.assertContains(response, 'Groceries')
+        self.assertEqual(len(first), 1)
+
+        _, second = self._core_queries('get', reverse('categories'))
+        self.assertEqual(second, [])
+
+        self.client.post(reverse('budget_set'), {'category': self.groceries.pk, 'amount': '400'})
+        response, third = self._core_queries('get', reverse('categories'))
+        self.assertEqual(len(third), 1)
+        self.assertContains(response, '$400.00')
+
+    def test_xhr_errors_do_not_build_the_tree(self):
+        xhr = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        response, queries = self._core_queries('post', reverse('category_group_create'), {'name': ''}, **xhr)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(queries, [])
+
+        response, queries = self._core_queries(
+            'post', reverse('category_update', args=[self.groceries.pk]), {'group': self.food.pk, 'name': ''}, **xhr,
+        )
+        self.assertEqual(response.status_code, 400)
+        # The object and the group choice, nothing of the tree
+        self.assertFalse([sql for sql in queries if 'core_budget' in sql or 'core_monthlycategoryrollup' in sql])
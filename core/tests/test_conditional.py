@@ -0,0 +1,109 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.datacache import user_data
+from core.models import Category, CategoryGroup, CutoffReport, Transaction
+
+
+@override_settings(REPORT_PDF_ASYNC=False)
+class ConditionalResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.rent = Category.objects.create(group=group, name='Rent')
+        self.tx = Transaction.objects.create(
+            user=self.user, category=self.rent, amount=Decimal('700.00'), description='Rent', date=date(2026, 1, 5),
+        )
+        self.report = CutoffReport.objects.create(
+            user=self.user, name='January', start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), is_locked=True,
+        )
+
+    def _revalidate(self, url):
+        # The first page view sets the CSRF cookie, which is part of the ETag
+        self.client.get(url)
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        return first, second, [q['sql'] for q in ctx.captured_queries]
+
+    def test_charts_answer_304_without_aggregating(self):
+        first, second, queries = self._revalidate(reverse('dashboard_charts'))
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertFalse([sql for sql in queries if 'SUM(' in sql])
+
+    def test_writes_change_the_etag(self):
+        url = reverse('dashboard_charts')
+        etag = self.client.get(url)['ETag']
+
+        fee = Transaction.objects.create(
+            user=self.user, category=self.rent, amount=Decimal('50.00'), description='Fee', date=date(2026, 2, 5),
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        fee.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_comes_from_the_database_not_the_cache(self):
+        # A write made in another process, whose cache version bump this one never sees
+        fee = Transaction.objects.create(
+            user=self.user, category=self.rent, amount=Decimal('50.00'), description='Fee', date=date(2026, 2, 5),
+        )
+        url = reverse('dashboard_charts')
+        etag = self.client.get(url)['ETag']
+
+        with mock.patch.object(user_data, 'invalidate'):
+            fee.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        with mock.patch.object(user_data, 'invalidate'):
+            self.rent.name = 'Housing'
+            self.rent.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_query_string_is_part_of_the_etag(self):
+        etag = self.client.get(reverse('dashboard_charts'))['ETag']
+        response = self.client.get(reverse('dashboard_charts') + '?months=3', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_locked_report_revalidates_from_the_report_row(self):
+        _, second, queries = self._revalidate(reverse('report_detail', args=[self.report.pk]))
+
+        self.assertEqual(second.status_code, 304)
+        self.assertFalse([sql for sql in queries if 'core_transaction' in sql])
+
+    def test_pdf_download_answers_304_without_rendering(self):
+        _, second, queries = self._revalidate(reverse('report_pdf', args=[self.report.pk]))
+
+        self.assertEqual(second.status_code, 304)
+        self.assertFalse([sql for sql in queries if 'core_reportpdf' in sql])
+
+    def test_unlocking_changes_the_report_etag(self):
+        url = reverse('report_detail', args=[self.report.pk])
+        etag = self.client.get(url)['ETag']
+
+        self.client.post(reverse('report_lock_toggle', args=[self.report.pk]))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_other_users_report_is_still_404(self):
+        other = User.objects.create_user(username='other', password='password123')
+        report = CutoffReport.objects.create(user=other, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31))
+        self.assertEqual(self.client.get(reverse('report_detail', args=[report.pk])).status_code, 404)
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.datacache import user_data
+from core.locks import cutoff_locks
+from core.models import Account, Budget, Category, CategoryGroup, Transaction
+
+
+class DashboardCacheTests(TransactionTestCase):
+    # Real commits: writes inside an open transaction deliberately bypass the cache
+    def setUp(self):
+        cache.clear()
+        user_data.reset()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.rent = Category.objects.create(group=group, name='Rent')
+        self.account = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+
+    def _dashboard_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in ctx.captured_queries]
+
+    def test_repeat_loads_are_served_from_the_cache(self):
+        _, first = self._dashboard_queries()
+        _, second = self._dashboard_queries()
+
+        # Only the session and user lookups remain
+        self.assertLess(len(second), len(first))
+        self.assertFalse([sql for sql in second if 'core_' in sql])
+        self.assertEqual(user_data.stats()['hits'], 1)
+        self.assertEqual(user_data.stats()['hit_rate'], 0.5)
+
+    def test_writes_invalidate_the_summary(self):
+        self._dashboard_queries()
+
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=self.rent, amount=Decimal('250.00'),
+            description='Rent', date=timezone.now().date(),
+        )
+        response, _ = self._dashboard_queries()
+        self.assertEqual(response.context['total_balance'], Decimal('750.00'))
+        self.assertEqual(response.context['recent_transactions'][0].description, 'Rent')
+
+        Budget.objects.create(user=self.user, category=self.rent, amount=Decimal('500.00'))
+        response, _ = self._dashboard_queries()
+        self.assertEqual(response.context['budget_limit'], Decimal('500.00'))
+        self.assertEqual(response.context['budget_percentage'], Decimal('50'))
+
+    def test_other_users_writes_keep_the_cache(self):
+        self._dashboard_queries()
+        other = User.objects.create_user(username='other', password='password123')
+        Account.objects.create(user=other, name='Other', type='checking')
+
+        _, queries = self._dashboard_queries()
+        self.assertFalse([sql for sql in queries if 'core_' in sql])
+
+    def test_pending_changes_of_other_caches_do_not_bypass(self):
+        built = []
+        with transaction.atomic():
+            # A pending lock invalidation of the same user is not a pending data change
+            cutoff_locks.invalidate(self.user.pk)
+            user_data.get_or_set(self.user.pk, 'probe', lambda: built.append(1) or 'value')
+            user_data.get_or_set(self.user.pk, 'probe', lambda: built.append(1) or 'value')
+        self.assertEqual(built, [1])
+        self.assertEqual(user_data.stats()['bypassed'], 0)
+
+    def test_a_committed_write_bumps_the_version_once(self):
+        before = user_data.version(self.user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            Transaction.objects.create(
+                user=self.user, account=self.account, category=self.rent, amount=Decimal('250.00'),
+                description='Rent', date=timezone.now().date(),
+            )
+        # The ledger and the row itself both invalidate, the version is written once on commit
+        bumps = [q['sql'] for q in ctx.captured_queries
+                 if q['sql'].startswith(('INSERT', 'UPDATE')) and f'user_data:{self.user.pk}:version' in q['sql']]
+        self.assertEqual(len(bumps), 1)
+        self.assertNotEqual(user_data.version(self.user.pk), before)
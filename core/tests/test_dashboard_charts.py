@@ -0,0 +1,57 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core.analytics import monthly_income_expense, parse_months, MAX_SERIES_MONTHS
+from core.models import Category, CategoryGroup, Transaction
+
+
+class MonthlySeriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client = Client()
+        self.client.login(username='testuser', password='password123')
+
+        income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        expense_group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.salary = Category.objects.create(group=income_group, name='Salary')
+        self.rent = Category.objects.create(group=expense_group, name='Rent')
+
+        Transaction.objects.create(user=self.user, category=self.salary, amount=Decimal('3000.00'),
+                                   description='Salary', date=date(2026, 3, 15))
+        Transaction.objects.create(user=self.user, category=self.rent, amount=Decimal('1200.00'),
+                                   description='Rent', date=date(2026, 3, 1))
+        Transaction.objects.create(user=self.user, category=self.rent, amount=Decimal('1250.00'),
+                                   description='Rent', date=date(2026, 5, 1))
+
+    def test_series_fills_empty_months(self):
+        series = monthly_income_expense(self.user, months=4, end=date(2026, 5, 20))
+
+        self.assertEqual(series['months'], ['Feb', 'Mar', 'Apr', 'May'])
+        self.assertEqual(series['income'], [0.0, 3000.0, 0.0, 0.0])
+        self.assertEqual(series['expense'], [0.0, 1200.0, 0.0, 1250.0])
+
+    def test_query_count_is_constant_in_window_size(self):
+        for months in (1, 6, 24, MAX_SERIES_MONTHS):
+            with self.assertNumQueries(1):
+                series = monthly_income_expense(self.user, months=months, end=date(2026, 5, 20))
+            self.assertEqual(len(series['income']), months)
+
+    def test_parse_months(self):
+        self.assertEqual(parse_months('24'), 24)
+        self.assertEqual(parse_months(None), 6)
+        self.assertEqual(parse_months('abc'), 6)
+        self.assertEqual(parse_months('0'), 1)
+        self.assertEqual(parse_months('100000'), MAX_SERIES_MONTHS)
+
+    def test_charts_view_months_parameter(self):
+        response = self.client.get(reverse('dashboard_charts'), {'months': 24})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['months']), 24)
+        self.assertEqual(len(data['income']), 24)
+        self.assertEqual(len(data['expense']), 24)
@@ -0,0 +1,154 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from core.importers import TransactionImporter, iter_csv_records, iter_ofx_records, parse_amount
+from core.models import Account, Category, CategoryGroup, CutoffReport, MonthlyCategoryRollup, Transaction
+
+CSV_EXPORT = """Date,Description,Amount,Category
+2026-01-05,Paycheck,"1,000.00",Salary
+2026-01-06,Rent,-700.00,Rent
+01/07/2026,Coffee,(4.50),
+2026-01-08,Broken,abc,Rent
+"""
+
+OFX_EXPORT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260110120000
+<TRNAMT>-25.00
+<NAME>GROCERY STORE
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260111
+<TRNAMT>200.00
+<MEMO>Refund
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class TransactionImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        expense_group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.rent = Category.objects.create(group=expense_group, name='Rent')
+        self.misc = Category.objects.create(group=expense_group, name='Misc')
+        self.salary = Category.objects.create(group=income_group, name='Salary')
+        self.account = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('100.00'))
+
+    def _importer(self, **kwargs):
+        return TransactionImporter(
+            self.user, account=self.account, expense_category=self.misc, income_category=self.salary, **kwargs
+        )
+
+    def test_parse_amount(self):
+        self.assertEqual(parse_amount('$1,234.50'), Decimal('1234.50'))
+        self.assertEqual(parse_amount('(4.5)'), Decimal('-4.50'))
+
+    def test_csv_import_applies_balances_and_rollups_in_batches(self):
+        result = self._importer(batch_size=2).run(iter_csv_records(StringIO(CSV_EXPORT)))
+
+        self.assertEqual((result.created, result.skipped), (3, 1))
+        self.assertEqual(result.errors[0]['line'], 5)
+
+        coffee = Transaction.objects.get(description='Coffee')
+        self.assertEqual((coffee.category, coffee.amount, coffee.transaction_type), (self.misc, Decimal('4.50'), 'expenses'))
+        self.assertEqual(coffee.date, date(2026, 1, 7))
+        self.assertEqual(Transaction.objects.get(description='Paycheck').transaction_type, 'income')
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('395.50'))
+        rent = MonthlyCategoryRollup.objects.get(user=self.user, category=self.rent, year=2026, month=1)
+        self.assertEqual((rent.total, rent.count), (Decimal('700.00'), 1))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def export(rows):
+            return iter_csv_records(StringIO('Date,Description,Amount\n' + '2026-02-01,Card,-1.00\n' * rows))
+
+        self._importer().run(export(1))
+        with self.assertNumQueries(8):
+            # lookups, savepoint, insert, balance, snapshot and rollup updates, release
+            self._importer().run(export(100))
+        self.assertEqual(Transaction.objects.count(), 101)
+
+    def test_ofx_import(self):
+        result = self._importer().run(iter_ofx_records(StringIO(OFX_EXPORT)))
+        self.assertEqual(result.created, 2)
+        grocery = Transaction.objects.get(description='GROCERY STORE')
+        self.assertEqual((grocery.category, grocery.date), (self.misc, date(2026, 1, 10)))
+        self.assertEqual(Transaction.objects.get(description='Refund').category, self.salary)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('275.00'))
+
+    def test_rows_in_locked_periods_are_skipped(self):
+        CutoffReport.objects.create(
+            user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 6),
+            is_locked=True,
+        )
+        result = self._importer().run(iter_csv_records(StringIO(CSV_EXPORT)))
+        self.assertEqual((result.created, result.skipped), (1, 3))
+        self.assertEqual(list(Transaction.objects.values_list('description', flat=True)), ['Coffee'])
+
+    def test_import_view(self):
+        upload = SimpleUploadedFile('export.csv', CSV_EXPORT.encode('utf-8-sig'), content_type='text/csv')
+        response = self.client.post(reverse('transaction_import'), {
+            'file': upload,
+            'account': self.account.pk,
+            'expense_category': self.misc.pk,
+            'income_category': self.salary.pk,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['status'], data['created'], data['skipped']), ('success', 3, 1))
+
+    def test_import_view_rejects_missing_columns(self):
+        upload = SimpleUploadedFile('export.csv', b'foo,bar\n1,2\n', content_type='text/csv')
+        response = self.client.post(reverse('transaction_import'), {'file': upload})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unreadable_file_keeps_the_rows_read_before(self):
+        # The upload is decoded in chunks: the bad byte has to sit past the first one
+        rows = ''.join(f'2026-01-{1 + i % 28:02d},Row {i},-1.00,Rent\n' for i in range(1000))
+        content = ('Date,Description,Amount,Category\n' + rows).encode() + b'2026-01-06,Caf\xe9,-1.00,Rent\n'
+        upload = SimpleUploadedFile('export.csv', content, content_type='text/csv')
+        response = self.client.post(reverse('transaction_import'), {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], 'partial')
+        self.assertGreater(data['created'], 0)
+        # Every row up to the reported line went in
+        self.assertEqual(data['created'], data['aborted']['after_line'] - 1)
+        self.assertEqual(Transaction.objects.count(), data['created'])
+
+    def test_amounts_too_large_for_the_column_are_row_errors(self):
+        export = "Date,Description,Amount,Category\n2026-01-05,Huge,-12345678901.00,Rent\n2026-01-06,Rent,-7.00,Rent\n2026-01-07,Nan,NaN,Rent\n"
+        result = self._importer().run(iter_csv_records(StringIO(export)))
+
+        self.assertEqual((result.created, result.skipped), (1, 2))
+        self.assertEqual([error['line'] for error in result.errors], [2, 4])
+
+    def test_malformed_csv_is_a_file_error(self):
+        # A field past csv.field_size_limit() makes the reader raise csv.Error
+        export = f'Date,Amount,Description\n2026-01-05,-1.00,Ok\n2026-01-06,-2.00,"{"x" * 200000}"\n'
+        result = self._importer().run(iter_csv_records(StringIO(export)))
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.aborted['after_line'], 2)
+
+    def test_import_view_rejects_non_numeric_selections(self):
+        upload = SimpleUploadedFile('export.csv', CSV_EXPORT.encode(), content_type='text/csv')
+        response = self.client.post(reverse('transaction_import'), {'file': upload, 'account': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Transaction.objects.exists())
@@ -0,0 +1,109 @@
+import time
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.checks import check_shared_cache
+from core.locks import CutoffLockCache, LockedIntervals, cutoff_locks
+from core.models import Account, Category, CategoryGroup, CutoffReport, Transaction
+
+
+class LockedIntervalsTests(TestCase):
+    def test_merges_and_bisects(self):
+        intervals = LockedIntervals([
+            (date(2026, 3, 1), date(2026, 3, 31)),
+            (date(2026, 1, 1), date(2026, 1, 31)),
+            (date(2026, 2, 1), date(2026, 2, 10)),
+            (date(2026, 1, 15), date(2026, 1, 20)),
+        ])
+        self.assertEqual(list(intervals), [
+            (date(2026, 1, 1), date(2026, 2, 10)),
+            (date(2026, 3, 1), date(2026, 3, 31)),
+        ])
+        self.assertTrue(intervals.contains(date(2026, 2, 10)))
+        self.assertFalse(intervals.contains(date(2026, 2, 11)))
+        self.assertFalse(intervals.contains(date(2025, 12, 31)))
+        self.assertTrue(intervals.contains(date(2026, 3, 31)))
+        self.assertFalse(intervals.contains(date(2026, 4, 1)))
+        self.assertFalse(LockedIntervals().contains(date(2026, 1, 1)))
+
+
+class CutoffLockCacheTests(TransactionTestCase):
+    """Runs outside a wrapping transaction so commits, and therefore caching, happen as in production."""
+    def setUp(self):
+        cache.clear()
+        cutoff_locks.reset()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.category = Category.objects.create(group=group, name='Rent')
+        self.account = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('0.00'))
+
+    def _create(self, day):
+        return Transaction.objects.create(
+            user=self.user, category=self.category, account=self.account,
+            amount=Decimal('10.00'), description='tx', date=day,
+        )
+
+    def test_lock_checks_are_served_from_memory(self):
+        CutoffReport.objects.create(user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), is_locked=True)
+
+        self._create(date(2026, 2, 1))
+        with self.assertNumQueries(0):
+            self.assertTrue(cutoff_locks.is_locked(self.user.pk, date(2026, 1, 15)))
+            self.assertFalse(cutoff_locks.is_locked(self.user.pk, date(2026, 2, 15)))
+
+        stats = cutoff_locks.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['local_hits'], 2)
+
+        # Another process only shares the Django cache
+        cutoff_locks.reset()
+        self.assertTrue(cutoff_locks.is_locked(self.user.pk, date(2026, 1, 15)))
+        self.assertEqual(cutoff_locks.stats()['shared_hits'], 1)
+
+    def test_toggle_create_and_delete_invalidate(self):
+        report = CutoffReport.objects.create(user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31))
+        self.assertFalse(cutoff_locks.is_locked(self.user.pk, date(2026, 1, 15)))
+
+        self.client.login(username='testuser', password='password123')
+        self.client.post(reverse('report_lock_toggle', args=[report.pk]))
+        with self.assertRaises(ValidationError):
+            self._create(date(2026, 1, 15))
+
+        other = CutoffReport.objects.create(user=self.user, start_date=date(2026, 3, 1), end_date=date(2026, 3, 31), is_locked=True)
+        self.assertTrue(cutoff_locks.is_locked(self.user.pk, date(2026, 3, 15)))
+
+        other.delete()
+        self.assertFalse(cutoff_locks.is_locked(self.user.pk, date(2026, 3, 15)))
+        self._create(date(2026, 3, 15))
+
+    def test_invalidation_reaches_other_processes(self):
+        # A second cache object stands in for another worker: only the Django cache is shared
+        other_process = CutoffLockCache()
+        self.assertFalse(other_process.is_locked(self.user.pk, date(2026, 1, 15)))
+        CutoffReport.objects.create(user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), is_locked=True)
+        # It trusts its own copy for local_ttl seconds, then checks the shared version
+        later = time.monotonic() + other_process.local_ttl
+        with mock.patch('core.datacache.time.monotonic', return_value=later):
+            self.assertTrue(other_process.is_locked(self.user.pk, date(2026, 1, 15)))
+
+    def test_one_pending_invalidation_per_transaction(self):
+        with transaction.atomic():
+            for day in (1, 2, 3):
+                CutoffReport.objects.create(user=self.user, start_date=date(2026, 1, day), end_date=date(2026, 1, day))
+            self.assertEqual(len(connection.run_on_commit), 1)
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_process_local_cache_is_reported(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ['core.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}):
+            self.assertEqual(check_shared_cache(None), [])
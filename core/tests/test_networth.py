@@ -0,0 +1,97 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.analytics import MAX_SERIES_POINTS, balances_at, net_worth_series, period_count, period_ends
+from core.models import Account, Category, CategoryGroup, Transaction
+
+
+class NetWorthSeriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        expense_group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.rent = Category.objects.create(group=expense_group, name='Rent')
+        self.salary = Category.objects.create(group=income_group, name='Salary')
+        self.checking = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+        self.card = Account.objects.create(user=self.user, name='Card', type='credit', balance=Decimal('-50.00'))
+        self.hidden = Account.objects.create(user=self.user, name='Hidden', type='savings', balance=Decimal('999.00'), include_in_total=False)
+
+        start = date(2025, 12, 20)
+        for offset in range(0, 90, 4):
+            day = start + timedelta(days=offset)
+            self._create(self.rent, '12.50', day, self.card)
+            self._create(self.salary, '40.00', day + timedelta(days=1), self.checking)
+            self._create(self.rent, '5.00', day, self.hidden)
+
+    def _create(self, category, amount, day, account):
+        return Transaction.objects.create(
+            user=self.user, category=category, account=account,
+            amount=Decimal(amount), description='tx', date=day,
+        )
+
+    def _expected(self, day):
+        balances = balances_at(self.user, day)
+        assets = float(balances[self.checking.pk])
+        liabilities = float(balances[self.card.pk])
+        return assets, abs(liabilities), assets + liabilities
+
+    def test_period_ends(self):
+        self.assertEqual(period_ends(date(2026, 1, 28), date(2026, 2, 3), 'week'), [date(2026, 2, 1), date(2026, 2, 3)])
+        self.assertEqual(period_ends(date(2026, 1, 15), date(2026, 3, 10), 'month'),
+                         [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 10)])
+        self.assertEqual(len(period_ends(date(2026, 1, 1), date(2026, 1, 31), 'day')), 31)
+
+    def test_period_count_matches_period_ends(self):
+        for start in (date(2025, 12, 29), date(2026, 1, 1), date(2026, 1, 4), date(2026, 2, 28)):
+            for end in (start - timedelta(days=1), start, date(2026, 3, 1), date(2026, 12, 31)):
+                for granularity in ('day', 'week', 'month'):
+                    self.assertEqual(period_count(start, end, granularity), len(period_ends(start, end, granularity)),
+                                     (start, end, granularity))
+
+    def test_oversized_range_is_refused_before_enumerating(self):
+        with mock.patch('core.analytics.period_ends') as ends, self.assertRaises(ValueError):
+            net_worth_series(self.user, date(1, 1, 1), date(9999, 12, 31), 'day')
+        ends.assert_not_called()
+        self.assertEqual(period_count(date(2026, 1, 1), date(2026, 1, 1) + timedelta(days=MAX_SERIES_POINTS), 'day'),
+                         MAX_SERIES_POINTS + 1)
+
+    def test_series_matches_point_in_time_balances(self):
+        for granularity in ('day', 'week', 'month'):
+            series = net_worth_series(self.user, date(2025, 12, 1), date(2026, 3, 10), granularity)
+            for label, assets, liabilities, net in zip(
+                series['labels'], series['assets'], series['liabilities'], series['net_worth']
+            ):
+                self.assertEqual((assets, liabilities, net), self._expected(date.fromisoformat(label)), (granularity, label))
+
+    def test_query_count_is_constant(self):
+        with self.assertNumQueries(3):
+            series = net_worth_series(self.user, date(2016, 3, 11), date(2026, 3, 10), 'day')
+        self.assertEqual(len(series['labels']), 3652)
+
+    def test_ten_year_daily_series_for_fifty_accounts_is_fast(self):
+        accounts = [Account(user=self.user, name=f'A{i}', type='savings' if i % 2 else 'loan', balance=100) for i in range(50)]
+        Account.objects.bulk_create(accounts)
+
+        started = time.perf_counter()
+        net_worth_series(self.user, date(2016, 3, 11), date(2026, 3, 10), 'day')
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_view(self):
+        response = self.client.get(reverse('dashboard_networth'), {
+            'start': '2026-01-01', 'end': '2026-03-31', 'granularity': 'month',
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['labels'], ['2026-01-31', '2026-02-28', '2026-03-31'])
+        self.assertEqual(data['net_worth'][-1], self._expected(date(2026, 3, 31))[2])
+
+        self.assertEqual(len(self.client.get(reverse('dashboard_networth')).json()['labels']), 12)
+        self.assertEqual(self.client.get(reverse('dashboard_networth'), {'granularity': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('dashboard_networth'), {'start': 'nope'}).status_code, 400)
@@ -0,0 +1,229 @@
+"""
+Query-count and latency budgets for every route in core/urls.py.
+
+Each route is requested a few times against a synthetic user with a realistic amount of
+data; the worst query count and the p95 wall time must stay within the route's budget.
+Queries of the session and auth middleware are not counted. Latency budgets are generous
+wall-clock limits for a developer machine on SQLite; scale them with PERF_LATENCY_SCALE on
+slower runners. The suite is marked `performance` (`-m "not performance"` skips it) and
+`pytest core/tests/test_performance.py -s` prints the results table.
+"""
+import math
+import os
+import random
+import time
+from datetime import date
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import urls
+from core.models import Account, CategorizationRule, Category, CategoryGroup, CutoffReport, Transaction
+from core.synthetic import generate_user
+
+SAMPLES = 5
+LATENCY_SCALE = float(os.environ.get('PERF_LATENCY_SCALE', '1'))
+
+# url name: (max queries, p95 milliseconds)
+BUDGETS = {
+    'login': (0, 150),
+    'signup': (0, 150),
+    'logout': (1, 100),
+    'dashboard': (9, 300),
+    'home': (9, 300),
+    'categories': (5, 300),
+    'category_group_create': (4, 150),
+    'category_group_update': (6, 150),
+    'category_create': (4, 150),
+    'category_update': (5, 150),
+    'category_delete': (7, 150),
+    'accounts': (2, 300),
+    'account_create': (2, 150),
+    'account_update': (3, 150),
+    'account_delete': (12, 150),
+    'transactions': (5, 400),
+    'transaction_page': (2, 300),
+    'transaction_import': (12, 300),
+    'transaction_create': (14, 150),
+    # One UPDATE per touched account, snapshot month and rollup bucket; 20 rows here
+    'transaction_bulk_delete': (45, 200),
+    'transaction_bulk_edit': (45, 200),
+    'transaction_apply_rules': (45, 300),
+    'rules': (4, 150),
+    'rule_delete': (3, 150),
+    'rule_suggest': (2, 150),
+    'reports': (2, 200),
+    'report_create': (7, 200),
+    'report_detail': (4, 400),
+    'report_lock_toggle': (3, 150),
+    # The first sample renders the document
+    'report_pdf': (17, 1500),
+    'report_pdf_status': (4, 150),
+    'dashboard_charts': (5, 200),
+    'dashboard_networth': (4, 200),
+    'budget_set': (8, 150),
+    'budget_status': (5, 150),
+}
+
+
+def p95(samples):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+@tag('performance')
+@override_settings(REPORT_PDF_ASYNC=False)
+class RouteBudgetTests(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = generate_user(
+            'perfuser', transactions=3000, days=730, end=date(2026, 6, 30), accounts_per_type=2,
+            reports=4, password='password123', rng=random.Random(42),
+        )
+        cls.group = CategoryGroup.objects.filter(user=cls.user, transaction_type='expenses').first()
+        cls.category = Category.objects.filter(group=cls.group).first()
+        cls.account = Account.objects.filter(user=cls.user, type='checking').first()
+        cls.locked_report = CutoffReport.objects.filter(user=cls.user, is_locked=True).first()
+        cls.open_report = CutoffReport.objects.filter(user=cls.user, is_locked=False).first()
+        # Other than the bulk edit's category, so re-applying the rules moves its rows back
+        ruled = Category.objects.filter(group=cls.group).exclude(pk=cls.category.pk).first()
+        CategorizationRule.objects.create(user=cls.user, pattern='Market', category=ruled)
+        CategorizationRule.objects.create(user=cls.user, match_type='regex', pattern=r'express|online', category=ruled)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.results:
+            print(f"\n{'route':<24} {'queries':>8} {'budget':>7} {'p95 ms':>9} {'budget':>8}")
+            for name, (queries, latency) in sorted(cls.results.items()):
+                max_queries, max_latency = BUDGETS[name]
+                print(f"{name:<24} {queries:>8} {max_queries:>7} {latency:>9.1f} {max_latency * LATENCY_SCALE:>8.0f}")
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.login(username='perfuser', password='password123')
+
+    def requests(self):
+        """url name -> callable returning (method, url, data) for one sample."""
+        xhr = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        counter = iter(range(10**6))
+
+        def new_category():
+            return Category.objects.create(group=self.group, name=f'Temp {next(counter)}')
+
+        def new_account():
+            return Account.objects.create(user=self.user, name=f'Temp {next(counter)}', type='cash')
+
+        def new_rule():
+            return CategorizationRule.objects.create(user=self.user, pattern=f'Temp {next(counter)}', category=self.category)
+
+        def csv_upload():
+            rows = '\n'.join(f'2026-06-{day:02d},Coffee,-3.50' for day in range(1, 21))
+            return SimpleUploadedFile('export.csv', f'date,description,amount\n{rows}\n'.encode())
+
+        return {
+            'login': lambda: ('get', reverse('login'), None),
+            'signup': lambda: ('get', reverse('signup'), None),
+            'logout': lambda: ('post', reverse('logout'), None),
+            'dashboard': lambda: ('get', reverse('dashboard'), None),
+            'home': lambda: ('get', reverse('home'), None),
+            'categories': lambda: ('get', reverse('categories'), None),
+            'category_group_create': lambda: ('post', reverse('category_group_create'), {
+                'name': f'Group {next(counter)}', 'icon': 'folder', 'transaction_type': 'expenses',
+            }),
+            'category_group_update': lambda: ('post', reverse('category_group_update', args=[self.group.pk]), {
+                'name': self.group.name, 'icon': 'folder', 'transaction_type': 'expenses',
+            }),
+            'category_create': lambda: ('post', reverse('category_create'), {
+                'group': self.group.pk, 'name': f'Category {next(counter)}', 'icon': 'tag',
+            }),
+            'category_update': lambda: ('post', reverse('category_update', args=[self.category.pk]), {
+                'group': self.group.pk, 'name': self.category.name, 'icon': 'tag',
+            }),
+            'category_delete': lambda: ('post', reverse('category_delete', args=[new_category().pk]), None),
+            'accounts': lambda: ('get', reverse('accounts'), None),
+            'account_create': lambda: ('post', reverse('account_create'), {
+                'name': f'Account {next(counter)}', 'type': 'cash', 'balance': '10.00', 'icon': 'wallet',
+            }),
+            'account_update': lambda: ('post', reverse('account_update', args=[self.account.pk]), {
+                'name': self.account.name, 'type': 'checking', 'balance': '100.00', 'include_in_total': 'on', 'icon': 'landmark',
+            }),
+            'account_delete': lambda: ('post', reverse('account_delete', args=[new_account().pk]), None),
+            'transactions': lambda: ('get', reverse('transactions'), None),
+            'transaction_page': lambda: ('get', reverse('transaction_page'), None),
+            'transaction_import': lambda: ('post', reverse('transaction_import'), {
+                'file': csv_upload(), 'account': self.account.pk, 'expense_category': self.category.pk,
+            }),
+            'transaction_create': lambda: ('post', reverse('transaction_create'), {
+                'category': self.category.pk, 'account': self.account.pk, 'amount': '12.50',
+                'description': 'Lunch', 'date': '2026-06-15',
+            }),
+            'transaction_bulk_delete': lambda: ('post', reverse('transaction_bulk_delete'), {
+                'ids': list(Transaction.objects.filter(user=self.user, date__gte='2026-06-01').values_list('pk', flat=True)[:20]),
+            }),
+            'transaction_bulk_edit': lambda: ('post', reverse('transaction_bulk_edit'), {
+                'ids': list(Transaction.objects.filter(user=self.user, date__gte='2026-06-01').values_list('pk', flat=True)[:20]),
+                'category': self.category.pk,
+            }),
+            'transaction_apply_rules': lambda: ('post', reverse('transaction_apply_rules'), {
+                'ids': list(Transaction.objects.filter(user=self.user, date__gte='2026-06-01').values_list('pk', flat=True)[:20]),
+            }),
+            'rules': lambda: ('post', reverse('rules'), {
+                'match_type': 'contains', 'pattern': f'Shop {next(counter)}', 'category': self.category.pk, 'priority': 10,
+            }),
+            'rule_delete': lambda: ('post', reverse('rule_delete', args=[new_rule().pk]), None),
+            'rule_suggest': lambda: ('get', reverse('rule_suggest') + '?description=Shop+1&amount=12.50', None),
+            'reports': lambda: ('get', reverse('reports'), None),
+            'report_create': lambda: ('post', reverse('report_create'), {
+                'name': 'Perf', 'start_date': '2026-06-01', 'end_date': '2026-06-30',
+            }),
+            'report_detail': lambda: ('get', reverse('report_detail', args=[self.open_report.pk]), None),
+            'report_lock_toggle': lambda: ('post', reverse('report_lock_toggle', args=[self.open_report.pk]), None),
+            'report_pdf': lambda: ('get', reverse('report_pdf', args=[self.locked_report.pk]), None),
+            'report_pdf_status': lambda: ('get', reverse('report_pdf_status', args=[self.locked_report.pk]), None),
+            'dashboard_charts': lambda: ('get', reverse('dashboard_charts') + '?months=12', None),
+            'dashboard_networth': lambda: ('get', reverse('dashboard_networth') + '?granularity=week', None),
+            'budget_set': lambda: ('post', reverse('budget_set'), {'category': self.category.pk, 'amount': '250'}),
+            'budget_status': lambda: ('get', reverse('budget_status') + '?year=2026&month=6', None),
+        }, xhr
+
+    def measure(self, build, extra):
+        queries, timings = 0, []
+        for _ in range(SAMPLES):
+            method, url, data = build()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = getattr(self.client, method)(url, data, **extra)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.assertLess(response.status_code, 400, msg=f"{url}: {response.status_code}")
+            # Session and user lookups are the middleware's, not the view's
+            queries = max(queries, sum(1 for q in ctx.captured_queries if 'django_session' not in q['sql']
+                                       and 'auth_user' not in q['sql']))
+            if not self.client.session.get('_auth_user_id'):
+                self.client.login(username='perfuser', password='password123')
+        return queries, p95(timings)
+
+    def test_every_route_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names, set(BUDGETS))
+        self.assertEqual(names, set(self.requests()[0]))
+
+    def test_routes_stay_within_budget(self):
+        requests, xhr = self.requests()
+        failures = []
+        for name, build in requests.items():
+            if name in ('login', 'signup'):
+                self.client.logout()
+            queries, latency = self.measure(build, xhr)
+            type(self).results[name] = (queries, latency)
+
+            max_queries, max_latency = BUDGETS[name]
+            if queries > max_queries:
+                failures.append(f"{name}: {queries} queries (budget {max_queries})")
+            if latency > max_latency * LATENCY_SCALE:
+                failures.append(f"{name}: p95 {latency:.0f} ms (budget {max_latency * LATENCY_SCALE:.0f} ms)")
+        self.assertFalse(failures, '\n'.join(failures))
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import QueryRecorder, perf_registry
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        perf_registry.reset()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+
+    def test_unsampled_requests_are_not_recorded(self):
+        response = self.client.get(reverse('dashboard_charts'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(perf_registry.snapshot(), {})
+
+    @override_settings(PERF_SAMPLE_RATE=1)
+    def test_sampled_requests_are_recorded_per_view(self):
+        for _ in range(3):
+            response = self.client.get(reverse('dashboard_charts'))
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+, total;dur=[\d.]+$')
+        stats = perf_registry.snapshot()['dashboard_charts']
+        self.assertEqual(stats['requests'], 3)
+        self.assertGreater(stats['avg_queries'], 0)
+        self.assertEqual(sum(stats['histogram'].values()), 3)
+        self.assertLessEqual(len(stats['slowest_sql']), 5)
+
+    def test_repeated_queries_are_flagged(self):
+        recorder = QueryRecorder()
+        run = lambda sql, params, many, context: None
+        for params in ((1,), (1,), (2,)):
+            recorder(run, 'SELECT * FROM core_category WHERE id = %s', params, False, {})
+        recorder(run, 'SELECT 1', (), False, {})
+
+        summary = recorder.summary()
+        self.assertEqual((summary['count'], summary['duplicates'], summary['similar']), (4, 1, 2))
+
+    def test_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get('/internal/perf/').status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        data = self.client.get('/internal/perf/').json()
+        self.assertEqual(set(data), {'sample_rate', 'routes', 'caches'})
+        self.assertIn('hit_rate', data['caches']['cutoff_locks'])
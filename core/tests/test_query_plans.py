@@ -0,0 +1,77 @@
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Account, Budget, Category, CategoryGroup, CutoffReport, Transaction
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot queries and assert they are answered from the composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=cls.user, name='Home', transaction_type='expenses')
+        cls.category = Category.objects.create(group=group, name='Rent')
+        cls.account = Account.objects.create(user=cls.user, name='Checking', type='checking')
+        for day in range(1, 29):
+            Transaction.objects.create(
+                user=cls.user, category=cls.category, account=cls.account,
+                amount=Decimal('10.00'), description=f'Grocery store #{day}', date=date(2026, 2, day)
+            )
+        CutoffReport.objects.create(user=cls.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), is_locked=True)
+        Budget.objects.create(user=cls.user, category=cls.category, amount=Decimal('100.00'), month=2, year=2026)
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=f"Expected {index_name} in plan:\n{plan}")
+
+    def test_transaction_listing(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(
+                user=self.user, date__gte=date(2026, 2, 1), date__lte=date(2026, 2, 28)
+            ).order_by('-date', '-created_at'),
+            'tx_user_date_created_idx',
+        )
+
+    def test_recent_transactions(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(user=self.user).order_by('-date', '-created_at')[:5],
+            'tx_user_date_created_idx',
+        )
+
+    def test_account_filter(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(account=self.account, date__gte=date(2026, 2, 1)),
+            'tx_account_date_idx',
+        )
+
+    def test_cutoff_lock_check(self):
+        day = date(2026, 1, 15)
+        self.assertUsesIndex(
+            CutoffReport.objects.filter(
+                user=self.user, is_locked=True, start_date__lte=day, end_date__gte=day
+            ).order_by(),
+            'cutoff_user_locked_range_idx',
+        )
+
+    def test_budget_lookup(self):
+        self.assertUsesIndex(
+            Budget.objects.filter(user=self.user, month=2, year=2026),
+            'budget_user_period_idx',
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', "Trigram index only exists on PostgreSQL")
+    def test_description_search(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(description__icontains='grocery'),
+            'tx_description_trgm_idx',
+        )
@@ -0,0 +1,58 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Category, CategoryGroup, CutoffReport, Transaction
+
+
+class ReportBreakdownTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        expenses = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        income = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.rent = Category.objects.create(group=expenses, name='Rent')
+        self.food = Category.objects.create(group=expenses, name='Food')
+        salary = Category.objects.create(group=income, name='Salary')
+        for category, amount in ((self.rent, '700.00'), (self.food, '120.50'), (self.food, '30.00'), (salary, '2000.00')):
+            Transaction.objects.create(
+                user=self.user, category=category, amount=Decimal(amount), description=category.name, date=date(2026, 1, 10),
+            )
+
+    def _create_report(self):
+        self.client.post(reverse('report_create'), {
+            'name': 'January', 'start_date': '2026-01-01', 'end_date': '2026-01-31',
+        })
+        return CutoffReport.objects.get(user=self.user)
+
+    def test_breakdown_is_frozen_on_creation(self):
+        report = self._create_report()
+
+        self.assertEqual(report.breakdown, {
+            'expenses': [['Rent', '700.00'], ['Food', '150.50']],
+            'income': [['Salary', '2000.00']],
+        })
+        self.assertEqual(report.expense_total, Decimal('850.50'))
+        self.assertEqual(report.income_total, Decimal('2000.00'))
+
+    def test_detail_view_reads_the_frozen_breakdown(self):
+        report = self._create_report()
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('1000.00'), description='Late', date=date(2026, 1, 20),
+        )
+
+        response = self.client.get(reverse('report_detail', args=[report.pk]))
+        self.assertEqual(response.context['expenses_breakdown'], [
+            {'category__name': 'Rent', 'total': Decimal('700.00')},
+            {'category__name': 'Food', 'total': Decimal('150.50')},
+        ])
+
+    def test_locking_freezes_a_missing_breakdown(self):
+        report = CutoffReport.objects.create(user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31))
+        self.client.post(reverse('report_lock_toggle', args=[report.pk]))
+
+        report.refresh_from_db()
+        self.assertEqual(report.get_breakdown('income'), [{'category__name': 'Salary', 'total': Decimal('2000.00')}])
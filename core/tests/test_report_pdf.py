@@ -0,0 +1,168 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+from core import reports
+from core.models import Category, CategoryGroup, CutoffReport, ReportPDF, Transaction
+
+
+@override_settings(REPORT_PDF_ASYNC=False)
+class ReportPDFTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.rent = Category.objects.create(group=group, name='Rent')
+        self.tx = Transaction.objects.create(
+            user=self.user, category=self.rent, amount=Decimal('700.00'), description='Rent', date=date(2026, 1, 5),
+        )
+        self.report = CutoffReport.objects.create(
+            user=self.user, name='January', start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+            expense_total=Decimal('700.00'),
+        )
+
+    def _download(self):
+        return self.client.get(reverse('report_pdf', args=[self.report.pk]))
+
+    def test_repeat_downloads_are_served_from_storage(self):
+        with mock.patch('core.reports.build_report_pdf', wraps=reports.build_report_pdf) as build:
+            first = self._download()
+            second = self._download()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.content.startswith(b'%PDF'))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(build.call_count, 1)
+
+    def test_changed_inputs_render_a_new_pdf(self):
+        self._download()
+        old = ReportPDF.objects.get()
+
+        self.tx.description = 'Rent (late)'
+        self.tx.save()
+        self._download()
+
+        # The stale render is dropped once the new one is stored
+        current = ReportPDF.objects.get()
+        self.assertNotEqual(current.fingerprint, old.fingerprint)
+        self.assertEqual(current.status, 'done')
+
+    def test_status_endpoint(self):
+        url = reverse('report_pdf_status', args=[self.report.pk])
+        # Polling never queues anything
+        self.assertEqual(self.client.get(url).json(), {'status': 'missing', 'download_url': None})
+        self.assertFalse(ReportPDF.objects.exists())
+
+        done = {'status': 'done', 'download_url': reverse('report_pdf', args=[self.report.pk])}
+        self.assertEqual(self.client.post(url).json(), done)
+        self.assertEqual(self.client.get(url).json(), done)
+
+    @override_settings(REPORT_PDF_ASYNC=True)
+    def test_queued_jobs_are_drained_by_the_command(self):
+        # on_commit never fires inside the test transaction, so the job stays queued
+        response = self.client.post(reverse('report_pdf_status', args=[self.report.pk]))
+        self.assertEqual(response.json()['status'], 'pending')
+
+        call_command('render_report_pdfs', stdout=StringIO())
+        self.assertEqual(ReportPDF.objects.get().status, 'done')
+
+    @override_settings(REPORT_PDF_ASYNC=True)
+    def test_download_of_a_running_job_does_not_render_again(self):
+        self.client.post(reverse('report_pdf_status', args=[self.report.pk]))
+        ReportPDF.objects.update(status='running')
+
+        with mock.patch('core.reports.build_report_pdf') as build:
+            response = self._download()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status_url'], reverse('report_pdf_status', args=[self.report.pk]))
+        build.assert_not_called()
+
+    @override_settings(REPORT_PDF_ASYNC=True)
+    def test_download_queues_the_job_instead_of_rendering(self):
+        with mock.patch('core.reports._get_executor') as executor, mock.patch('core.reports.build_report_pdf') as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._download()
+        self.assertEqual(response.status_code, 202)
+        executor.return_value.submit.assert_called_once_with(reports._render_in_thread, ReportPDF.objects.get().pk)
+        build.assert_not_called()
+
+    def test_stalled_job_is_queued_again(self):
+        url = reverse('report_pdf_status', args=[self.report.pk])
+        with mock.patch('core.reports.build_report_pdf'), mock.patch('core.reports.render_job'):
+            self.client.post(url)
+        claimed_at = timezone.now() - timedelta(seconds=reports.RENDER_TIMEOUT + 1)
+        ReportPDF.objects.update(status='running', claimed_at=claimed_at)
+
+        self.assertEqual(self.client.get(url).json()['status'], 'stalled')
+        self.assertEqual(self.client.post(url).json()['status'], 'done')
+        # The stalled worker's late result is dropped rather than stored over the new one
+        self.assertFalse(ReportPDF.objects.filter(claimed_at=claimed_at).exists())
+
+    def test_group_type_flip_changes_the_fingerprint(self):
+        before = reports.report_fingerprint(self.report, 'en')
+        self.rent.group.transaction_type = 'income'
+        self.rent.group.save()
+        self.assertNotEqual(reports.report_fingerprint(self.report, 'en'), before)
+
+    def test_new_render_only_replaces_its_own_language(self):
+        spanish = reports.request_pdf(self.report, 'es')
+        stale = ReportPDF.objects.create(report=self.report, fingerprint='stale', language='en',
+                                         layout_version=reports.LAYOUT_VERSION, status='failed')
+        ReportPDF.objects.filter(pk=stale.pk).update(created_at=spanish.created_at)
+
+        english = reports.request_pdf(self.report, 'en')
+        self.assertEqual(set(ReportPDF.objects.values_list('pk', flat=True)), {spanish.pk, english.pk})
+
+    def test_failed_render_is_retried(self):
+        with mock.patch('core.reports.build_report_pdf', side_effect=RuntimeError('boom')):
+            job = reports.request_pdf(self.report, 'en')
+        self.assertEqual((job.status, job.error), ('failed', 'boom'))
+
+        job = reports.request_pdf(self.report, 'en')
+        self.assertEqual(job.status, 'done')
+
+    def test_large_period_is_split_into_table_chunks(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, category=self.rent, transaction_type='expenses', amount=Decimal('1.00'),
+                        description=f'Row {i}', date=date(2026, 1, 1 + i % 28))
+            for i in range(reports.TABLE_CHUNK_ROWS * 2 + 10)
+        ])
+        with mock.patch('core.reports.Table', wraps=reports.Table) as table:
+            response = self._download()
+
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        chunk_sizes = [len(call.args[0]) for call in table.call_args_list if len(call.args[0][0]) == 4]
+        # Header + 200 rows, 200 rows, the remaining 11
+        self.assertEqual(chunk_sizes[-3:], [reports.TABLE_CHUNK_ROWS + 1, reports.TABLE_CHUNK_ROWS, 11])
+
+    def test_story_is_pulled_from_the_iterator_as_it_is_drawn(self):
+        # Guards the streaming template against ReportLab changing how build() walks the story
+        pulled, drawn, queued = [], [], []
+
+        def flowables():
+            for i in range(300):
+                pulled.append(i)
+                yield Paragraph(f'Row {i}', getSampleStyleSheet()['Normal'])
+
+        doc = reports._StreamingDocTemplate(BytesIO())
+
+        def after_flowable(flowable):
+            # Page actions go through the same hook
+            if isinstance(flowable, Paragraph):
+                drawn.append(flowable)
+                queued.append(len(pulled) - len(drawn))
+
+        doc.afterFlowable = after_flowable
+        doc.build_from(flowables())
+
+        self.assertEqual(len(drawn), 300)
+        self.assertLessEqual(max(queued), reports._StreamingDocTemplate.LOOKAHEAD)
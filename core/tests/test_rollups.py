@@ -0,0 +1,99 @@
+from datetime import date
+from io import StringIO
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.analytics import period_totals, category_breakdown
+from core.models import Account, Category, CategoryGroup, MonthlyCategoryRollup, Transaction
+
+
+class MonthlyCategoryRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.expense_group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.rent = Category.objects.create(group=self.expense_group, name='Rent')
+        self.food = Category.objects.create(group=self.expense_group, name='Food')
+        self.salary = Category.objects.create(group=self.income_group, name='Salary')
+        self.account = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('0.00'))
+
+    def _create(self, category, amount, day, **kwargs):
+        return Transaction.objects.create(
+            user=self.user, category=category, account=self.account,
+            amount=Decimal(amount), description='tx', date=day, **kwargs
+        )
+
+    def _bucket(self, category, year, month):
+        return MonthlyCategoryRollup.objects.get(user=self.user, category=category, year=year, month=month)
+
+    def test_create_update_delete_keep_buckets_in_step(self):
+        tx = self._create(self.rent, '100.00', date(2026, 1, 10))
+        self._create(self.rent, '50.00', '2026-01-20')
+
+        bucket = self._bucket(self.rent, 2026, 1)
+        self.assertEqual((bucket.total, bucket.count), (Decimal('150.00'), 2))
+
+        # Moving a transaction to another month and category moves its bucket contribution
+        tx.category = self.food
+        tx.date = date(2026, 2, 1)
+        tx.save()
+        bucket.refresh_from_db()
+        self.assertEqual((bucket.total, bucket.count), (Decimal('50.00'), 1))
+        food = self._bucket(self.food, 2026, 2)
+        self.assertEqual((food.total, food.count), (Decimal('100.00'), 1))
+
+        tx.delete()
+        food.refresh_from_db()
+        self.assertEqual((food.total, food.count), (Decimal('0.00'), 0))
+
+    def test_rebuild_matches_incremental_state(self):
+        self._create(self.rent, '100.00', date(2026, 1, 10))
+        self._create(self.food, '25.50', date(2026, 1, 11))
+        self._create(self.salary, '3000.00', date(2026, 2, 1))
+        incremental = set(MonthlyCategoryRollup.objects.values_list(
+            'year', 'month', 'category_id', 'transaction_type', 'total', 'count'))
+
+        MonthlyCategoryRollup.objects.all().delete()
+        call_command('rebuild_rollups', stdout=StringIO())
+
+        rebuilt = set(MonthlyCategoryRollup.objects.values_list(
+            'year', 'month', 'category_id', 'transaction_type', 'total', 'count'))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_group_type_change_moves_buckets(self):
+        self._create(self.rent, '100.00', date(2026, 1, 10))
+
+        self.expense_group.transaction_type = 'income'
+        self.expense_group.save()
+
+        self.assertEqual(self._bucket(self.rent, 2026, 1).transaction_type, 'income')
+
+    def test_account_delete_removes_cascaded_transactions(self):
+        self._create(self.rent, '100.00', date(2026, 1, 10))
+
+        self.account.delete()
+
+        bucket = self._bucket(self.rent, 2026, 1)
+        self.assertEqual((bucket.total, bucket.count), (Decimal('0.00'), 0))
+
+    def test_whole_month_periods_read_rollups(self):
+        self._create(self.rent, '100.00', date(2026, 1, 10))
+        self._create(self.food, '40.00', date(2026, 2, 10))
+        self._create(self.salary, '3000.00', date(2026, 2, 28))
+
+        with self.assertNumQueries(1):
+            totals = period_totals(self.user, date(2026, 1, 1), date(2026, 2, 28))
+        self.assertEqual(totals, {'income': Decimal('3000.00'), 'expense': Decimal('140.00')})
+
+        # Partial periods fall back to the Transaction table
+        totals = period_totals(self.user, date(2026, 1, 1), date(2026, 2, 15))
+        self.assertEqual(totals, {'income': 0, 'expense': Decimal('140.00')})
+
+        breakdown = category_breakdown(self.user, date(2026, 1, 1), date(2026, 2, 28), 'expenses')
+        self.assertEqual(
+            [(row['category__name'], row['total']) for row in breakdown],
+            [('Rent', Decimal('100.00')), ('Food', Decimal('40.00'))],
+        )
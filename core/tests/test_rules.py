@@ -0,0 +1,211 @@
+import io
+import random
+import re
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.forms import TransactionForm
+from core.importers import TransactionImporter, iter_csv_records
+from core.models import Account, CategorizationRule, Category, CategoryGroup, CutoffReport, Transaction
+from core.rules import Rule, RuleMatcher, categorization_rules, in_range
+
+
+def rule(pk, match_type, pattern='', min_amount=None, max_amount=None):
+    return Rule(pk, match_type, pattern, min_amount, max_amount, pk, None)
+
+
+class RuleMatcherTests(SimpleTestCase):
+    def test_first_matching_rule_wins_across_kinds(self):
+        matcher = RuleMatcher([
+            rule(1, 'contains', 'coffee', max_amount=Decimal('10')),
+            rule(2, 'regex', r'^uber\b'),
+            rule(3, 'amount', min_amount=Decimal('1000')),
+            rule(4, 'contains', 'Coffee'),
+        ])
+        self.assertEqual(matcher.classify('STARBUCKS COFFEE #12', Decimal('4.50')).pk, 1)
+        # Over the first rule's range: the next matching rule
+        self.assertEqual(matcher.classify('starbucks coffee #12', Decimal('-25.00')).pk, 4)
+        self.assertEqual(matcher.classify('Uber trip coffee', Decimal('5')).pk, 1)
+        self.assertEqual(matcher.classify('Uber trip', Decimal('2000')).pk, 2)
+        self.assertEqual(matcher.classify('Rent', Decimal('2000')).pk, 3)
+        self.assertIsNone(matcher.classify('Rent', None))
+        self.assertIsNone(RuleMatcher().classify('anything', Decimal('1')))
+
+    def test_overlapping_substrings(self):
+        matcher = RuleMatcher([rule(1, 'contains', 'mart'), rule(2, 'contains', 'walmart'), rule(3, 'contains', 'al')])
+        self.assertEqual(matcher.classify('WALMART 0042').pk, 1)
+        self.assertEqual(matcher.classify('Walgreens').pk, 3)
+        matcher = RuleMatcher([rule(1, 'contains', 'walmart'), rule(2, 'contains', 'mart')])
+        self.assertEqual(matcher.classify('kmart').pk, 2)
+
+    def test_agrees_with_trying_every_rule_in_turn(self):
+        rng = random.Random(7)
+        words = [''.join(rng.choices('abcde', k=rng.randint(1, 4))) for _ in range(60)]
+        rules = []
+        for pk in range(40):
+            match_type = rng.choice(['contains', 'contains', 'regex', 'amount'])
+            bounds = rng.choice([(None, None), (Decimal('10'), None), (None, Decimal('50')), (Decimal('20'), Decimal('30'))])
+            if match_type == 'amount' and bounds == (None, None):
+                bounds = (Decimal('45'), None)
+            pattern = {'contains': words[pk], 'regex': f'{words[pk]}.?{words[pk + 1]}', 'amount': ''}[match_type]
+            rules.append(rule(pk, match_type, pattern, *bounds))
+
+        def naive(description, amount):
+            for candidate in rules:
+                if not in_range(candidate, amount):
+                    continue
+                if (candidate.match_type == 'amount'
+                        or candidate.match_type == 'contains' and candidate.pattern in description.casefold()
+                        or candidate.match_type == 'regex' and re.search(candidate.pattern, description, re.IGNORECASE)):
+                    return candidate
+            return None
+
+        rows = [(' '.join(rng.choices(words, k=3)).upper(), Decimal(rng.randint(0, 60))) for _ in range(2000)]
+        self.assertEqual(RuleMatcher(rules).classify_many(rows), [naive(*row) for row in rows])
+
+
+class CategorizationRuleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client.login(username='testuser', password='password123')
+        food = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        work = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        self.groceries = Category.objects.create(group=food, name='Groceries')
+        self.coffee = Category.objects.create(group=food, name='Coffee')
+        self.salary = Category.objects.create(group=work, name='Salary')
+        self.checking = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+        self.cash = Account.objects.create(user=self.user, name='Cash', type='cash', balance=Decimal('100.00'))
+        CategorizationRule.objects.create(user=self.user, pattern='starbucks', category=self.coffee, account=self.cash)
+        CategorizationRule.objects.create(user=self.user, match_type='regex', pattern=r'payroll|salary', category=self.salary)
+
+    def _add(self, description, amount='10.00', day=date(2026, 4, 1), category=None, account=None):
+        return Transaction.objects.create(user=self.user, category=category or self.groceries, account=account or self.checking,
+                                          amount=Decimal(amount), description=description, date=day)
+
+    def test_rule_validation(self):
+        other = User.objects.create_user(username='other', password='password123')
+        theirs = Category.objects.create(group=CategoryGroup.objects.create(user=other, name='X'), name='Theirs')
+        invalid = [
+            CategorizationRule(user=self.user, match_type='regex', pattern='(unclosed', category=self.coffee),
+            CategorizationRule(user=self.user, pattern='  ', category=self.coffee),
+            CategorizationRule(user=self.user, match_type='amount', category=self.coffee),
+            CategorizationRule(user=self.user, match_type='amount', min_amount=5, max_amount=1, category=self.coffee),
+            CategorizationRule(user=self.user, pattern='x', category=theirs),
+        ]
+        for candidate in invalid:
+            with self.assertRaises(ValidationError):
+                candidate.full_clean()
+
+    def test_form_takes_the_category_from_the_rules(self):
+        form = TransactionForm({'date': '2026-04-02', 'description': 'STARBUCKS 123', 'amount': '4.50'}, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual((form.cleaned_data['category'], form.cleaned_data['account']), (self.coffee, self.cash))
+
+        # An explicit choice wins, and without a matching rule the category is still required
+        form = TransactionForm({'date': '2026-04-02', 'description': 'Starbucks', 'amount': '4.50',
+                                'category': self.groceries.pk}, user=self.user)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['category'], self.groceries)
+        form = TransactionForm({'date': '2026-04-02', 'description': 'Bakery', 'amount': '4.50'}, user=self.user)
+        self.assertIn('category', form.errors)
+
+    def test_suggest_endpoint(self):
+        response = self.client.get(reverse('rule_suggest'), {'description': 'Monthly PAYROLL', 'amount': '2500'})
+        self.assertEqual(response.json()['category'], self.salary.pk)
+        response = self.client.get(reverse('rule_suggest'), {'description': 'Bakery'})
+        self.assertIsNone(response.json()['category'])
+        self.assertEqual(self.client.get(reverse('rule_suggest'), {'amount': 'NaN'}).status_code, 400)
+
+    def test_import_uses_the_rules_before_the_fallbacks(self):
+        export = 'date,description,amount\n2026-04-03,Starbucks Seattle,-4.50\n2026-04-04,Payroll ACME,2500.00\n2026-04-05,Bakery,-3.00\n'
+        importer = TransactionImporter(self.user, expense_category=self.groceries, income_category=self.salary)
+        result = importer.run(iter_csv_records(io.StringIO(export)))
+        self.assertEqual(result.created, 3)
+        self.assertEqual(
+            list(Transaction.objects.order_by('date').values_list('category__name', 'account__name')),
+            [('Coffee', 'Cash'), ('Salary', None), ('Groceries', None)],
+        )
+
+    def test_apply_rules_moves_only_what_changes(self):
+        latte = self._add('Starbucks latte')
+        pay = self._add('PAYROLL', amount='500.00')
+        bakery = self._add('Bakery')
+        self._add('Starbucks', category=self.coffee, account=self.cash)
+
+        summary = Transaction.objects.filter(user=self.user).apply_rules()
+        self.assertEqual((summary['matched'], summary['updated'], summary['retyped']), (3, 2, 1))
+        latte.refresh_from_db()
+        pay.refresh_from_db()
+        self.assertEqual((latte.category, latte.account), (self.coffee, self.cash))
+        self.assertEqual((pay.category, pay.transaction_type), (self.salary, 'income'))
+        bakery.refresh_from_db()
+        self.assertEqual(bakery.category, self.groceries)
+        # The expense leaves checking and lands on cash; the payroll turns into income
+        self.assertEqual(summary['balance_changes'], {
+            self.checking.pk: Decimal('1010.00'), self.cash.pk: Decimal('-10.00'),
+        })
+        self.assertEqual(Account.objects.get(pk=self.checking.pk).balance, Decimal('1000.00') - 10 + 500)
+
+    def test_apply_rules_skips_locked_periods(self):
+        locked = self._add('Starbucks', day=date(2026, 3, 15))
+        self._add('Starbucks', day=date(2026, 4, 15))
+        CutoffReport.objects.create(user=self.user, name='March', start_date=date(2026, 3, 1),
+                                    end_date=date(2026, 3, 31), is_locked=True)
+        response = self.client.post(reverse('transaction_apply_rules') + '?search=starbucks')
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(Transaction.objects.get(pk=locked.pk).category, self.groceries)
+
+    def test_rules_api(self):
+        response = self.client.post(reverse('rules'), {
+            'match_type': 'regex', 'pattern': '(bad', 'category': self.coffee.pk, 'priority': 1,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pattern', response.json()['errors'])
+
+        response = self.client.post(reverse('rules'), {
+            'match_type': 'amount', 'min_amount': '1000', 'category': self.salary.pk, 'priority': 1,
+        })
+        created = response.json()['id']
+        rules = self.client.get(reverse('rules')).json()['rules']
+        self.assertEqual([item['id'] for item in rules][0], created)
+        self.assertEqual(categorization_rules.classify(self.user.pk, 'anything', Decimal('1500')).pk, created)
+
+        self.client.post(reverse('rule_delete', args=[created]))
+        self.assertIsNone(categorization_rules.classify(self.user.pk, 'anything', Decimal('1500')))
+
+
+class RuleCacheTests(TransactionTestCase):
+    # Real commits: changes inside an open transaction deliberately bypass the cache
+    def setUp(self):
+        cache.clear()
+        categorization_rules.reset()
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        self.coffee = Category.objects.create(group=group, name='Coffee')
+        self.rule = CategorizationRule.objects.create(user=self.user, pattern='starbucks', category=self.coffee)
+
+    def test_compiled_once_until_the_rules_change(self):
+        categorization_rules.get(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(categorization_rules.classify(self.user.pk, 'Starbucks').pk, self.rule.pk)
+
+        self.rule.is_active = False
+        self.rule.save()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertIsNone(categorization_rules.classify(self.user.pk, 'Starbucks'))
+        # One load of the rules, the rest is the cache miss
+        self.assertEqual(len([q for q in ctx.captured_queries if 'core_' in q['sql']]), 1)
+
+        # Deleting the category cascades to its rules
+        CategorizationRule.objects.create(user=self.user, pattern='latte', category=self.coffee)
+        self.assertIsNotNone(categorization_rules.classify(self.user.pk, 'Latte'))
+        self.coffee.delete()
+        self.assertIsNone(categorization_rules.classify(self.user.pk, 'Latte'))
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core.models import Account, Category, CategoryGroup, Transaction
+from core.pagination import keyset_paginate, decode_cursor, InvalidCursor
+from core.views import TRANSACTIONS_PAGE_SIZE
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        self.client = Client()
+        self.client.login(username='testuser', password='password123')
+
+        group = CategoryGroup.objects.create(user=self.user, name='Home', transaction_type='expenses')
+        self.category = Category.objects.create(group=group, name='Rent')
+        self.other_category = Category.objects.create(group=group, name='Food')
+        self.account = Account.objects.create(user=self.user, name='Checking', type='checking')
+
+        # Several transactions per day so the created_at/id tie-breakers matter
+        start = date(2026, 1, 1)
+        for i in range(120):
+            Transaction.objects.create(
+                user=self.user,
+                category=self.category if i % 3 else self.other_category,
+                account=self.account,
+                amount=Decimal('1.00'),
+                description=f'Item {i}',
+                date=start + timedelta(days=i // 4),
+            )
+
+    def test_pages_cover_everything_once_in_order(self):
+        expected = list(Transaction.objects.filter(user=self.user).order_by('-date', '-created_at', '-id')
+                        .values_list('id', flat=True))
+        seen, cursor = [], None
+        while True:
+            items, cursor = keyset_paginate(Transaction.objects.filter(user=self.user), cursor, page_size=25)
+            seen.extend(tx.id for tx in items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_deep_pages_cost_the_same_queries(self):
+        queryset = Transaction.objects.filter(user=self.user)
+        _, cursor = keyset_paginate(queryset, None, page_size=10)
+        for _ in range(8):
+            with self.assertNumQueries(1):
+                _, cursor = keyset_paginate(queryset, cursor, page_size=10)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor')
+
+    def test_list_view_renders_first_page_only(self):
+        response = self.client.get(reverse('transactions'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['transactions']), TRANSACTIONS_PAGE_SIZE)
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_page_endpoint_respects_filters(self):
+        # 80 of the 120 transactions are in self.category
+        response = self.client.get(reverse('transactions'), {'category': self.category.id})
+        first_page = response.context['transactions']
+        self.assertEqual(len(first_page), TRANSACTIONS_PAGE_SIZE)
+        self.assertTrue(all(tx.category_id == self.category.id for tx in first_page))
+
+        response = self.client.get(reverse('transaction_page'), {
+            'category': self.category.id,
+            'cursor': response.context['next_cursor'],
+        })
+        data = response.json()
+        self.assertEqual(data['count'], 80 - TRANSACTIONS_PAGE_SIZE)
+        self.assertIsNone(data['next_cursor'])
+        self.assertNotIn('Food', data['html'])
+
+    def test_page_endpoint_continues_listing(self):
+        first = self.client.get(reverse('transactions'))
+        response = self.client.get(reverse('transaction_page'), {'cursor': first.context['next_cursor']})
+
+        data = response.json()
+        self.assertEqual(data['count'], TRANSACTIONS_PAGE_SIZE)
+        self.assertIn('Item', data['html'])
+        self.assertIsNotNone(data['next_cursor'])
+
+    def test_page_endpoint_rejects_bad_cursor(self):
+        response = self.client.get(reverse('transaction_page'), {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 400)
@@ -1,7 +1,11 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
-from core.models import Category, CategoryGroup, Transaction, Account
+from core.models import Category, CategoryGroup, CutoffReport, Transaction, Account
 from decimal import Decimal
 
 class TransactionTests(TestCase):
@@ -80,3 +84,198 @@ class TransactionTests(TestCase):
         from django.db.models import ProtectedError
         with self.assertRaises(ProtectedError):
             self.category.delete()
+
+    def test_transaction_type_is_denormalized_from_group(self):
+        income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        salary = Category.objects.create(group=income_group, name='Salary')
+        tx = Transaction.objects.create(
+            user=self.user,
+            category=self.category,
+            account=self.account,
+            amount=Decimal('10.00'),
+            description='Type Test'
+        )
+        self.assertEqual(tx.transaction_type, 'expenses')
+
+        tx.category = salary
+        tx.save()
+        tx.refresh_from_db()
+        self.assertEqual(tx.transaction_type, 'income')
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1010.00'))
+
+    def test_group_type_change_syncs_transactions_and_balances(self):
+        tx = Transaction.objects.create(
+            user=self.user,
+            category=self.category,
+            account=self.account,
+            amount=Decimal('100.00'),
+            description='Flip Test'
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('900.00'))
+        stamp = Transaction.objects.get(pk=tx.pk).updated_at
+
+        self.group.transaction_type = 'income'
+        self.group.save()
+
+        tx.refresh_from_db()
+        self.account.refresh_from_db()
+        self.assertEqual(tx.transaction_type, 'income')
+        self.assertGreater(tx.updated_at, stamp)
+        self.assertEqual(self.account.balance, Decimal('1100.00'))
+
+        # Deleting after the flip reverts exactly what is now applied
+        tx.delete()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1000.00'))
+
+    def test_group_type_change_is_refused_for_locked_periods(self):
+        tx = Transaction.objects.create(user=self.user, category=self.category, account=self.account,
+                                        amount=Decimal('100.00'), description='Locked', date=date(2026, 1, 10))
+        CutoffReport.objects.create(user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), is_locked=True)
+        stamp = Transaction.objects.get(pk=tx.pk).updated_at
+
+        response = self.client.post(reverse('category_group_update', args=[self.group.pk]), {
+            'name': self.group.name, 'icon': self.group.icon, 'transaction_type': 'income',
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 400)
+        self.group.transaction_type = 'income'
+        with self.assertRaises(ValidationError):
+            self.group.save()
+
+        tx.refresh_from_db()
+        self.account.refresh_from_db()
+        self.assertEqual((tx.transaction_type, tx.updated_at), ('expenses', stamp))
+        self.assertEqual(self.account.balance, Decimal('900.00'))
+
+    def test_transaction_list_summary(self):
+        income_group = CategoryGroup.objects.create(user=self.user, name='Work', transaction_type='income')
+        salary = Category.objects.create(group=income_group, name='Salary')
+        for category, amount, description in [
+            (salary, '500.00', 'Paycheck'),
+            (self.category, '120.00', 'Groceries'),
+            (self.category, '30.00', 'Groceries again'),
+        ]:
+            Transaction.objects.create(
+                user=self.user, category=category, account=self.account,
+                amount=Decimal(amount), description=description, date='2023-01-01'
+            )
+
+        response = self.client.get(reverse('transactions'))
+        self.assertEqual(response.context['total_income'], Decimal('500.00'))
+        self.assertEqual(response.context['total_expenses'], Decimal('150.00'))
+        self.assertEqual(response.context['net_flow'], Decimal('350.00'))
+        self.assertEqual(response.context['transaction_count'], 3)
+
+        response = self.client.get(reverse('transactions'), {'search': 'groceries'})
+        self.assertEqual(response.context['total_income'], 0)
+        self.assertEqual(response.context['total_expenses'], Decimal('150.00'))
+        self.assertEqual(response.context['transaction_count'], 2)
+
+    def test_transaction_list_queries_do_not_grow_with_categories(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('transactions')
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(url)
+
+        for i in range(10):
+            Category.objects.create(group=self.group, name=f'Extra {i}')
+            Account.objects.create(user=self.user, name=f'Extra {i}', type='cash')
+
+        with CaptureQueriesContext(connection) as grown:
+            self.client.get(url)
+        self.assertEqual(len(grown), len(baseline))
+
+    def test_transaction_form_reuses_loaded_choices(self):
+        from core.forms import TransactionForm
+
+        categories = list(Category.objects.filter(group__user=self.user))
+        accounts = list(Account.objects.filter(user=self.user))
+        form = TransactionForm(user=self.user, categories=categories, accounts=accounts)
+        with self.assertNumQueries(0):
+            rendered = str(form['category']) + str(form['account'])
+        self.assertIn('Test Category', rendered)
+        self.assertIn('Test Account', rendered)
+
+
+class TransactionSaveQueryTests(TestCase):
+    """Each kind of edit costs only the writes its effects need."""
+    def setUp(self):
+        from core.locks import cutoff_locks
+
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        group = CategoryGroup.objects.create(user=self.user, name='Food', transaction_type='expenses')
+        self.groceries = Category.objects.create(group=group, name='Groceries')
+        self.coffee = Category.objects.create(group=group, name='Coffee')
+        self.checking = Account.objects.create(user=self.user, name='Checking', type='checking', balance=Decimal('1000.00'))
+        self.cash = Account.objects.create(user=self.user, name='Cash', type='cash', balance=Decimal('100.00'))
+        # Rollup buckets and snapshot rows every edit below lands in already exist
+        for category in (self.groceries, self.coffee):
+            for account in (self.checking, self.cash):
+                for day in ('2026-03-10', '2026-04-10'):
+                    Transaction.objects.create(user=self.user, category=category, account=account,
+                                               amount=Decimal('1.00'), description='Seed', date=day)
+        self.tx = Transaction.objects.create(user=self.user, category=self.groceries, account=self.checking,
+                                             amount=Decimal('40.00'), description='Market', date='2026-03-15')
+        self.tx = Transaction.objects.get(pk=self.tx.pk)
+        # Warm the cutoff lock cache, it is not what is measured here
+        cutoff_locks.is_locked(self.user.pk, self.tx.date)
+
+    def _balances(self):
+        return dict(Account.objects.filter(user=self.user).values_list('name', 'balance'))
+
+    def test_description_only_edit_skips_all_bookkeeping(self):
+        before = self._balances()
+        self.tx.description = 'Farmers market'
+        # savepoint, row update, release
+        with self.assertNumQueries(3):
+            self.tx.save()
+        self.assertEqual(self._balances(), before)
+
+    def test_amount_edit_updates_account_snapshot_and_rollup_once(self):
+        self.tx.amount = Decimal('55.00')
+        # savepoint, row, account, snapshot, rollup, release
+        with self.assertNumQueries(6):
+            self.tx.save()
+        self.checking.refresh_from_db()
+        self.assertEqual(self.checking.balance, Decimal('1000.00') - 4 - 55)
+
+    def test_account_edit_moves_balance_between_accounts(self):
+        self.tx.account = self.cash
+        # savepoint, row, two accounts, two snapshots, release; the rollup bucket does not move.
+        # Without RETURNING the assigned account's new balance is read back separately
+        with self.assertNumQueries(7 if connection.vendor == 'postgresql' else 8):
+            self.tx.save()
+        self.assertEqual(self._balances(), {'Checking': Decimal('996.00'), 'Cash': Decimal('56.00')})
+        # The loaded account is kept current
+        self.assertEqual(self.tx.account.balance, Decimal('56.00'))
+
+    def test_category_edit_moves_rollups_only(self):
+        before = self._balances()
+        self.tx.category = self.coffee
+        # savepoint, type lookup, row, two rollups, release
+        with self.assertNumQueries(6):
+            self.tx.save()
+        self.assertEqual(self._balances(), before)
+
+    def test_date_edit_within_the_month_skips_all_bookkeeping(self):
+        self.tx.date = '2026-03-28'
+        with self.assertNumQueries(3):
+            self.tx.save()
+
+    def test_date_edit_across_months_moves_snapshots_and_rollups(self):
+        self.tx.date = '2026-04-02'
+        # savepoint, row, two snapshots, two rollups, release
+        with self.assertNumQueries(7):
+            self.tx.save()
+
+    def test_repeated_saves_use_the_last_saved_values(self):
+        self.tx.amount = Decimal('50.00')
+        self.tx.save()
+        self.tx.amount = Decimal('60.00')
+        self.tx.save()
+        self.tx.delete()
+        self.assertEqual(self._balances(), {'Checking': Decimal('996.00'), 'Cash': Decimal('96.00')})
@@ -5,9 +5,12 @@ from .views import (
     CategoryGroupCreateView, CategoryGroupUpdateView, CategoryCreateView,
     CategoryUpdateView, CategoryDeleteView, AccountsView,
     AccountCreateView, AccountUpdateView, AccountDeleteView,
-    TransactionListView, TransactionCreateView,
+    TransactionListView, TransactionPageView, TransactionImportView, TransactionCreateView,
+    TransactionBulkDeleteView, TransactionBulkEditView, TransactionApplyRulesView,
+    RuleListView, RuleDeleteView, RuleSuggestView,
     ReportListView, PerformCutoffView, ReportDetailView,
-    ToggleReportLockView, DownloadReportPDFView, DashboardChartsView, SetBudgetView
+    ToggleReportLockView, DownloadReportPDFView, ReportPDFStatusView, DashboardChartsView, NetWorthView, SetBudgetView,
+    BudgetStatusView,
 )
 
 urlpatterns = [
@@ -26,13 +29,24 @@ urlpatterns = [
     path('accounts/<int:pk>/update/', AccountUpdateView.as_view(), name='account_update'),
     path('accounts/<int:pk>/delete/', AccountDeleteView.as_view(), name='account_delete'),
     path('transactions/', TransactionListView.as_view(), name='transactions'),
+    path('api/transactions/', TransactionPageView.as_view(), name='transaction_page'),
+    path('transactions/import/', TransactionImportView.as_view(), name='transaction_import'),
     path('transactions/create/', TransactionCreateView.as_view(), name='transaction_create'),
+    path('transactions/delete/', TransactionBulkDeleteView.as_view(), name='transaction_bulk_delete'),
+    path('transactions/edit/', TransactionBulkEditView.as_view(), name='transaction_bulk_edit'),
+    path('transactions/apply-rules/', TransactionApplyRulesView.as_view(), name='transaction_apply_rules'),
+    path('api/rules/', RuleListView.as_view(), name='rules'),
+    path('api/rules/<int:pk>/delete/', RuleDeleteView.as_view(), name='rule_delete'),
+    path('api/rules/suggest/', RuleSuggestView.as_view(), name='rule_suggest'),
     path('reports/', ReportListView.as_view(), name='reports'),
     path('reports/create/', PerformCutoffView.as_view(), name='report_create'),
     path('reports/<int:pk>/', ReportDetailView.as_view(), name='report_detail'),
     path('reports/<int:pk>/lock/', ToggleReportLockView.as_view(), name='report_lock_toggle'),
     path('reports/<int:pk>/pdf/', DownloadReportPDFView.as_view(), name='report_pdf'),
+    path('reports/<int:pk>/pdf/status/', ReportPDFStatusView.as_view(), name='report_pdf_status'),
     path('api/dashboard/charts/', DashboardChartsView.as_view(), name='dashboard_charts'),
+    path('api/dashboard/networth/', NetWorthView.as_view(), name='dashboard_networth'),
     path('api/budgets/set/', SetBudgetView.as_view(), name='budget_set'),
+    path('api/budgets/status/', BudgetStatusView.as_view(), name='budget_status'),
     path('', DashboardView.as_view(), name='home'),
 ]
@@ -1,96 +1,109 @@
 from django.contrib.auth.views import LoginView
 from django.views.generic import TemplateView, CreateView, UpdateView, DeleteView
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.urls import reverse, reverse_lazy
 from django.http import JsonResponse
-from .forms import CustomUserCreationForm, TransactionForm, CutoffReportForm, BudgetForm
-from .models import CategoryGroup, Category, Transaction, Account, CutoffReport, Budget
-from django.db.models import Sum, Q, F
+from .forms import (
+    CustomUserCreationForm, TransactionForm, TransactionBulkEditForm, CutoffReportForm, CategorizationRuleForm,
+)
+from .models import CategoryGroup, Category, Transaction, Account, CutoffReport, Budget, CategorizationRule
+from .pagination import keyset_paginate, InvalidCursor
+from .filters import TransactionFilter
+from .reports import LAYOUT_VERSION, current_pdf, request_pdf, stalled_jobs
+from .datacache import user_data
+from .budgets import budget_status
+from .categorytree import CategoryTree
+from .locks import cutoff_locks
+from .rules import categorization_rules
+from .profiling import perf_registry
+from .importers import TransactionImporter, iter_csv_records, iter_ofx_records
+from .analytics import (
+    monthly_income_expense, parse_months, month_bounds, period_totals, category_breakdown,
+    monthly_net_worth, net_worth_series, shift_month,
+)
+from django.db.models import Q, F, Count, Max, OuterRef, Subquery
 from django.utils import timezone
 from django.shortcuts import get_object_or_404, redirect
 from django.http import JsonResponse, HttpResponse
 from django.views.generic import TemplateView, CreateView, UpdateView, DeleteView, ListView, DetailView
 from django.views import View
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
 from django.utils.translation import gettext as _
+from django.template.loader import render_to_string
 
+import hashlib
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.colors import HexColor
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.graphics.charts.legends import Legend
-import decimal
+import json
+from datetime import date
+from decimal import Decimal
+
+TRANSACTIONS_PAGE_SIZE = 50
 
 class CustomLoginView(LoginView):
     template_name = 'core/login.html'
     redirect_authenticated_user = True
 
 class CategoriesContextMixin:
-    """Mixin to provide shared context for categories-related views."""
+    """
+    Mixin to provide shared context for categories-related views. The category tree is lazy
+    and cached (see core.categorytree); XHR requests, which are answered with JSON, never build it.
+    """
+    def is_xhr(self):
+        return self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
     def get_categories_context(self, user, active_tab=None):
-        groups = CategoryGroup.objects.filter(user=user).prefetch_related('categories')
-        
         # Determine active tab if not provided: Query Param > Cookie > Default
         if not active_tab:
             active_tab = self.request.GET.get('tab')
             if not active_tab:
                 active_tab = self.request.COOKIES.get('pfm_last_category_tab', 'expenses')
 
-        # Calculate statistics
-        total_categories = Category.objects.filter(group__user=user).count()
-        limit = 50
-        categories_progress = min((total_categories / limit) * 100, 100) if limit > 0 else 0
-
-        # Fetch current monthly budgets
         now = timezone.now()
-        budgets = Budget.objects.filter(user=user, month=now.month, year=now.year)
-        budget_map = {b.category_id: float(b.amount) for b in budgets}
-
-        # Attach budgets to categories and calculate group totals
-        # Convert to list first to ensure attached attributes persist after filtering
-        groups_list = list(groups)
-        for group in groups_list:
-            group.group_budget_total = 0
-            for cat in group.categories.all():
-                cat.current_budget = budget_map.get(cat.id, 0)
-                group.group_budget_total += cat.current_budget
-
         return {
-            'expenses_groups': [g for g in groups_list if g.transaction_type == 'expenses'],
-            'income_groups': [g for g in groups_list if g.transaction_type == 'income'],
+            'category_tree': CategoryTree(user, now.year, now.month),
             'active_tab': active_tab,
-            'total_categories': total_categories,
-            'categories_progress': categories_progress,
-            'budget_map': budget_map,
         }
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if not self.is_xhr():
+            context.update(self.get_categories_context(self.request.user))
+        return context
+
+    def form_invalid(self, form):
+        if self.is_xhr():
+            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
+        return super().form_invalid(form)
+
 class AccountsContextMixin:
     """Mixin to provide shared context for accounts-related views."""
+    def get_active_filter(self):
+        # Query Param > Cookie > Default
+        return self.request.GET.get('filter') or self.request.COOKIES.get('pfm_last_account_filter', 'all')
+
     def get_accounts_context(self, user, active_filter=None):
-        accounts = Account.objects.filter(user=user)
+        # One query; the sections and totals below are all computed from this list
+        accounts = list(Account.objects.filter(user=user))
         
-        # Determine active filter if not provided: Query Param > Cookie > Default
         if not active_filter:
-            active_filter = self.request.GET.get('filter')
-            if not active_filter:
-                active_filter = self.request.COOKIES.get('pfm_last_account_filter', 'all')
+            active_filter = self.get_active_filter()
 
         # Categorize accounts
-        assets_types = ['checking', 'savings', 'bank', 'brokerage', 'cash', 'real_estate', 'crypto']
-        liabilities_types = ['credit', 'loan', 'mortgage', 'line_of_credit']
-        
-        banking_accounts = accounts.filter(type__in=['checking', 'savings', 'bank', 'cash'])
-        investment_accounts = accounts.filter(type__in=['brokerage', 'crypto', 'real_estate'])
-        liability_accounts = accounts.filter(type__in=liabilities_types)
+        banking_accounts = [a for a in accounts if a.type in ('checking', 'savings', 'bank', 'cash')]
+        investment_accounts = [a for a in accounts if a.type in ('brokerage', 'crypto', 'real_estate')]
+        liability_accounts = [a for a in accounts if a.type in Account.LIABILITY_TYPES]
         
         # Calculate totals
-        total_assets = accounts.filter(type__in=assets_types, include_in_total=True).aggregate(total=Sum('balance'))['total'] or 0
-        total_liabilities_sum = accounts.filter(type__in=liabilities_types, include_in_total=True).aggregate(total=Sum('balance'))['total'] or 0
+        total_assets = sum(
+            (a.balance for a in accounts if a.include_in_total and a.type in Account.ASSET_TYPES), Decimal('0')
+        )
+        total_liabilities_sum = sum(
+            (a.balance for a in accounts if a.include_in_total and a.type in Account.LIABILITY_TYPES), Decimal('0')
+        )
         
         # liabilities are stored as negative numbers, so assets + liabilities = net worth
         total_balance = total_assets + total_liabilities_sum
@@ -111,6 +124,52 @@ class AccountsContextMixin:
             'accounts': accounts,
         }
 
+def user_data_validators(user):
+    """
+    ETag parts for pages built from the user's transactions, accounts, budgets and categories:
+    the row count and latest updated_at of each table, in one query. Every write moves one of
+    them (a delete lowers the count) whichever process made it. The day is part of it too,
+    default periods end today.
+    """
+    tables = (
+        ('transaction', Transaction, 'user'), ('account', Account, 'user'), ('budget', Budget, 'user'),
+        ('category', Category, 'group__user'), ('group', CategoryGroup, 'user'),
+    )
+    parts = {}
+    for name, model, owner in tables:
+        rows = model.objects.filter(**{owner: OuterRef('pk')}).order_by().values(owner)
+        parts[f'{name}_count'] = Subquery(rows.annotate(n=Count('pk')).values('n'))
+        parts[f'last_{name}'] = Subquery(rows.annotate(last=Max('updated_at')).values('last'))
+    row = get_user_model().objects.filter(pk=user.pk).annotate(**parts).values_list(*parts).get()
+    return [timezone.localdate(), *row]
+
+class ConditionalResponseMixin:
+    """
+    Answer If-None-Match with 304 Not Modified before the view does any work. The ETag hashes
+    the view, the full path, the language and whatever get_etag_parts() returns.
+    Last-Modified is not sent: no timestamp moves when a row is deleted.
+    """
+    def get_etag_parts(self, request, *args, **kwargs):
+        return user_data_validators(request.user)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        parts = [
+            type(self).__name__, request.get_full_path(), translation.get_language(),
+            request.META.get('CSRF_COOKIE'), *self.get_etag_parts(request, *args, **kwargs),
+        ]
+        etag = quote_etag(hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:32])
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+            # Always revalidate, never share between users
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
 class DashboardView(LoginRequiredMixin, AccountsContextMixin, TemplateView):
     template_name = 'core/dashboard.html'
     login_url = '/login/'
@@ -118,106 +177,113 @@ class DashboardView(LoginRequiredMixin, AccountsContextMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        context.update(self.get_accounts_context(user))
-        
+        now = timezone.now()
+
+        # Everything but the request-specific bits is cached until the user's data changes
+        summary = user_data.get_or_set(
+            user.pk, f'dashboard:{now.year}-{now.month}', lambda: self.get_summary(user, now)
+        )
+        context.update(summary)
+        context['active_filter'] = self.get_active_filter()
+        context['today'] = now
+        return context
+
+    def get_summary(self, user, now):
+        summary = self.get_accounts_context(user)
+        del summary['active_filter']
+
         # Add transactions
-        context['recent_transactions'] = Transaction.objects.filter(
+        summary['recent_transactions'] = list(Transaction.objects.filter(
             user=user
-        ).select_related('category', 'category__group', 'account').order_by('-date', '-created_at')[:5]
-        
-        # Forms
-        context['transaction_form'] = TransactionForm(user=user)
-        context['budget_form'] = BudgetForm(user=user)
-        
-        # Calculate budget summary based on Category Budgets
-        now = timezone.now()
-        budgets = Budget.objects.filter(user=user, month=now.month, year=now.year)
-        
-        total_budget_limit = budgets.aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Calculate actual spending for categories with budgets
-        actual_spending_on_budgeted = Transaction.objects.filter(
-            user=user,
-            date__year=now.year,
-            date__month=now.month,
-            category__in=budgets.values_list('category', flat=True)
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        ).select_related('category', 'account').order_by('-date', '-created_at')[:5])
+
+        # Budget vs. actual of the budgeted expense categories
+        status = budget_status(user, now.year, now.month)
 
         # Total monthly expenses
-        total_monthly_expenses = Transaction.objects.filter(
-            user=user,
-            category__group__transaction_type='expenses',
-            date__year=now.year,
-            date__month=now.month,
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        month_start, month_end = month_bounds(now.year, now.month)
+        total_monthly_expenses = period_totals(user, month_start, month_end)['expense']
 
-        context['monthly_expenses'] = total_monthly_expenses
-        context['budget_limit'] = total_budget_limit
-        
-        if total_budget_limit > 0:
-            context['budget_percentage'] = min((actual_spending_on_budgeted / total_budget_limit) * 100, 100)
-        else:
-            context['budget_percentage'] = 0
-            
-        context['categories'] = Category.objects.filter(group__user=user)
-        context['category_budgets'] = budgets.select_related('category')
-        context['today'] = timezone.now()
-        
-        return context
+        summary['monthly_expenses'] = total_monthly_expenses
+        summary['budget_limit'] = status['totals']['budget']
+        summary['budget_percentage'] = min(status['totals']['percentage'], 100)
+        summary['categories'] = list(Category.objects.filter(group__user=user).select_related('group'))
+        summary['category_budgets'] = status['categories']
+        return summary
 
-class DashboardChartsView(LoginRequiredMixin, View):
+class DashboardChartsView(LoginRequiredMixin, ConditionalResponseMixin, View):
     def get(self, request, *args, **kwargs):
         user = request.user
         now = timezone.now()
         
-        # 1. Income vs Expense (Last 6 months)
-        months = []
-        income_data = []
-        expense_data = []
-        
-        for i in range(5, -1, -1):
-            # Calculate month/year correctly to avoid day arithmetic issues
-            m = now.month - i
-            y = now.year
-            while m <= 0:
-                m += 12
-                y -= 1
-            
-            from datetime import date
-            month_label = date(y, m, 1).strftime('%b')
-            months.append(month_label)
-            
-            inc = Transaction.objects.filter(user=user, date__year=y, date__month=m, category__group__transaction_type='income').aggregate(total=Sum('amount'))['total'] or 0
-            exp = Transaction.objects.filter(user=user, date__year=y, date__month=m, category__group__transaction_type='expenses').aggregate(total=Sum('amount'))['total'] or 0
-            
-            income_data.append(float(inc))
-            expense_data.append(float(exp))
-            
+        # 1. Income vs Expense (last N months, one grouped query)
+        months = parse_months(request.GET.get('months'))
+        series = monthly_income_expense(user, months=months, end=now.date())
+
         # 2. Category Breakdown (Current Month)
-        categories = []
-        spending = []
-        cat_data = Transaction.objects.filter(
-            user=user, 
-            date__year=now.year, 
-            date__month=now.month, 
-            category__group__transaction_type='expenses'
-        ).values('category__name').annotate(total=Sum('amount')).order_by('-total')
-        
-        for item in cat_data:
-            categories.append(item['category__name'])
-            spending.append(float(item['total']))
+        month_start, month_end = month_bounds(now.year, now.month)
+        cat_data = category_breakdown(user, month_start, month_end, 'expenses')
+        categories = [item['category__name'] for item in cat_data]
+        spending = [float(item['total']) for item in cat_data]
+
+        # 3. Net Worth Trend (month-end balances from the snapshots)
+        net_worth = monthly_net_worth(user, months=months, end=now.date())
 
-        # 3. Net Worth Trend (Simplified for now - balance of accounts over time is complex without snapshots)
-        # We'll use a simulated growth based on income/expense history or just current distribution
-        
         return JsonResponse({
-            'months': months,
-            'income': income_data,
-            'expense': expense_data,
+            'months': series['months'],
+            'income': series['income'],
+            'expense': series['expense'],
+            'net_worth': net_worth,
             'categories': categories,
             'spending': spending
         })
 
+class NetWorthView(LoginRequiredMixin, ConditionalResponseMixin, View):
+    """Assets, liabilities and net worth series for ?start=&end=&granularity=day|week|month."""
+    def get(self, request, *args, **kwargs):
+        today = timezone.now().date()
+        try:
+            end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else today
+            if request.GET.get('start'):
+                start = date.fromisoformat(request.GET['start'])
+            else:
+                year, month = shift_month(end.year, end.month, -11)
+                start = date(year, month, 1)
+            if start > end:
+                raise ValueError("start is after end")
+            series = net_worth_series(request.user, start, end, request.GET.get('granularity') or 'month')
+        except ValueError as exc:
+            return JsonResponse({'status': 'error', 'message': str(exc)}, status=400)
+
+        return JsonResponse({'status': 'success', **series})
+
+class BudgetStatusView(LoginRequiredMixin, ConditionalResponseMixin, View):
+    """Budget, actual, remaining and percentage per category, group and overall for ?year=&month=."""
+    def get(self, request, *args, **kwargs):
+        today = timezone.now().date()
+        try:
+            year = int(request.GET.get('year') or today.year)
+            month = int(request.GET.get('month') or today.month)
+            if not 1 <= month <= 12 or not 1 <= year <= 9999:
+                raise ValueError("month must be 1-12 and year 1-9999")
+        except ValueError as exc:
+            return JsonResponse({'status': 'error', 'message': str(exc)}, status=400)
+
+        status = budget_status(request.user, year, month)
+        figures = ('budget', 'actual', 'remaining', 'percentage')
+
+        def as_json(row):
+            return {key: round(float(value), 2) if key in figures else value for key, value in row.items()}
+
+        return JsonResponse({
+            'status': 'success',
+            'year': year,
+            'month': month,
+            'categories': [as_json(row) for row in status['categories']],
+            'groups': [as_json(row) for row in status['groups']],
+            'totals': as_json(status['totals']),
+        })
+
 class SetBudgetView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         user = request.user
@@ -250,25 +316,15 @@ class CategoriesView(LoginRequiredMixin, CategoriesContextMixin, TemplateView):
     template_name = 'core/categories.html'
     login_url = reverse_lazy('login')
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(self.get_categories_context(self.request.user))
-        return context
-
 class CategoryGroupCreateView(LoginRequiredMixin, CategoriesContextMixin, CreateView):
     model = CategoryGroup
     fields = ['name', 'icon', 'transaction_type', 'description']
     template_name = 'core/categories.html'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(self.get_categories_context(self.request.user))
-        return context
-
     def form_valid(self, form):
         form.instance.user = self.request.user
         self.object = form.save()
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        if self.is_xhr():
             return JsonResponse({
                 'status': 'success',
                 'group': {
@@ -280,11 +336,6 @@ class CategoryGroupCreateView(LoginRequiredMixin, CategoriesContextMixin, Create
             })
         return super().form_valid(form)
 
-    def form_invalid(self, form):
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
-        return super().form_invalid(form)
-
     def get_success_url(self):
         return reverse_lazy('categories')
 
@@ -296,14 +347,9 @@ class CategoryGroupUpdateView(LoginRequiredMixin, CategoriesContextMixin, Update
     def get_queryset(self):
         return super().get_queryset().filter(user=self.request.user)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(self.get_categories_context(self.request.user))
-        return context
-
     def form_valid(self, form):
         self.object = form.save()
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        if self.is_xhr():
             return JsonResponse({
                 'status': 'success',
                 'group': {
@@ -315,11 +361,6 @@ class CategoryGroupUpdateView(LoginRequiredMixin, CategoriesContextMixin, Update
             })
         return super().form_valid(form)
 
-    def form_invalid(self, form):
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
-        return super().form_invalid(form)
-
     def get_success_url(self):
         return reverse_lazy('categories')
 
@@ -328,18 +369,13 @@ class CategoryCreateView(LoginRequiredMixin, CategoriesContextMixin, CreateView)
     fields = ['group', 'name', 'icon', 'description']
     template_name = 'core/categories.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(self.get_categories_context(self.request.user))
-        return context
-
     def form_valid(self, form):
         # Ensure the group belongs to the user
-        if form.instance.group.user != self.request.user:
+        if form.instance.group.user_id != self.request.user.pk:
             return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
         
         self.object = form.save()
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        if self.is_xhr():
             return JsonResponse({
                 'status': 'success',
                 'category': {
@@ -351,11 +387,6 @@ class CategoryCreateView(LoginRequiredMixin, CategoriesContextMixin, CreateView)
             })
         return super().form_valid(form)
 
-    def form_invalid(self, form):
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
-        return super().form_invalid(form)
-
     def get_success_url(self):
         return reverse_lazy('categories')
 
@@ -368,18 +399,13 @@ class CategoryUpdateView(LoginRequiredMixin, CategoriesContextMixin, UpdateView)
         # Ensure user can only update their own categories
         return super().get_queryset().filter(group__user=self.request.user)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(self.get_categories_context(self.request.user))
-        return context
-
     def form_valid(self, form):
         # Ensure the group belongs to the user
-        if form.instance.group.user != self.request.user:
+        if form.instance.group.user_id != self.request.user.pk:
             return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
         
         self.object = form.save()
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        if self.is_xhr():
             return JsonResponse({
                 'status': 'success',
                 'category': {
@@ -391,11 +417,6 @@ class CategoryUpdateView(LoginRequiredMixin, CategoriesContextMixin, UpdateView)
             })
         return super().form_valid(form)
 
-    def form_invalid(self, form):
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
-        return super().form_invalid(form)
-
     def get_success_url(self):
         return reverse_lazy('categories')
 
@@ -474,85 +495,230 @@ class AccountDeleteView(LoginRequiredMixin, DeleteView):
     
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
-        self.object.delete()
+        try:
+            self.object.delete()
+        except ValidationError as exc:
+            # Transactions of the account fall in a locked cutoff period
+            return JsonResponse({'status': 'error', 'message': ' '.join(exc.messages)}, status=400)
         return JsonResponse({'status': 'success'})
 
     def get_success_url(self):
         return reverse_lazy('accounts')
 
-class TransactionListView(LoginRequiredMixin, TemplateView):
+class TransactionFilterMixin:
+    """Mixin exposing the request's TransactionFilter and keyset pages of its results."""
+    def get_transaction_filter(self):
+        if not hasattr(self, '_transaction_filter'):
+            self._transaction_filter = TransactionFilter(self.request.user, self.request.GET)
+        return self._transaction_filter
+
+    def get_transaction_page(self, cursor):
+        """Keyset page of the filtered transactions following `cursor`."""
+        transactions = self.get_transaction_filter().queryset().select_related('category', 'account')
+        return keyset_paginate(transactions, cursor, TRANSACTIONS_PAGE_SIZE)
+
+class TransactionListView(LoginRequiredMixin, TransactionFilterMixin, TemplateView):
     template_name = 'core/transactions.html'
     login_url = reverse_lazy('login')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        transactions = Transaction.objects.filter(user=self.request.user).select_related('category', 'category__group', 'account')
-        
-        # Simple filtering logic
-        search_query = self.request.GET.get('search')
-        if search_query:
-            transactions = transactions.filter(description__icontains=search_query)
-        
-        category_id = self.request.GET.get('category')
-        if category_id:
-            transactions = transactions.filter(category_id=category_id)
-
-        account_id = self.request.GET.get('account')
-        if account_id:
-            transactions = transactions.filter(account_id=account_id)
-
-        start_date = self.request.GET.get('start_date')
-        if start_date:
-            transactions = transactions.filter(date__gte=start_date)
+        tx_filter = self.get_transaction_filter()
 
-        end_date = self.request.GET.get('end_date')
-        if end_date:
-            transactions = transactions.filter(date__lte=end_date)
+        try:
+            transactions, next_cursor = self.get_transaction_page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            # A stale or hand-edited cursor just restarts from the first page
+            transactions, next_cursor = self.get_transaction_page(None)
 
         context['transactions'] = transactions
-        context['has_filters'] = any([search_query, category_id, account_id, start_date, end_date])
-        
-        # Summary calculations (applying the same filters)
-        summary_base = Transaction.objects.filter(user=self.request.user)
-        if search_query:
-            summary_base = summary_base.filter(description__icontains=search_query)
-        if category_id:
-            summary_base = summary_base.filter(category_id=category_id)
-        if account_id:
-            summary_base = summary_base.filter(account_id=account_id)
-        if start_date:
-            summary_base = summary_base.filter(date__gte=start_date)
-        if end_date:
-            summary_base = summary_base.filter(date__lte=end_date)
-
-        total_income = summary_base.filter(
-            category__group__transaction_type='income'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        total_expenses = summary_base.filter(
-            category__group__transaction_type='expenses'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        context['total_income'] = total_income
-        context['total_expenses'] = total_expenses
-        context['net_flow'] = total_income - total_expenses
-
-        categories = list(Category.objects.filter(group__user=self.request.user))
+        context['next_cursor'] = next_cursor
+        if next_cursor:
+            params = self.request.GET.copy()
+            params['cursor'] = next_cursor
+            context['next_page_query'] = params.urlencode()
+        context['has_filters'] = tx_filter.is_active
+        
+        # Summary over the same filtered set: income, expenses, net flow and count in one query
+        context.update(tx_filter.summary())
+
+        # Loaded once, shared by the filter dropdowns, the add-transaction modal and the form choices
+        categories = list(Category.objects.filter(group__user=self.request.user).select_related('group'))
         for cat in categories:
-            cat.is_selected = str(cat.id) == category_id
+            cat.is_selected = str(cat.id) == tx_filter.category_id
             
         context['categories'] = categories
         
         accounts = list(Account.objects.filter(user=self.request.user))
         for acc in accounts:
-            acc.is_selected = str(acc.id) == account_id
+            acc.is_selected = str(acc.id) == tx_filter.account_id
             
         context['accounts'] = accounts
-        context['transaction_form'] = TransactionForm(user=self.request.user)
+        context['transaction_form'] = TransactionForm(user=self.request.user, categories=categories, accounts=accounts)
         context['today'] = timezone.now()
         
         return context
 
+class TransactionPageView(LoginRequiredMixin, TransactionFilterMixin, View):
+    """Next page of the transactions table for infinite scroll, as rendered rows plus a cursor."""
+    def get(self, request, *args, **kwargs):
+        try:
+            transactions, next_cursor = self.get_transaction_page(request.GET.get('cursor'))
+        except InvalidCursor:
+            return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+
+        html = render_to_string('core/partials/transaction_rows.html', {'transactions': transactions}, request=request)
+        return JsonResponse({
+            'status': 'success',
+            'html': html,
+            'count': len(transactions),
+            'next_cursor': next_cursor,
+        })
+
+class TransactionImportView(LoginRequiredMixin, View):
+    """Bulk import of a CSV/OFX bank export, streamed in batches straight from the upload."""
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if not upload:
+            return JsonResponse({'status': 'error', 'message': _("please_select_a_file")}, status=400)
+
+        def lookup(queryset, key):
+            value = request.POST.get(key)
+            if not value:
+                return None
+            if not value.isdigit():
+                raise ValueError(key)
+            return queryset.filter(pk=value).first()
+
+        categories = Category.objects.filter(group__user=request.user).select_related('group')
+        try:
+            importer = TransactionImporter(
+                request.user,
+                account=lookup(Account.objects.filter(user=request.user), 'account'),
+                expense_category=lookup(categories, 'expense_category'),
+                income_category=lookup(categories, 'income_category'),
+            )
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': _("invalid_selection")}, status=400)
+
+        reader = iter_ofx_records if upload.name.lower().endswith(('.ofx', '.qfx')) else iter_csv_records
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        result = importer.run(reader(stream))
+        if result.aborted and not result.created:
+            return JsonResponse({'status': 'error', 'message': result.aborted['message']}, status=400)
+        # Rows of the batches before an unreadable part are committed: report them
+        return JsonResponse({'status': 'partial' if result.aborted else 'success', **result.as_dict()})
+
+class TransactionBulkDeleteView(LoginRequiredMixin, View):
+    """Delete the POSTed `ids` of the user's transactions in one go, or none if any is in a locked period."""
+    def post(self, request, *args, **kwargs):
+        try:
+            ids = [int(value) for value in request.POST.getlist('ids')]
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': _("invalid_selection")}, status=400)
+        if not ids:
+            return JsonResponse({'status': 'error', 'message': _("no_transactions_selected")}, status=400)
+
+        try:
+            deleted, _per_model = Transaction.objects.filter(user=request.user, pk__in=ids).delete()
+        except ValidationError as exc:
+            return JsonResponse({'status': 'error', 'message': ' '.join(exc.messages)}, status=400)
+        return JsonResponse({'status': 'success', 'deleted': deleted})
+
+class TransactionBulkEditView(LoginRequiredMixin, View):
+    """
+    Move the selected transactions (POSTed `ids`, or else the transactions page filters in the
+    query string) to a new category, account and/or date in one set-based operation.
+    """
+    def post(self, request, *args, **kwargs):
+        form = TransactionBulkEditForm(request.POST, user=request.user)
+        if not form.is_valid():
+            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
+        return bulk_edit_response(request, lambda transactions: transactions.bulk_edit(**form.cleaned_data))
+
+class TransactionApplyRulesView(LoginRequiredMixin, View):
+    """
+    Re-apply the user's categorization rules to the selected transactions (POSTed `ids`, or
+    else the transactions page filters in the query string).
+    """
+    def post(self, request, *args, **kwargs):
+        return bulk_edit_response(request, lambda transactions: transactions.apply_rules())
+
+def bulk_edit_response(request, edit):
+    """JSON response of `edit(selected transactions)` for the bulk edit views."""
+    transaction_filter = TransactionFilter(request.user, request.GET)
+    try:
+        if request.POST.getlist('ids'):
+            ids = [int(value) for value in request.POST.getlist('ids')]
+            transactions = Transaction.objects.filter(user=request.user, pk__in=ids)
+        elif transaction_filter.is_active:
+            transactions = transaction_filter.queryset()
+        else:
+            return JsonResponse({'status': 'error', 'message': _("no_transactions_selected")}, status=400)
+        summary = edit(transactions)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': _("invalid_selection")}, status=400)
+    except ValidationError as exc:
+        return JsonResponse({'status': 'error', 'message': ' '.join(exc.messages)}, status=400)
+
+    return JsonResponse({
+        'status': 'success',
+        **summary,
+        'balance_changes': {
+            str(pk): str(delta.quantize(Decimal('0.01'))) for pk, delta in summary['balance_changes'].items()
+        },
+    })
+
+class RuleListView(LoginRequiredMixin, View):
+    """The user's categorization rules as JSON; POST adds one."""
+    def get(self, request, *args, **kwargs):
+        rules = CategorizationRule.objects.filter(user=request.user).select_related('category', 'account')
+        return JsonResponse({'status': 'success', 'rules': [
+            {
+                'id': rule.pk,
+                'match_type': rule.match_type,
+                'pattern': rule.pattern,
+                'min_amount': None if rule.min_amount is None else str(rule.min_amount),
+                'max_amount': None if rule.max_amount is None else str(rule.max_amount),
+                'category': rule.category_id,
+                'category_name': rule.category.name,
+                'account': rule.account_id,
+                'account_name': rule.account.name if rule.account else None,
+                'priority': rule.priority,
+                'is_active': rule.is_active,
+            }
+            for rule in rules
+        ]})
+
+    def post(self, request, *args, **kwargs):
+        form = CategorizationRuleForm(request.POST, user=request.user)
+        if not form.is_valid():
+            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
+        rule = form.save()
+        return JsonResponse({'status': 'success', 'id': rule.pk})
+
+class RuleDeleteView(LoginRequiredMixin, View):
+    def post(self, request, pk, *args, **kwargs):
+        get_object_or_404(CategorizationRule, pk=pk, user=request.user).delete()
+        return JsonResponse({'status': 'success'})
+
+class RuleSuggestView(LoginRequiredMixin, View):
+    """Category and account the user's rules pick for a `description` and `amount`, for the transaction form."""
+    def get(self, request, *args, **kwargs):
+        try:
+            amount = Decimal(request.GET['amount']) if request.GET.get('amount') else None
+            if amount is not None and not amount.is_finite():
+                raise ArithmeticError
+        except ArithmeticError:
+            return JsonResponse({'status': 'error', 'message': _("invalid_amount")}, status=400)
+        rule = categorization_rules.classify(request.user.pk, request.GET.get('description', ''), amount)
+        return JsonResponse({
+            'status': 'success',
+            'rule': rule.pk if rule else None,
+            'category': rule.category_id if rule else None,
+            'account': rule.account_id if rule else None,
+        })
+
 class TransactionCreateView(LoginRequiredMixin, CreateView):
     model = Transaction
     form_class = TransactionForm
@@ -603,53 +769,31 @@ class PerformCutoffView(LoginRequiredMixin, View):
             report = form.save(commit=False)
             report.user = request.user
             
-            # Aggregate totals for the selected period
-            txs = Transaction.objects.filter(
-                user=request.user,
-                date__gte=report.start_date,
-                date__lte=report.end_date
-            )
-            
-            report.income_total = txs.filter(
-                category__group__transaction_type='income'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            report.expense_total = txs.filter(
-                category__group__transaction_type='expenses'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            # Calculate starting balance (balance before start_date)
-            # This is tricky with our current model because balance is stored on Account.
-            # We'd need a snapshot mechanism. For now, we'll calculate it by subtracting
-            # all transactions from the current balance back to the start date.
-            
-            current_total_balance = Account.objects.filter(
-                user=request.user, 
-                include_in_total=True
-            ).aggregate(total=Sum('balance'))['total'] or 0
-            
-            # Sum of all transactions after end_date (to get balance AT end_date)
-            later_txs = Transaction.objects.filter(
-                user=request.user,
-                account__include_in_total=True,
-                date__gt=report.end_date
-            )
-            
-            later_income = later_txs.filter(category__group__transaction_type='income').aggregate(total=Sum('amount'))['total'] or 0
-            later_expense = later_txs.filter(category__group__transaction_type='expenses').aggregate(total=Sum('amount'))['total'] or 0
-            
-            # Balance at end_date = Current Balance - (Later Income - Later Expenses)
-            report.ending_balance = current_total_balance - (later_income - later_expense)
-            
-            # Starting balance = Ending Balance - (Period Income - Period Expenses)
-            report.starting_balance = report.ending_balance - (report.income_total - report.expense_total)
-            
+            report.compute_totals()
             report.save()
             return redirect('report_detail', pk=report.pk)
         
         return redirect('reports')
 
-class ReportDetailView(LoginRequiredMixin, DetailView):
+class ReportConditionalMixin(ConditionalResponseMixin):
+    """
+    ETag from the report row. Transactions of a locked period can't change (group type flips
+    included), so locked reports only add the last category and group edit (names are shown);
+    open ones depend on all the user's data.
+    """
+    def get_etag_parts(self, request, *args, **kwargs):
+        report = CutoffReport.objects.filter(pk=kwargs['pk'], user=request.user).values().first()
+        if report is None:
+            # Let the view answer the 404
+            return [None]
+        if report['is_locked']:
+            last_edits = Category.objects.filter(group__user=request.user).aggregate(
+                category=Max('updated_at'), group=Max('group__updated_at'),
+            )
+            return [report, last_edits['category'], last_edits['group']]
+        return [report, *user_data_validators(request.user)]
+
+class ReportDetailView(LoginRequiredMixin, ReportConditionalMixin, DetailView):
     model = CutoffReport
     template_name = 'core/report_detail.html'
     context_object_name = 'report'
@@ -659,248 +803,90 @@ class ReportDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Category breakdown for the report period
-        report = self.get_object()
-        txs = Transaction.objects.filter(
+        report = self.object
+        # Category totals were frozen when the report was created
+        context['expenses_breakdown'] = report.get_breakdown('expenses')
+        context['income_breakdown'] = report.get_breakdown('income')
+        context['transactions'] = Transaction.objects.filter(
             user=self.request.user,
             date__gte=report.start_date,
             date__lte=report.end_date
-        ).select_related('category', 'category__group')
-        
-        expenses_breakdown = txs.filter(
-            category__group__transaction_type='expenses'
-        ).values('category__name').annotate(total=Sum('amount')).order_by('-total')
-        
-        income_breakdown = txs.filter(
-            category__group__transaction_type='income'
-        ).values('category__name').annotate(total=Sum('amount')).order_by('-total')
-        
-        context['expenses_breakdown'] = expenses_breakdown
-        context['income_breakdown'] = income_breakdown
-        context['transactions'] = txs.order_by('-date')
+        ).select_related('category').order_by('-date')
         return context
 
 class ToggleReportLockView(LoginRequiredMixin, View):
     def post(self, request, pk, *args, **kwargs):
         report = get_object_or_404(CutoffReport, pk=pk, user=request.user)
         report.is_locked = not report.is_locked
+        if report.is_locked and not report.breakdown:
+            # Reports created outside PerformCutoffView freeze their breakdown when locked
+            report.freeze_breakdown()
         report.save()
         return JsonResponse({
             'status': 'success',
             'is_locked': report.is_locked
         })
 
-class DownloadReportPDFView(LoginRequiredMixin, View):
+class DownloadReportPDFView(LoginRequiredMixin, ReportConditionalMixin, View):
+    def get_etag_parts(self, request, *args, **kwargs):
+        return [*super().get_etag_parts(request, *args, **kwargs), LAYOUT_VERSION]
+
     def get(self, request, pk, *args, **kwargs):
         report = get_object_or_404(CutoffReport, pk=pk, user=request.user)
-        
-        # Color Palette
-        PRIMARY_TEAL = HexColor('#0d9488')
-        SECONDARY_TEAL = HexColor('#14b8a6')
-        BG_MUTED = HexColor('#f8fafc')
-        BORDER_COLOR = HexColor('#e2e8f0')
-        TEXT_DARK = HexColor('#0f172a')
-        TEXT_LIGHT = HexColor('#64748b')
-        SUCCESS_GREEN = HexColor('#10b981')
-        DANGER_RED = HexColor('#ef4444')
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, 
-                               rightMargin=40, leftMargin=40, 
-                               topMargin=40, bottomMargin=40)
-        elements = []
-        
-        styles = getSampleStyleSheet()
-        
-        # Custom Styles
-        title_style = ParagraphStyle(
-            'ReportTitle',
-            parent=styles['Heading1'],
-            fontSize=26,
-            textColor=TEXT_DARK,
-            spaceAfter=6,
-            fontName='Helvetica-Bold'
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'ReportSubtitle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=TEXT_LIGHT,
-            spaceAfter=24,
-            textTransform='uppercase',
-            letterSpacing=1
-        )
-        
-        card_label_style = ParagraphStyle(
-            'CardLabel',
-            fontSize=8,
-            textColor=TEXT_LIGHT,
-            fontName='Helvetica-Bold',
-            textTransform='uppercase',
-            alignment=1 # Center
-        )
-        
-        card_value_style = ParagraphStyle(
-            'CardValue',
-            fontSize=16,
-            textColor=TEXT_DARK,
-            fontName='Helvetica-Bold',
-            alignment=1
-        )
-        
-        section_header_style = ParagraphStyle(
-            'SectionHeader',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=TEXT_DARK,
-            spaceBefore=20,
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
 
-        # 1. Header Section
-        elements.append(Paragraph(report.name or _("Cutoff Report"), title_style))
-        elements.append(Paragraph(f"{report.start_date} — {report.end_date}", subtitle_style))
-        
-        # 2. Executive Summary Cards (Simulated with Table)
-        savings = report.income_total - report.expense_total
-        summary_data = [
-            [
-                Paragraph(_("total_income"), card_label_style),
-                Paragraph(_("total_expenses"), card_label_style),
-                Paragraph(_("net_savings"), card_label_style),
-                Paragraph(_("ending_balance"), card_label_style)
-            ],
-            [
-                Paragraph(f"+${report.income_total:,.2f}", ParagraphStyle('V1', parent=card_value_style, textColor=SUCCESS_GREEN)),
-                Paragraph(f"-${report.expense_total:,.2f}", ParagraphStyle('V2', parent=card_value_style, textColor=DANGER_RED)),
-                Paragraph(f"${savings:,.2f}", card_value_style),
-                Paragraph(f"${report.ending_balance:,.2f}", card_value_style)
-            ]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[135, 135, 135, 135])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), BG_MUTED),
-            ('BOX', (0, 0), (-1, -1), 1, BORDER_COLOR),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, 0), 15),
-            ('BOTTOMPADDING', (0, 1), (-1, 1), 15),
-            ('LINEAFTER', (0, 0), (2, -1), 1, BORDER_COLOR), # Vertical dividers
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 30))
-
-        # 3. Expense Breakdown & Pie Chart
-        elements.append(Paragraph(_("expense_breakdown"), section_header_style))
-        
-        txs_breakdown = Transaction.objects.filter(
-            user=request.user,
-            date__gte=report.start_date,
-            date__lte=report.end_date,
-            category__group__transaction_type='expenses'
-        ).values('category__name').annotate(total=Sum('amount')).order_by('-total')
-
-        if txs_breakdown.exists():
-            # Create Data for Chart
-            data = [float(item['total']) for item in txs_breakdown[:7]]
-            labels = [item['category__name'] for item in txs_breakdown[:7]]
-            
-            # Handle "Other" if more than 7 categories
-            if txs_breakdown.count() > 7:
-                others_sum = sum(float(item['total']) for item in txs_breakdown[7:])
-                data.append(others_sum)
-                labels.append(_("Others"))
-
-            # Drawing for Pie Chart
-            d = Drawing(width=500, height=200)
-            pc = Pie()
-            pc.x = 20
-            pc.y = 25
-            pc.width = 150
-            pc.height = 150
-            pc.data = data
-            pc.labels = labels
-            pc.sideLabels = True
-            pc.slices.strokeWidth = 0.5
-            pc.slices.strokeColor = colors.white
-            
-            # Color cycle for slices
-            chart_colors = [PRIMARY_TEAL, SECONDARY_TEAL, HexColor('#2dd4bf'), HexColor('#5eead4'), HexColor('#99f6e4'), HexColor('#ccfbf1')]
-            for i, val in enumerate(data):
-                pc.slices[i].fillColor = chart_colors[i % len(chart_colors)]
-
-            # Add Legend
-            legend = Legend()
-            legend.x = 220
-            legend.y = 160
-            legend.dx = 10
-            legend.dy = 10
-            legend.fontName = 'Helvetica'
-            legend.fontSize = 9
-            legend.columnMaximum = 10
-            legend.alignment = 'right'
-            
-            legend_data = []
-            for i, label in enumerate(labels):
-                legend_data.append((pc.slices[i].fillColor, label))
-            legend.colorNamePairs = legend_data
-            
-            d.add(pc)
-            d.add(legend)
-            
-            elements.append(d)
-        else:
-            elements.append(Paragraph(_("no_expenses_in_period"), styles["Italic"]))
-
-        elements.append(Spacer(1, 20))
-
-        # 4. Detailed Transaction Table
-        elements.append(Paragraph(_("period_transactions"), section_header_style))
-        
-        detail_txs = Transaction.objects.filter(
-            user=request.user,
-            date__gte=report.start_date,
-            date__lte=report.end_date
-        ).select_related('category', 'category__group').order_by('date')
-
-        table_data = [[_("date"), _("description"), _("category"), _("amount")]]
-        for tx in detail_txs:
-            color = SUCCESS_GREEN if tx.category.group.transaction_type == 'income' else TEXT_DARK
-            prefix = "+" if tx.category.group.transaction_type == 'income' else "-"
-            table_data.append([
-                tx.date.strftime('%Y-%m-%d'),
-                tx.description,
-                tx.category.name,
-                Paragraph(f"{prefix}${tx.amount:,.2f}", ParagraphStyle('Amt', fontSize=9, textColor=color, alignment=2))
-            ])
-
-        if detail_txs.exists():
-            table = Table(table_data, colWidths=[80, 220, 140, 90])
-            table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('TEXTCOLOR', (0, 0), (-1, 0), TEXT_DARK),
-                ('BACKGROUND', (0, 0), (-1, 0), BG_MUTED),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, BG_MUTED]),
-                ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-                ('LINEBELOW', (0, 0), (-1, 0), 1, BORDER_COLOR),
-            ]))
-            elements.append(table)
-        else:
-            elements.append(Paragraph(_("No transactions found for this period."), styles["Italic"]))
+        job = request_pdf(report)
+        if job.status in ('pending', 'running'):
+            # Queued for the workers: a plain link without the polling script polls from here
+            status_url = reverse('report_pdf_status', args=[report.pk])
+            return JsonResponse({'status': job.status, 'status_url': status_url}, status=202, headers={
+                'Location': status_url, 'Retry-After': '1',
+            })
+        if job.status != 'done':
+            return HttpResponse(_("error_generating_pdf"), status=500)
 
-        doc.build(elements)
-        
-        buffer.seek(0)
         formatted_date = report.end_date.strftime('%Y_%m')
         filename = f"FinOrbit_Report_{formatted_date}.pdf"
-        return HttpResponse(buffer, content_type='application/pdf', headers={
+        return HttpResponse(bytes(job.content), content_type='application/pdf', headers={
             'Content-Disposition': f'attachment; filename="{filename}"'
         })
+
+class ReportPDFStatusView(LoginRequiredMixin, View):
+    """POST queues the report PDF in the background, GET reports its progress for polling."""
+    def get(self, request, pk, *args, **kwargs):
+        report = get_object_or_404(CutoffReport, pk=pk, user=request.user)
+        return self.status_response(report, current_pdf(report))
+
+    def post(self, request, pk, *args, **kwargs):
+        report = get_object_or_404(CutoffReport, pk=pk, user=request.user)
+        return self.status_response(report, request_pdf(report))
+
+    def status_response(self, report, job):
+        # 'missing': never requested, or the report changed since; 'stalled': its worker is gone.
+        # Both are queued again by a POST
+        status = job.status if job else 'missing'
+        if status == 'running' and stalled_jobs().filter(pk=job.pk).exists():
+            status = 'stalled'
+        return JsonResponse({
+            'status': status,
+            'download_url': reverse('report_pdf', args=[report.pk]) if status == 'done' else None,
+        })
+
+class PerfStatsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Staff-only dump of the request profiles (see core/profiling.py) and cache hit rates; POST resets."""
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            'sample_rate': getattr(settings, 'PERF_SAMPLE_RATE', 0),
+            'routes': perf_registry.snapshot(),
+            'caches': {
+                'cutoff_locks': cutoff_locks.stats(),
+                'categorization_rules': categorization_rules.stats(),
+                'user_data': user_data.stats(),
+            },
+        })
+
+    def post(self, request, *args, **kwargs):
+        perf_registry.reset()
+        return JsonResponse({'status': 'success'})
@@ -0,0 +1,14 @@
+"""
+Settings for the test suite.
+
+The cache is the database one production falls back to, so the query counts the tests assert
+include its round trips. Its table is created along with the test database.
+"""
+from .settings import *  # noqa: F401,F403
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'finorbit_cache',
+    }
+}
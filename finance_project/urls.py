@@ -19,8 +19,11 @@ from django.urls import path, include
 
 from django.conf.urls.i18n import i18n_patterns
 
+from core.views import PerfStatsView
+
 urlpatterns = [
     path("i18n/", include("django.conf.urls.i18n")),
+    path("internal/perf/", PerfStatsView.as_view(), name="internal_perf"),
     path("__reload__/", include("django_browser_reload.urls")),
 ]
 